@@ -1,24 +1,42 @@
 import os
+import json
 import uuid
 import shutil
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-from typing import List
+import asyncio
+import zipfile
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.code_scanner import scan_source_code
-from app.core.pom_generator import generate_pom
-from app.core.test_generator import generate_tests
-from app.core.test_executor import execute_test
+from app.core.pom_generator import generate_pom, generate_pom_stream
+from app.core.test_generator import generate_tests, generate_tests_stream, get_browser_profile, PAGE_LOAD_STRATEGIES
+from app.core.test_executor import execute_test, execute_test_targets, create_log_path, get_report_path
+from app.core.parallel_executor import execute_test_parallel, SHARDING_STRATEGIES
+from app.core.retry_executor import retry_failed_tests, RETRYABLE_STATUSES
+from app.core.impact_analyzer import (load_impact_map, changed_files_between, changed_files_from_diff,
+                                      select_impacted_tests)
+from app.core.job_queue import job_manager, JobContext, FINISHED_STATES
+from app.core.log_stream import follow_execution
+from app.core.log_store import LogReader, archive_log, parse_byte_range
+from app.core.storage import storage
+from app.core.llm_cache import llm_cache
 from app.models.project import Project, POM, TestCase, TestExecution
 from config import settings
 
 router = APIRouter()
 
-# In-memory storage (replace with a database in production)
-projects = {}
-poms = {}
-test_cases = {}
-test_executions = {}
+# Most lines returned by one tail or line query of an execution log
+MAX_LOG_LINES = 10000
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(events) -> StreamingResponse:
+    # Disable proxy buffering so events reach the client as they are sent
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.post("/projects/")
 async def create_project(name: str = Form(...), description: str = Form(None), 
@@ -36,167 +54,580 @@ async def create_project(name: str = Form(...), description: str = Form(None),
         shutil.copyfileobj(file.file, buffer)
     
     # Create project record
-    projects[project_id] = Project(
+    storage.save_project(Project(
         id=project_id,
         name=name,
         description=description,
         source_file=file.filename,
         source_path=file_path
-    )
+    ))
     
     return {"project_id": project_id, "message": "Project created successfully"}
 
 @router.get("/projects/")
 async def list_projects():
     """List all projects"""
-    return {"projects": list(projects.values())}
+    return {"projects": storage.list_projects()}
 
 @router.get("/projects/{project_id}")
 async def get_project(project_id: str):
     """Get project details"""
-    if project_id not in projects:
+    project = storage.get_project(project_id)
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    return projects[project_id]
+    return project
 
 @router.post("/projects/{project_id}/scan")
 async def scan_project(project_id: str):
     """Scan source code to identify UI elements"""
-    if project_id not in projects:
+    if storage.get_project(project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = projects[project_id]
+    job = job_manager.submit("scan", _scan_project_job, project_id, project_id=project_id)
+    
+    return {"job_id": job.id, "message": "Scan queued"}
+
+def _scan_project_job(job: JobContext, project_id: str):
+    project = storage.get_project(project_id)
     elements = scan_source_code(project.source_path)
+    storage.save_scan(project_id, elements)
     
-    return {"project_id": project_id, "elements": elements}
+    # The elements are in storage; job results stay small enough to list
+    return {"project_id": project_id, "element_count": len(elements)}
 
 @router.post("/projects/{project_id}/pom")
-async def create_pom(project_id: str):
-    """Generate Page Object Model from scanned code"""
-    if project_id not in projects:
+async def create_pom(project_id: str, regenerate: bool = Form(False)):
+    """Generate Page Object Model from scanned code; regenerate bypasses the LLM response cache"""
+    if storage.get_project(project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = projects[project_id]
-    elements = scan_source_code(project.source_path)
-    pom_data = generate_pom(elements, project_id)
+    job = job_manager.submit("pom", _create_pom_job, project_id, regenerate, project_id=project_id)
     
+    return {"job_id": job.id, "message": "POM generation queued"}
+
+def _create_pom_job(job: JobContext, project_id: str, regenerate: bool = False):
+    project = storage.get_project(project_id)
+    
+    # Reuse the previous scan of this project when there is one
+    elements = storage.get_scan(project_id)
+    if elements is None:
+        elements = scan_source_code(project.source_path)
+        storage.save_scan(project_id, elements)
+    job.update_progress(0.3, "Source code scanned")
+    
+    pom_data = generate_pom(elements, project_id, regenerate=regenerate)
+    job.update_progress(0.9, "POM generated")
+    
+    # The project lists its POMs through storage
     pom_id = str(uuid.uuid4())
-    poms[pom_id] = POM(
+    storage.save_pom(POM(
         id=pom_id,
         project_id=project_id,
         elements=pom_data["elements"],
-        file_path=pom_data["file_path"]
-    )
+        file_path=pom_data["file_path"],
+        changes=pom_data["changes"]
+    ))
     
-    # Update project with POM reference
-    if "pom_ids" not in project.dict():
-        project_dict = project.dict()
-        project_dict["pom_ids"] = []
-        projects[project_id] = Project(**project_dict)
+    return {"pom_id": pom_id, "changes": pom_data["changes"], "message": "POM generated successfully"}
+
+@router.get("/projects/{project_id}/pom/stream")
+async def stream_pom(project_id: str, regenerate: bool = False):
+    """Generate a POM and stream each element over Server-Sent Events as Gemini completes it"""
+    project = storage.get_project(project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
     
-    project_dict = projects[project_id].dict()
-    if "pom_ids" not in project_dict:
-        project_dict["pom_ids"] = []
-    project_dict["pom_ids"].append(pom_id)
-    projects[project_id] = Project(**project_dict)
+    async def events():
+        try:
+            elements = storage.get_scan(project_id)
+            if elements is None:
+                elements = await asyncio.to_thread(scan_source_code, project.source_path)
+                storage.save_scan(project_id, elements)
+            
+            async for update in generate_pom_stream(elements, project_id, regenerate=regenerate):
+                if update["event"] != "pom":
+                    yield _sse(update["event"], update["data"])
+                    continue
+                
+                pom_data = update["data"]
+                pom_id = str(uuid.uuid4())
+                storage.save_pom(POM(
+                    id=pom_id,
+                    project_id=project_id,
+                    elements=pom_data["elements"],
+                    file_path=pom_data["file_path"],
+                    changes=pom_data["changes"]
+                ))
+                yield _sse("done", {"pom_id": pom_id, "changes": pom_data["changes"],
+                                    "message": "POM generated successfully"})
+        except Exception as e:
+            print(f"Error streaming POM generation: {str(e)}")
+            yield _sse("error", {"detail": str(e)})
     
-    return {"pom_id": pom_id, "message": "POM generated successfully"}
+    return _sse_response(events())
 
 @router.get("/projects/{project_id}/pom")
 async def list_project_poms(project_id: str):
     """List all POMs for a project"""
-    if project_id not in projects:
+    if storage.get_project(project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = projects[project_id]
-    project_poms = []
-    
-    if hasattr(project, "pom_ids"):
-        for pom_id in project.pom_ids:
-            if pom_id in poms:
-                project_poms.append(poms[pom_id])
-    
-    return {"poms": project_poms}
+    return {"poms": storage.list_poms(project_id)}
 
 @router.post("/projects/{project_id}/tests")
-async def create_tests(project_id: str, pom_id: str = Form(...)):
-    """Generate test cases from POM"""
-    if project_id not in projects:
+async def create_tests(project_id: str, pom_id: str = Form(...), use_driver_pool: bool = Form(False),
+                       regenerate: bool = Form(False), headless: Optional[bool] = Form(None),
+                       page_load_strategy: Optional[str] = Form(None)):
+    """Generate test cases from POM; regenerate bypasses the LLM response cache.
+
+    headless and page_load_strategy override the configured browser profile.
+    """
+    if storage.get_project(project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if pom_id not in poms:
+    if storage.get_pom(pom_id) is None:
         raise HTTPException(status_code=404, detail="POM not found")
     
-    pom = poms[pom_id]
-    test_data = generate_tests(pom, project_id)
+    browser_profile = _browser_profile(headless, page_load_strategy)
+    job = job_manager.submit("tests", _create_tests_job, project_id, pom_id, use_driver_pool, regenerate,
+                             browser_profile, project_id=project_id)
     
+    return {"job_id": job.id, "message": "Test generation queued"}
+
+def _browser_profile(headless: Optional[bool], page_load_strategy: Optional[str]) -> Dict[str, Any]:
+    if page_load_strategy is not None and page_load_strategy not in PAGE_LOAD_STRATEGIES:
+        raise HTTPException(status_code=400,
+                            detail=f"page_load_strategy must be one of: {', '.join(PAGE_LOAD_STRATEGIES)}")
+    return get_browser_profile(headless=headless, page_load_strategy=page_load_strategy)
+
+def _create_tests_job(job: JobContext, project_id: str, pom_id: str, use_driver_pool: bool = False,
+                      regenerate: bool = False, browser_profile: Optional[Dict[str, Any]] = None):
+    pom = storage.get_pom(pom_id)
+    test_data = generate_tests(pom, project_id, use_driver_pool=use_driver_pool, regenerate=regenerate,
+                               browser_profile=browser_profile)
+    
+    # The project lists its test cases through storage
     test_id = str(uuid.uuid4())
-    test_cases[test_id] = TestCase(
+    storage.save_test_case(TestCase(
         id=test_id,
         project_id=project_id,
         pom_id=pom_id,
         name=test_data["name"],
         script_path=test_data["script_path"],
         description=test_data["description"]
-    )
-    
-    # Update project with test case reference
-    project_dict = projects[project_id].dict()
-    if "test_ids" not in project_dict:
-        project_dict["test_ids"] = []
-    project_dict["test_ids"].append(test_id)
-    projects[project_id] = Project(**project_dict)
+    ))
     
     return {"test_id": test_id, "message": "Test cases generated successfully"}
 
+@router.get("/projects/{project_id}/tests/stream")
+async def stream_tests(project_id: str, pom_id: str, use_driver_pool: bool = False, regenerate: bool = False,
+                       headless: Optional[bool] = None, page_load_strategy: Optional[str] = None):
+    """Generate test cases and stream each test script over Server-Sent Events as Gemini completes it"""
+    if storage.get_project(project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    pom = storage.get_pom(pom_id)
+    if pom is None:
+        raise HTTPException(status_code=404, detail="POM not found")
+    browser_profile = _browser_profile(headless, page_load_strategy)
+    
+    async def events():
+        try:
+            async for update in generate_tests_stream(pom, project_id, use_driver_pool=use_driver_pool,
+                                                      regenerate=regenerate, browser_profile=browser_profile):
+                if update["event"] != "tests":
+                    yield _sse(update["event"], update["data"])
+                    continue
+                
+                test_data = update["data"]
+                test_id = str(uuid.uuid4())
+                storage.save_test_case(TestCase(
+                    id=test_id,
+                    project_id=project_id,
+                    pom_id=pom_id,
+                    name=test_data["name"],
+                    script_path=test_data["script_path"],
+                    description=test_data["description"]
+                ))
+                yield _sse("done", {"test_id": test_id, "message": "Test cases generated successfully"})
+        except Exception as e:
+            print(f"Error streaming test generation: {str(e)}")
+            yield _sse("error", {"detail": str(e)})
+    
+    return _sse_response(events())
+
 @router.get("/projects/{project_id}/tests")
 async def list_project_tests(project_id: str):
     """List all test cases for a project"""
-    if project_id not in projects:
+    if storage.get_project(project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project = projects[project_id]
-    project_tests = []
+    return {"tests": storage.list_test_cases(project_id)}
+
+@router.post("/projects/{project_id}/execute")
+async def run_test(project_id: str, test_id: str = Form(...), parallel: bool = Form(False),
+                   workers: Optional[int] = Form(None), sharding: str = Form(settings.TEST_SHARDING),
+                   retries: int = Form(0)):
+    """Execute a test case, optionally sharding its modules across parallel workers.
+
+    With retries, failed tests are re-run on their own up to that many
+    times and tests that pass on retry are marked flaky.
+    """
+    if storage.get_project(project_id) is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    if storage.get_test_case(test_id) is None:
+        raise HTTPException(status_code=404, detail="Test case not found")
     
-    if hasattr(project, "test_ids"):
-        for test_id in project.test_ids:
-            if test_id in test_cases:
-                project_tests.append(test_cases[test_id])
+    if parallel and sharding not in SHARDING_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unknown sharding strategy: {sharding}")
     
-    return {"tests": project_tests}
+    if retries < 0:
+        raise HTTPException(status_code=400, detail="retries must not be negative")
+    
+    job_id, execution_id = _queue_execution(project_id, test_id, parallel=parallel, workers=workers,
+                                            sharding=sharding, retries=retries)
+    
+    return {"job_id": job_id, "execution_id": execution_id, "message": "Test execution queued"}
 
-@router.post("/projects/{project_id}/execute")
-async def run_test(project_id: str, test_id: str = Form(...)):
-    """Execute a test case"""
-    if project_id not in projects:
+@router.post("/projects/{project_id}/execute/impacted")
+async def run_impacted_tests(project_id: str, test_id: str = Form(...), file: Optional[UploadFile] = File(None),
+                             diff: Optional[str] = Form(None), changed_files: Optional[str] = Form(None),
+                             include_unmapped: bool = Form(True), retries: int = Form(0)):
+    """Execute only the tests that use elements from changed source files.
+
+    The change is a new upload of the project's source, compared file by
+    file with the current one (which is left in place), a unified diff,
+    or a comma or newline separated list of paths.
+    """
+    project = storage.get_project(project_id)
+    if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if test_id not in test_cases:
+    test_case = storage.get_test_case(test_id)
+    if test_case is None:
         raise HTTPException(status_code=404, detail="Test case not found")
     
-    test_case = test_cases[test_id]
-    execution_result = execute_test(test_case)
+    if retries < 0:
+        raise HTTPException(status_code=400, detail="retries must not be negative")
+    
+    impact_map = load_impact_map(os.path.dirname(test_case.script_path))
+    if impact_map is None:
+        raise HTTPException(status_code=409, detail="Test case has no impact map, regenerate the tests")
     
+    if file is not None:
+        upload_dir = os.path.join(settings.UPLOAD_DIR, project_id, f"impact_{uuid.uuid4()}")
+        os.makedirs(upload_dir, exist_ok=True)
+        try:
+            upload_path = os.path.join(upload_dir, os.path.basename(file.filename))
+            with open(upload_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            changed = await asyncio.to_thread(changed_files_between, project.source_path, upload_path,
+                                              project.source_file)
+        except (ValueError, zipfile.BadZipFile) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid upload: {str(e)}")
+        finally:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+    elif diff:
+        changed = changed_files_from_diff(diff)
+    elif changed_files:
+        changed = [path.strip() for path in changed_files.replace("\n", ",").split(",") if path.strip()]
+    else:
+        raise HTTPException(status_code=400, detail="Provide a new upload, a diff or changed_files")
+    
+    selection = select_impacted_tests(impact_map, changed, include_unmapped)
+    impact = {
+        "changed_files": changed,
+        "mapped_files": selection["files"],
+        "elements": selection["elements"],
+        "tests": selection["tests"],
+        "skipped": selection["skipped"]
+    }
+    if not selection["tests"]:
+        return {"job_id": None, "execution_id": None, "impact": impact, "message": "No tests are affected"}
+    
+    job_id, execution_id = _queue_execution(project_id, test_id, retries=retries, targets=selection["tests"],
+                                            impact=impact)
+    
+    return {"job_id": job_id, "execution_id": execution_id, "impact": impact,
+            "message": f"Execution of {len(selection['tests'])} affected tests queued"}
+
+def _queue_execution(project_id: str, test_id: str, **options) -> Tuple[str, str]:
+    """Record a queued execution and submit its job; returns the job and execution IDs"""
+    # The execution is recorded before it starts so clients can follow it right away
+    job_id = str(uuid.uuid4())
     execution_id = str(uuid.uuid4())
-    test_executions[execution_id] = TestExecution(
+    log_file = create_log_path(project_id)
+    storage.save_execution(TestExecution(
         id=execution_id,
         project_id=project_id,
         test_id=test_id,
-        status=execution_result["status"],
-        result=execution_result["result"],
-        log_path=execution_result["log_path"]
+        status="QUEUED",
+        result={},
+        log_path=log_file,
+        job_id=job_id
+    ))
+    
+    job_manager.submit("execute", _run_test_job, project_id, test_id, project_id=project_id, job_id=job_id,
+                       execution_id=execution_id, log_file=log_file, **options)
+    return job_id, execution_id
+
+def _run_test_job(job: JobContext, project_id: str, test_id: str, parallel: bool = False,
+                  workers: Optional[int] = None, sharding: str = settings.TEST_SHARDING,
+                  execution_id: Optional[str] = None, log_file: Optional[str] = None, retries: int = 0,
+                  targets: Optional[List[str]] = None, impact: Optional[Dict[str, Any]] = None):
+    test_case = storage.get_test_case(test_id)
+    execution = TestExecution(
+        id=execution_id or str(uuid.uuid4()),
+        project_id=project_id,
+        test_id=test_id,
+        status="RUNNING",
+        result={},
+        log_path=log_file or create_log_path(project_id),
+        job_id=job.job_id
     )
+    storage.save_execution(execution)
+    
+    try:
+        if targets:
+            execution_result = execute_test_targets(test_case, targets, cancel_event=job.cancel_event,
+                                                    log_file=execution.log_path)
+        elif parallel:
+            execution_result = execute_test_parallel(test_case, workers=workers, sharding=sharding,
+                                                     cancel_event=job.cancel_event, log_file=execution.log_path)
+        else:
+            execution_result = execute_test(test_case, cancel_event=job.cancel_event, log_file=execution.log_path)
+    except Exception as e:
+        execution.status = "ERROR"
+        execution.result = {"error": str(e)}
+        storage.save_execution(execution)
+        raise
+    
+    if impact is not None:
+        execution_result["result"]["impact"] = impact
+    
+    # The full log stays available through the log endpoint, compressed and indexed
+    try:
+        index = archive_log(execution.log_path)
+        if index is not None:
+            execution_result["result"]["log_size"] = index["size"]
+            execution_result["result"]["log_lines"] = index["lines"]
+    except Exception as e:
+        print(f"Error archiving execution log {execution.log_path}: {str(e)}")
+    
+    if retries > 0 and execution_result["status"] == "FAILURE":
+        execution_result.update(retry_failed_tests(test_case, execution_result["result"], execution.log_path,
+                                                   max_retries=retries, cancel_event=job.cancel_event))
+    
+    execution.status = execution_result["status"]
+    execution.result = execution_result["result"]
+    storage.save_execution(execution)
+    job.check_cancelled()
+    
+    # The result is stored with the execution
+    return {"execution_id": execution.id, "status": execution.status}
+
+@router.post("/executions/{execution_id}/retry")
+async def retry_execution(execution_id: str, max_retries: int = Form(settings.TEST_RETRIES)):
+    """Re-run only the failed tests of an execution and merge the results into it"""
+    execution = storage.get_execution(execution_id)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if not _execution_finished(execution):
+        raise HTTPException(status_code=409, detail="Execution has not finished")
+    
+    if storage.get_test_case(execution.test_id) is None:
+        raise HTTPException(status_code=404, detail="Test case not found")
+    
+    if max_retries < 1:
+        raise HTTPException(status_code=400, detail="max_retries must be at least 1")
+    
+    if not any(test["status"] in RETRYABLE_STATUSES for test in execution.result.get("tests", [])):
+        raise HTTPException(status_code=400, detail="Execution has no failed tests to retry")
+    
+    job = job_manager.submit("retry", _retry_execution_job, execution_id, max_retries,
+                             project_id=execution.project_id)
+    
+    return {"job_id": job.id, "execution_id": execution_id, "message": "Test retry queued"}
+
+def _retry_execution_job(job: JobContext, execution_id: str, max_retries: int):
+    execution = storage.get_execution(execution_id)
+    test_case = storage.get_test_case(execution.test_id)
+    retry_result = retry_failed_tests(test_case, execution.result, execution.log_path,
+                                      max_retries=max_retries, cancel_event=job.cancel_event)
+    
+    execution.status = retry_result["status"]
+    execution.result = retry_result["result"]
+    storage.save_execution(execution)
+    job.check_cancelled()
+    
+    return {"execution_id": execution_id, "status": execution.status}
+
+def _execution_finished(execution: TestExecution) -> bool:
+    """Whether an execution has finished, or its job ended without finishing it"""
+    if execution.status not in ("QUEUED", "RUNNING"):
+        return True
+    job = job_manager.get(execution.job_id) if execution.job_id else None
+    return job is None or job.status in FINISHED_STATES
+
+@router.get("/executions/{execution_id}/stream")
+async def stream_execution(execution_id: str, log_offset: int = 0, report_offset: int = 0):
+    """Follow a test execution over Server-Sent Events.
+
+    Sends "log" events with new log output and "test" events as each test
+    starts and ends, then "done" with the finished execution. The offsets
+    in the events can be passed back to resume after a disconnect.
+    """
+    execution = storage.get_execution(execution_id)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if log_offset < 0 or report_offset < 0:
+        raise HTTPException(status_code=400, detail="Offsets must not be negative")
     
-    return {"execution_id": execution_id, "result": execution_result}
+    def is_finished() -> bool:
+        return _execution_finished(storage.get_execution(execution_id))
+    
+    async def events():
+        try:
+            yield _sse("execution", {"execution_id": execution_id, "status": execution.status})
+            
+            async for update in follow_execution(execution.log_path, get_report_path(execution.log_path),
+                                                 is_finished, log_offset, report_offset):
+                yield _sse(update["event"], update["data"])
+            
+            finished = storage.get_execution(execution_id)
+            if finished.status in ("QUEUED", "RUNNING"):
+                # The job was cancelled before it started or died without recording a result
+                job = job_manager.get(finished.job_id) if finished.job_id else None
+                finished.status = "CANCELLED" if job is not None and job.status == "CANCELLED" else "ERROR"
+                storage.save_execution(finished)
+            yield _sse("done", {"execution_id": execution_id, "status": finished.status,
+                                "result": finished.result})
+        except Exception as e:
+            print(f"Error streaming execution {execution_id}: {str(e)}")
+            yield _sse("error", {"detail": str(e)})
+    
+    return _sse_response(events())
+
+@router.get("/executions/{execution_id}/log")
+async def get_execution_log(execution_id: str, request: Request, tail: Optional[int] = None,
+                            line: Optional[int] = None, lines: int = 1000,
+                            offset: Optional[int] = None, length: Optional[int] = None,
+                            attempt: Optional[int] = None):
+    """Read an execution log, which may still be growing.
+
+    Sends the whole log, a byte range (HTTP Range header, or offset and
+    length for plain links), the last tail lines, or lines lines from line
+    number line (0-based). Archived logs are only decompressed where the
+    request needs them. attempt selects the log of a retry attempt.
+    """
+    execution = storage.get_execution(execution_id)
+    if execution is None:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if tail is not None and not 0 < tail <= MAX_LOG_LINES:
+        raise HTTPException(status_code=400, detail=f"tail must be between 1 and {MAX_LOG_LINES}")
+    if line is not None and (line < 0 or not 0 < lines <= MAX_LOG_LINES):
+        raise HTTPException(status_code=400, detail=f"Invalid line query, lines must be between 1 and {MAX_LOG_LINES}")
+    if (offset is not None and offset < 0) or (length is not None and length <= 0):
+        raise HTTPException(status_code=400, detail="Invalid log range")
+    
+    log_path = execution.log_path
+    if attempt is not None:
+        retries = execution.result.get("retries", [])
+        if not 1 <= attempt <= len(retries):
+            raise HTTPException(status_code=404, detail="Retry attempt not found")
+        log_path = retries[attempt - 1]["log_path"]
+    
+    try:
+        reader = LogReader(log_path)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Log not found")
+    
+    size = reader.size
+    headers = {"Accept-Ranges": "bytes", "X-Log-Size": str(size)}
+    if reader.lines is not None:
+        headers["X-Log-Lines"] = str(reader.lines)
+    
+    if tail is not None or line is not None:
+        try:
+            if tail is not None:
+                text_lines = await asyncio.to_thread(reader.tail, tail)
+            else:
+                text_lines, next_offset = await asyncio.to_thread(reader.read_lines, line, lines)
+                headers["X-Log-Next-Line"] = str(line + len(text_lines))
+                headers["X-Log-Next-Offset"] = str(next_offset)
+        finally:
+            reader.close()
+        return PlainTextResponse("".join(text + "\n" for text in text_lines), headers=headers)
+    
+    status_code = 200
+    start, end = 0, size
+    if offset is not None or length is not None:
+        start = min(offset or 0, size)
+        end = size if length is None else min(size, start + length)
+        headers["X-Log-Offset"] = str(start)
+        headers["X-Log-Next-Offset"] = str(end)
+    elif request.headers.get("range"):
+        try:
+            byte_range = parse_byte_range(request.headers["range"], size)
+        except ValueError:
+            reader.close()
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    headers["Content-Length"] = str(end - start)
+    
+    def content():
+        # Decompresses one block at a time, in the threadpool
+        try:
+            yield from reader.iter_bytes(start, end)
+        finally:
+            reader.close()
+    
+    return StreamingResponse(content(), status_code=status_code, media_type="text/plain",
+                             headers=headers)
 
 @router.get("/projects/{project_id}/executions")
 async def list_executions(project_id: str):
     """List all test executions for a project"""
-    if project_id not in projects:
+    if storage.get_project(project_id) is None:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    project_executions = [
-        execution for execution in test_executions.values()
-        if execution.project_id == project_id
-    ]
-    
-    return {"executions": project_executions}
\ No newline at end of file
+    return {"executions": storage.list_executions(project_id)}
+
+@router.get("/jobs")
+async def list_jobs(project_id: Optional[str] = None):
+    """List background jobs, optionally only those of one project"""
+    return {"jobs": job_manager.list(project_id)}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get status, progress and result of a background job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running background job"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/llm/cache")
+async def get_llm_cache_stats():
+    """Get LLM response cache hit/miss counters and size"""
+    return llm_cache.stats()
+
+@router.delete("/llm/cache")
+async def clear_llm_cache():
+    """Remove every cached LLM response"""
+    llm_cache.clear()
+    return {"message": "LLM cache cleared"}
@@ -1,64 +1,292 @@
 import os
-import re
 import json
 import uuid
-from bs4 import BeautifulSoup
-from typing import List, Dict, Any
+import hashlib
+import threading
+import multiprocessing
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from bs4 import BeautifulSoup, Tag
+from typing import List, Dict, Any, Optional, Tuple
+from app.utils.disk_cache import DiskCache
+from app.utils.file_utils import iter_zip_members
+from app.core.markup_tokenizer import (
+    OFFSET_ATTRIBUTE, extract_component_markup, get_line_starts, offset_to_position
+)
+from config import settings
 
-def scan_source_code(file_path: str) -> List[Dict[str, Any]]:
+# Bump whenever extraction output changes so stale cache entries are ignored
+SCANNER_VERSION = "2"
+
+COMPONENT_EXTENSIONS = ('.html', '.jsx', '.tsx', '.vue')
+
+# BeautifulSoup tree builders selectable with HTML_PARSER
+PARSER_BACKENDS = ("html.parser", "lxml")
+
+_scan_cache = None
+_scan_cache_lock = threading.Lock()
+_process_pool = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+def get_scan_cache() -> DiskCache:
+    """Get the per-file element cache stored under RESULTS_DIR"""
+    global _scan_cache
+    with _scan_cache_lock:
+        if _scan_cache is None:
+            _scan_cache = DiskCache(settings.SCAN_CACHE_DIR, settings.SCAN_CACHE_MAX_BYTES)
+        return _scan_cache
+
+def get_cache_key(data: bytes, file_name: str) -> str:
+    """Key a file's scan result by scanner version, parser, file name and content hash"""
+    digest = hashlib.sha256()
+    digest.update(f"{SCANNER_VERSION}\0{settings.HTML_PARSER}\0{file_name}\0".encode('utf-8'))
+    digest.update(data)
+    return digest.hexdigest()
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Get a long-lived process pool for parsing, recreating it if the size changed"""
+    global _process_pool, _process_pool_workers
+    # Scan jobs run on several worker threads; only one of them may create the pool
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers != workers:
+            if _process_pool is not None:
+                # Work already submitted to the old pool still finishes
+                _process_pool.shutdown(wait=False)
+            # Spawn rather than fork, the API server process is multi-threaded
+            _process_pool = ProcessPoolExecutor(max_workers=workers,
+                                                mp_context=multiprocessing.get_context("spawn"))
+            _process_pool_workers = workers
+        return _process_pool
+
+def scan_source_code(file_path: str, use_cache: bool = True, workers: Optional[int] = None) -> List[Dict[str, Any]]:
     """Scan source code to identify UI elements"""
     elements = []
     
     # Get file extension
     _, ext = os.path.splitext(file_path)
     
-    if ext.lower() in ['.html', '.jsx', '.tsx', '.vue']:
-        elements = scan_component_file(file_path)
+    if ext.lower() in COMPONENT_EXTENSIONS:
+        elements = scan_component_file(file_path, use_cache)
     elif ext.lower() == '.zip':
-        # TODO: Extract and scan zip file
-        pass
+        elements = scan_zip_file(file_path, use_cache, workers)
     elif os.path.isdir(file_path):
         # Scan directory
-        for root, _, files in os.walk(file_path):
-            for file in files:
-                if file.endswith(('.html', '.jsx', '.tsx', '.vue')):
-                    file_elements = scan_component_file(os.path.join(root, file))
-                    elements.extend(file_elements)
+        file_paths = []
+        for root, dirs, files in os.walk(file_path):
+            dirs.sort()
+            for file in sorted(files):
+                if file.endswith(COMPONENT_EXTENSIONS):
+                    file_paths.append(os.path.join(root, file))
+        
+        source_files = [os.path.relpath(path, file_path).replace(os.sep, '/') for path in file_paths]
+        elements = scan_files(file_paths, use_cache, workers, source_files=source_files)
     
+    assign_stable_ids(elements)
     return elements
 
-def scan_component_file(file_path: str) -> List[Dict[str, Any]]:
-    """Scan a single component file for UI elements"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+def without_source_position(element: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of an element without the line and column it was found at.
+
+    Positions move whenever lines are added above an element, so they are
+    left out wherever an element's identity or content is compared.
+    """
+    source = (element.get("properties") or {}).get("source")
+    if not source:
+        return element
+    
+    properties = dict(element["properties"])
+    properties["source"] = {key: value for key, value in source.items() if key not in ("line", "column")}
+    return {**element, "properties": properties}
+
+def assign_stable_ids(elements: List[Dict[str, Any]]):
+    """Derive element IDs from content so unchanged elements keep their IDs across scans.
+
+    An element is identified by its source file, type and selector; the
+    position is left out so edits elsewhere in the file do not move it.
+    Repeats of the same identity are numbered in scan order.
+    """
+    occurrences = Counter()
+    for element in elements:
+        source = element.get("properties", {}).get("source", {})
+        identity = "\0".join([
+            str(source.get("file", "")), element["type"], element["selector_type"], element["selector"]
+        ])
+        occurrences[identity] += 1
+        if occurrences[identity] > 1:
+            identity += f"\0{occurrences[identity]}"
+        element["id"] = hashlib.sha1(identity.encode('utf-8')).hexdigest()[:16]
+
+def scan_files(file_paths: List[str], use_cache: bool = True, workers: Optional[int] = None,
+               chunksize: Optional[int] = None, source_files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Scan many component files, in parallel worker processes for large batches.
+
+    Results are merged in the order of file_paths. A file that fails to
+    scan is reported and skipped instead of aborting the whole scan.
+    """
+    return run_scans(scan_component_file_safe, file_paths,
+                     file_paths, [use_cache] * len(file_paths),
+                     workers=workers, chunksize=chunksize, source_files=source_files)
+
+def scan_zip_file(zip_path: str, use_cache: bool = True, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Scan the component files inside a zip archive without extracting it to disk"""
+    members = iter_zip_members(
+        zip_path,
+        COMPONENT_EXTENSIONS,
+        max_members=settings.ZIP_MAX_MEMBERS,
+        max_total_size=settings.ZIP_MAX_TOTAL_SIZE,
+        max_ratio=settings.ZIP_MAX_RATIO
+    )
     
     elements = []
-    file_name = os.path.basename(file_path)
-    
-    # HTML files
-    if file_path.endswith('.html'):
-        soup = BeautifulSoup(content, 'html.parser')
-        elements = extract_elements_from_html(soup, file_name)
-    
-    # React/Vue files
-    elif file_path.endswith(('.jsx', '.tsx', '.vue')):
-        # Extract HTML-like parts from JSX/TSX/Vue
-        html_pattern = r'<([a-zA-Z][a-zA-Z0-9]*)[^>]*>(.*?)</\1>'
-        matches = re.findall(html_pattern, content, re.DOTALL)
+    batch = []
+    batch_bytes = 0
+    
+    # Hand members to the parsers in bounded batches as they are decompressed
+    for member_name, data in members:
+        batch.append((member_name, data))
+        batch_bytes += len(data)
         
-        for tag, inner_content in matches:
-            soup = BeautifulSoup(f"<{tag}>{inner_content}</{tag}>", 'html.parser')
-            file_elements = extract_elements_from_html(soup, file_name)
-            elements.extend(file_elements)
+        if batch_bytes >= settings.ZIP_SCAN_BATCH_BYTES:
+            elements.extend(scan_zip_batch(zip_path, batch, use_cache, workers))
+            batch = []
+            batch_bytes = 0
+    
+    if batch:
+        elements.extend(scan_zip_batch(zip_path, batch, use_cache, workers))
     
     return elements
 
-def extract_elements_from_html(soup, file_name: str) -> List[Dict[str, Any]]:
-    """Extract UI elements from BeautifulSoup parsed HTML"""
+def scan_zip_batch(zip_path: str, batch: List[Tuple[str, bytes]], use_cache: bool = True,
+                   workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Scan a batch of (member name, content) pairs read from a zip archive"""
+    labels = [f"{zip_path}:{member_name}" for member_name, _ in batch]
+    
+    return run_scans(scan_component_data_safe, labels,
+                     [data for _, data in batch],
+                     [os.path.basename(member_name) for member_name, _ in batch],
+                     [use_cache] * len(batch),
+                     workers=workers,
+                     source_files=[member_name for member_name, _ in batch])
+
+def run_scans(scan_func, labels: List[str], *scan_args, workers: Optional[int] = None,
+              chunksize: Optional[int] = None, source_files: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Apply a *_safe scan function over argument lists and merge results in order.
+
+    source_files, when given, replaces the file name recorded in each
+    element's source location, e.g. with the path inside the upload.
+    """
+    workers = workers or settings.SCAN_WORKERS
+    
+    if workers > 1 and len(labels) >= settings.SCAN_PARALLEL_MIN_FILES:
+        chunksize = chunksize or settings.SCAN_CHUNKSIZE or max(1, len(labels) // (workers * 4))
+        pool = get_process_pool(workers)
+        results = pool.map(scan_func, *scan_args, chunksize=chunksize)
+    else:
+        results = map(scan_func, *scan_args)
+    
+    elements = []
+    for i, (label, (file_elements, error)) in enumerate(zip(labels, results)):
+        if error:
+            print(f"Error scanning file {label}: {error}")
+            continue
+        
+        if source_files:
+            for element in file_elements:
+                element["properties"]["source"]["file"] = source_files[i]
+        elements.extend(file_elements)
+    
+    return elements
+
+def scan_component_file_safe(file_path: str, use_cache: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Scan a component file, returning the error message instead of raising"""
+    try:
+        return scan_component_file(file_path, use_cache), None
+    except Exception as e:
+        return [], str(e)
+
+def scan_component_data_safe(data: bytes, file_name: str,
+                             use_cache: bool = True) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Scan component file contents, returning the error message instead of raising"""
+    try:
+        return scan_component_data(data, file_name, use_cache), None
+    except Exception as e:
+        return [], str(e)
+
+def scan_component_file(file_path: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+    """Scan a single component file for UI elements"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    
+    return scan_component_data(data, os.path.basename(file_path), use_cache)
+
+def scan_component_data(data: bytes, file_name: str, use_cache: bool = True) -> List[Dict[str, Any]]:
+    """Scan the raw bytes of a component file, using the scan cache when enabled"""
+    # Only parse files whose bytes changed since they were last scanned
+    if use_cache:
+        cache_key = get_cache_key(data, file_name)
+        elements = get_scan_cache().get(cache_key)
+        if elements is not None:
+            return elements
+    
+    elements = scan_component_content(data.decode('utf-8'), file_name)
+    
+    if use_cache:
+        get_scan_cache().set(cache_key, elements)
+    
+    return elements
+
+def scan_component_content(content: str, file_name: str) -> List[Dict[str, Any]]:
+    """Extract UI elements from the source of a component file"""
+    elements = []
+    
+    if file_name.endswith(COMPONENT_EXTENSIONS):
+        # Normalize the markup in one pass so every parser backend sees the
+        # same input and source offsets don't depend on the backend
+        markup = extract_component_markup(content, file_name)
+        fragment = not (file_name.endswith('.html') and '<html' in content.lower())
+        soup = parse_markup(markup, fragment)
+        elements = extract_elements_from_html(soup, file_name, get_line_starts(content))
+    
+    return elements
+
+def parse_markup(markup: str, fragment: bool = True):
+    """Parse markup with the configured HTML_PARSER backend"""
+    backend = settings.HTML_PARSER
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {backend}")
+    
+    soup = BeautifulSoup(markup, backend)
+    
+    # lxml wraps fragments in html/body, which would leak into generated XPaths
+    if fragment and backend == "lxml":
+        for wrapper in (soup.body, soup.html):
+            if wrapper is not None:
+                wrapper.unwrap()
+    
+    return soup
+
+def extract_elements_from_html(soup, file_name: str, line_starts: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Extract UI elements from BeautifulSoup parsed HTML.
+
+    line_starts is given for markup produced by the markup tokenizer,
+    whose elements carry their offset in the original source.
+    """
     elements = []
     interactive_elements = soup.find_all(['button', 'a', 'input', 'select', 'textarea', 'form', 'div', 'span'])
     
+    # Positional XPaths for the whole document, built on first use
+    xpath_index = None
+    
     for elem in interactive_elements:
+        # Locate the element in the source file
+        offset = elem.attrs.pop(OFFSET_ATTRIBUTE, None)
+        if line_starts is not None and offset is not None:
+            line, column = offset_to_position(line_starts, int(offset))
+        else:
+            line = elem.sourceline
+            column = elem.sourcepos + 1 if elem.sourcepos is not None else None
+        
         # Skip elements without attributes or text
         if not elem.attrs and not elem.text.strip():
             continue
@@ -91,7 +319,9 @@ def extract_elements_from_html(soup, file_name: str) -> List[Dict[str, Any]]:
                 selector_type = "xpath"
             else:
                 # Generate complex XPath
-                selector = generate_xpath(elem)
+                if xpath_index is None:
+                    xpath_index = build_xpath_index(soup)
+                selector = generate_xpath(elem, xpath_index)
                 selector_type = "xpath"
         
         # Create element object
@@ -103,7 +333,8 @@ def extract_elements_from_html(soup, file_name: str) -> List[Dict[str, Any]]:
             "selector_type": selector_type,
             "properties": {
                 "text": elem.text.strip() if elem.text else "",
-                "attributes": {k: v for k, v in elem.attrs.items()}
+                "attributes": {k: v for k, v in elem.attrs.items()},
+                "source": {"file": file_name, "line": line, "column": column}
             }
         }
         
@@ -111,26 +342,44 @@ def extract_elements_from_html(soup, file_name: str) -> List[Dict[str, Any]]:
     
     return elements
 
-def generate_xpath(element) -> str:
-    """Generate a unique XPath for an element"""
-    components = []
-    child = element
+def build_xpath_index(soup) -> Dict[int, str]:
+    """Compute the positional XPath of every tag in one pre-order traversal.
+
+    Maps id(tag) to the path generate_xpath would build for it, without
+    re-scanning siblings at every ancestor level of every element.
+    """
+    xpath_index = {}
+    stack = [(soup, "")]
     
-    for parent in element.parents:
-        if parent.name == 'html':
-            break
-        
-        siblings = parent.find_all(child.name, recursive=False)
-        if len(siblings) > 1:
-            index = siblings.index(child) + 1
-            components.append(f"{child.name}[{index}]")
-        else:
-            components.append(child.name)
+    while stack:
+        parent, parent_path = stack.pop()
+        children = [child for child in parent.children if isinstance(child, Tag)]
+        counts = Counter(child.name for child in children)
+        positions = defaultdict(int)
         
-        child = parent
+        for child in children:
+            if parent.name == 'html':
+                # Paths start below the html element
+                path = ""
+            else:
+                positions[child.name] += 1
+                step = f"{child.name}[{positions[child.name]}]" if counts[child.name] > 1 else child.name
+                path = f"{parent_path}/{step}" if parent_path else step
+            
+            xpath_index[id(child)] = path
+            stack.append((child, path))
+    
+    return xpath_index
+
+def generate_xpath(element, xpath_index: Optional[Dict[int, str]] = None) -> str:
+    """Generate a unique XPath for an element"""
+    if xpath_index is None:
+        root = element
+        for root in element.parents:
+            pass
+        xpath_index = build_xpath_index(root)
     
-    components.reverse()
-    return '//' + '/'.join(components)
+    return '//' + xpath_index[id(element)]
 
 def determine_element_name(element, file_name: str) -> str:
     """Create a meaningful name for the element"""
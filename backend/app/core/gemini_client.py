@@ -1,19 +1,303 @@
 import os
 import json
-from typing import List, Dict, Any, Optional
-import google.generativeai as genai
+import random
+import asyncio
+import threading
+from typing import AsyncIterator, List, Dict, Any, Optional
+from app.core.code_scanner import without_source_position
+from app.core.llm_cache import llm_cache
+from app.core.llm_provider import get_provider, TASK_POM, TASK_TESTS
+from app.utils.json_stream import JSONArrayStreamParser
 from config import settings
 
-# Configure the Gemini API client
-genai.configure(api_key=settings.GEMINI_API_KEY)
+class RateLimiter:
+    """Spaces out request starts to stay under a requests-per-minute limit"""
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+    
+    async def acquire(self):
+        if not self.interval:
+            return
+        
+        now = asyncio.get_running_loop().time()
+        wait = self._next_slot - now
+        self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
 
-def generate_pom_with_gemini(elements: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
-    """Use Gemini to enhance POM structure"""
-    # Convert elements to JSON string
-    elements_json = json.dumps(elements, indent=2)
+_loop = None
+_loop_lock = threading.Lock()
+_semaphore = None
+_rate_limiter = RateLimiter(settings.GEMINI_RPM)
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the background event loop that runs every Gemini request.
+
+    Sharing one loop lets the concurrency and rate limits apply across all
+    jobs, and keeps the async gRPC channel bound to a single loop.
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="gemini", daemon=True).start()
+    return _loop
+
+def run_async(coro):
+    """Run a coroutine on the Gemini event loop and wait for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+def llm_enabled() -> bool:
+    """Whether the configured LLM provider can be used"""
+    return get_provider().is_available()
+
+async def generate_content_async(prompt: str, task: str) -> Optional[str]:
+    """Send one prompt under the concurrency and rate limits, retrying transient errors"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, settings.GEMINI_CONCURRENCY))
+    
+    provider = get_provider()
+    for attempt in range(settings.GEMINI_MAX_RETRIES + 1):
+        try:
+            async with _semaphore:
+                await _rate_limiter.acquire()
+                return await provider.generate(prompt, task)
+        except provider.retryable_errors as e:
+            if attempt == settings.GEMINI_MAX_RETRIES:
+                print(f"Error using {provider.name} LLM provider after {attempt + 1} attempts: {str(e)}")
+                return None
+            # Exponential backoff with jitter
+            delay = settings.GEMINI_RETRY_BASE_DELAY * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+        except Exception as e:
+            print(f"Error using {provider.name} LLM provider: {str(e)}")
+            return None
+
+async def stream_content_async(prompt: str, task: str) -> AsyncIterator[str]:
+    """Stream the response text for one prompt under the concurrency and rate limits.
+
+    Transient errors are retried only until the first chunk arrives; a
+    stream that breaks later just ends early.
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(max(1, settings.GEMINI_CONCURRENCY))
+    
+    provider = get_provider()
+    for attempt in range(settings.GEMINI_MAX_RETRIES + 1):
+        started = False
+        try:
+            async with _semaphore:
+                await _rate_limiter.acquire()
+                async for text in provider.stream(prompt, task):
+                    started = True
+                    yield text
+            return
+        except provider.retryable_errors as e:
+            if started or attempt == settings.GEMINI_MAX_RETRIES:
+                print(f"Error streaming from {provider.name} LLM provider: {str(e)}")
+                return
+            # Exponential backoff with jitter
+            delay = settings.GEMINI_RETRY_BASE_DELAY * (2 ** attempt)
+            await asyncio.sleep(delay + random.uniform(0, delay))
+        except Exception as e:
+            print(f"Error streaming from {provider.name} LLM provider: {str(e)}")
+            return
+
+def parse_json_array(response_text: Optional[str]) -> Optional[List[Any]]:
+    """Extract the JSON array from a Gemini response"""
+    if not response_text:
+        return None
+    
+    parser = JSONArrayStreamParser()
+    parser.feed(response_text)
+    if not parser.done:
+        print("No valid JSON array found in LLM response")
+        return None
+    return parser.items
+
+async def generate_json_array_async(prompt: str, task: str, regenerate: bool = False) -> Optional[List[Any]]:
+    """Get the parsed JSON array for a prompt, from the response cache when possible"""
+    model_name = get_provider().model_name
+    
+    if regenerate:
+        llm_cache.record_bypass()
+    else:
+        entry = llm_cache.get(model_name, prompt)
+        if entry is not None:
+            return entry["parsed"]
     
-    # Create prompt for Gemini
-    prompt = f"""
+    response_text = await generate_content_async(prompt, task)
+    parsed = parse_json_array(response_text)
+    
+    # Only usable responses are cached
+    if parsed is not None:
+        llm_cache.set(model_name, prompt, response_text, parsed)
+    return parsed
+
+async def stream_json_array_async(prompt: str, task: str, regenerate: bool = False) -> AsyncIterator[Any]:
+    """Yield the items of the JSON array in a response as each one completes"""
+    model_name = get_provider().model_name
+    
+    if regenerate:
+        llm_cache.record_bypass()
+    else:
+        entry = llm_cache.get(model_name, prompt)
+        if entry is not None:
+            for item in entry["parsed"]:
+                yield item
+            return
+    
+    parser = JSONArrayStreamParser()
+    chunks = []
+    async for text in stream_content_async(prompt, task):
+        chunks.append(text)
+        for item in parser.feed(text):
+            yield item
+    
+    # Only complete responses are cached
+    if parser.done:
+        llm_cache.set(model_name, prompt, "".join(chunks), parser.items)
+
+async def merge_streams(streams: List[AsyncIterator[Any]]) -> AsyncIterator[Any]:
+    """Yield items from several async iterators in the order they arrive"""
+    queue = asyncio.Queue()
+    finished = object()
+    
+    async def drain(stream):
+        try:
+            async for item in stream:
+                await queue.put(item)
+        finally:
+            await queue.put(finished)
+    
+    tasks = [asyncio.ensure_future(drain(stream)) for stream in streams]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            item = await queue.get()
+            if item is finished:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def relay_stream(stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Iterate a stream on the Gemini event loop from any other event loop"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    finished = object()
+    
+    async def pump():
+        try:
+            async for item in stream:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+    
+    future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+    try:
+        while True:
+            item = await queue.get()
+            if item is finished:
+                break
+            yield item
+        # Surface errors raised by the stream
+        future.result()
+    finally:
+        # Stops Gemini requests when the consumer goes away
+        future.cancel()
+
+def estimate_tokens(data: Any) -> int:
+    """Rough token count of a JSON value (about four characters per token)"""
+    return len(json.dumps(data)) // 4 + 1
+
+def group_elements_by_page(elements: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Group elements under their page; the page record comes first in each group"""
+    pages = {element["id"]: [element] for element in elements if element.get("type") == "page"}
+    orphans = []
+    
+    for element in elements:
+        if element.get("type") == "page":
+            continue
+        parent_id = element.get("parent_id")
+        if parent_id in pages:
+            pages[parent_id].append(element)
+        else:
+            orphans.append(element)
+    
+    groups = list(pages.values())
+    if orphans:
+        groups.append(orphans)
+    return groups
+
+def batch_elements_by_page(elements: List[Dict[str, Any]], max_tokens: int) -> List[List[Dict[str, Any]]]:
+    """Pack whole pages into batches that fit a token budget.
+
+    A page larger than the budget is split, and every part repeats the
+    page record so Gemini keeps the page context.
+    """
+    batches = []
+    current = []
+    current_tokens = 0
+    
+    for group in group_elements_by_page(elements):
+        group_tokens = sum(estimate_tokens(element) for element in group)
+        
+        if group_tokens > max_tokens:
+            header = [group[0]] if group[0].get("type") == "page" else []
+            chunk = list(header)
+            chunk_tokens = sum(estimate_tokens(element) for element in header)
+            for element in group[len(header):]:
+                element_tokens = estimate_tokens(element)
+                if len(chunk) > len(header) and chunk_tokens + element_tokens > max_tokens:
+                    batches.append(chunk)
+                    chunk = list(header)
+                    chunk_tokens = sum(estimate_tokens(element) for element in header)
+                chunk.append(element)
+                chunk_tokens += element_tokens
+            batches.append(chunk)
+            continue
+        
+        if current and current_tokens + group_tokens > max_tokens:
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.extend(group)
+        current_tokens += group_tokens
+    
+    if current:
+        batches.append(current)
+    return batches
+
+def merge_elements(batches: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Merge per-batch element lists, joining pages that were split across batches"""
+    merged = {}
+    for batch in batches:
+        for element in batch:
+            element_id = element.get("id")
+            if element_id not in merged:
+                merged[element_id] = element
+                continue
+            
+            # A split page: keep the first record and collect all its children
+            children = merged[element_id].setdefault("children", [])
+            for child_id in element.get("children") or []:
+                if child_id not in children:
+                    children.append(child_id)
+    
+    return list(merged.values())
+
+def build_pom_prompt(elements: List[Dict[str, Any]]) -> str:
+    """Build the POM enhancement prompt for a batch of elements"""
+    # Source positions would change the prompt, and miss the cache, whenever lines move
+    elements_json = json.dumps([without_source_position(element) for element in elements], indent=2)
+    
+    return f"""
 As an AI specialized in UI test automation, I need your help to analyze and improve a Page Object Model (POM) structure.
 
 Here is a JSON representation of UI elements extracted from a web application:
@@ -29,41 +313,20 @@ Please analyze this structure and provide an improved version with the following
 
 Return only the improved JSON structure without any additional explanations. The structure should be valid JSON and should maintain the same schema as the input with keys like "id", "name", "type", "selector", "selector_type", etc.
 """
-    
-    try:
-        # Generate response from Gemini
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
-        
-        # Extract and parse JSON from response
-        response_text = response.text
-        # Find JSON start and end indices
-        json_start = response_text.find('[')
-        json_end = response_text.rfind(']') + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            json_str = response_text[json_start:json_end]
-            try:
-                improved_elements = json.loads(json_str)
-                return improved_elements
-            except json.JSONDecodeError:
-                print("Failed to parse JSON from Gemini response")
-                return None
-        else:
-            print("No valid JSON found in Gemini response")
-            return None
-    
-    except Exception as e:
-        print(f"Error using Gemini API: {str(e)}")
-        return None
 
-def generate_tests_with_gemini(elements: List[Dict[str, Any]]) -> List[Dict[str, str]]:
-    """Generate test scripts using Gemini API"""
-    # Convert elements to JSON string
-    elements_json = json.dumps(elements, indent=2)
+def build_tests_prompt(elements: List[Dict[str, Any]], use_driver_pool: bool = False) -> str:
+    """Build the test generation prompt for a batch of elements"""
+    # Source positions would change the prompt, and miss the cache, whenever lines move
+    elements_json = json.dumps([without_source_position(element) for element in elements], indent=2)
     
-    # Create prompt for Gemini
-    prompt = f"""
+    if use_driver_pool:
+        driver_guideline = ("Get the driver with acquire_driver() in setUp and return it with release_driver(self.driver) "
+                            "in tearDown, both imported from a 'driver_pool.py' file; never create or quit drivers directly")
+    else:
+        driver_guideline = ("Create the driver with create_driver() in setUp and quit it in tearDown, importing it "
+                            "from a 'driver_factory.py' file; never configure ChromeDriver or its options directly")
+    
+    return f"""
 As an AI specialized in UI test automation, I need your help to generate Python test scripts for a web application using Selenium.
 
 Here is a JSON representation of a Page Object Model (POM) with UI elements extracted from the application:
@@ -76,8 +339,8 @@ Based on these elements, generate complete Python test scripts following these g
    - A navigation test to verify page elements are present
    - An interaction test that performs actions on interactive elements
 3. Include proper setup and teardown methods
-4. Use the ChromeDriver with webdriver-manager
-5. Import from a 'page_objects.py' file that contains the POM classes
+4. {driver_guideline}
+5. Import the page classes you use from the 'page_objects' module, e.g. `from page_objects import LoginPage`
 6. Add docstrings and comments to explain the test logic
 7. Include assertions to verify expected behavior
 
@@ -87,30 +350,75 @@ Return a list of test scripts, each as a JSON object with:
 
 The response should be a valid JSON array of these objects.
 """
+
+async def generate_pom_with_gemini_async(elements: List[Dict[str, Any]],
+                                         regenerate: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """Enhance a POM structure with concurrent, page-batched Gemini requests"""
+    batches = batch_elements_by_page(elements, settings.GEMINI_BATCH_TOKENS)
+    results = await asyncio.gather(*(generate_json_array_async(build_pom_prompt(batch), TASK_POM, regenerate)
+                                     for batch in batches))
     
-    try:
-        # Generate response from Gemini
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(prompt)
-        
-        # Extract and parse JSON from response
-        response_text = response.text
-        # Find JSON start and end indices
-        json_start = response_text.find('[')
-        json_end = response_text.rfind(']') + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            json_str = response_text[json_start:json_end]
-            try:
-                test_scripts = json.loads(json_str)
-                return test_scripts
-            except json.JSONDecodeError:
-                print("Failed to parse JSON from Gemini response")
-                return []
-        else:
-            print("No valid JSON found in Gemini response")
-            return []
+    if not any(results):
+        return None
     
-    except Exception as e:
-        print(f"Error using Gemini API for test generation: {str(e)}")
-        return []
\ No newline at end of file
+    # Batches Gemini could not improve keep their original elements
+    return merge_elements([result or batch for batch, result in zip(batches, results)])
+
+async def generate_tests_with_gemini_async(elements: List[Dict[str, Any]],
+                                           use_driver_pool: bool = False,
+                                           regenerate: bool = False) -> List[Dict[str, str]]:
+    """Generate test scripts with concurrent, page-batched Gemini requests"""
+    batches = batch_elements_by_page(elements, settings.GEMINI_BATCH_TOKENS)
+    results = await asyncio.gather(*(generate_json_array_async(build_tests_prompt(batch, use_driver_pool), TASK_TESTS, regenerate)
+                                     for batch in batches))
+    
+    test_scripts = []
+    for result in results:
+        test_scripts.extend(result or [])
+    return test_scripts
+
+def generate_pom_with_gemini(elements: List[Dict[str, Any]], regenerate: bool = False) -> Optional[List[Dict[str, Any]]]:
+    """Use Gemini to enhance POM structure"""
+    return run_async(generate_pom_with_gemini_async(elements, regenerate))
+
+def generate_tests_with_gemini(elements: List[Dict[str, Any]], use_driver_pool: bool = False,
+                               regenerate: bool = False) -> List[Dict[str, str]]:
+    """Generate test scripts using Gemini API"""
+    return run_async(generate_tests_with_gemini_async(elements, use_driver_pool, regenerate))
+
+async def stream_pom_batch_async(batch: List[Dict[str, Any]], regenerate: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """Stream the enhanced elements of one batch, falling back to the originals Gemini did not return"""
+    returned_ids = set()
+    async for element in stream_json_array_async(build_pom_prompt(batch), TASK_POM, regenerate):
+        if isinstance(element, dict):
+            returned_ids.add(element.get("id"))
+            yield element
+    
+    # Same rule as the batch call: a batch Gemini could not improve keeps its elements
+    if not returned_ids:
+        for element in batch:
+            yield element
+
+async def stream_pom_with_gemini_async(elements: List[Dict[str, Any]],
+                                       regenerate: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """Stream enhanced POM elements from concurrent, page-batched Gemini requests"""
+    batches = batch_elements_by_page(elements, settings.GEMINI_BATCH_TOKENS)
+    async for element in merge_streams([stream_pom_batch_async(batch, regenerate) for batch in batches]):
+        yield element
+
+async def stream_tests_with_gemini_async(elements: List[Dict[str, Any]], use_driver_pool: bool = False,
+                                         regenerate: bool = False) -> AsyncIterator[Dict[str, str]]:
+    """Stream test scripts from concurrent, page-batched Gemini requests"""
+    batches = batch_elements_by_page(elements, settings.GEMINI_BATCH_TOKENS)
+    streams = [stream_json_array_async(build_tests_prompt(batch, use_driver_pool), TASK_TESTS, regenerate) for batch in batches]
+    async for test_script in merge_streams(streams):
+        yield test_script
+
+def stream_pom_with_gemini(elements: List[Dict[str, Any]], regenerate: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """Stream enhanced POM elements as Gemini produces them; usable from any event loop"""
+    return relay_stream(stream_pom_with_gemini_async(elements, regenerate))
+
+def stream_tests_with_gemini(elements: List[Dict[str, Any]], use_driver_pool: bool = False,
+                             regenerate: bool = False) -> AsyncIterator[Dict[str, str]]:
+    """Stream test scripts as Gemini produces them; usable from any event loop"""
+    return relay_stream(stream_tests_with_gemini_async(elements, use_driver_pool, regenerate))
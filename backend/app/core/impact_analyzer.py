@@ -0,0 +1,205 @@
+import os
+import ast
+import json
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from app.core.code_scanner import COMPONENT_EXTENSIONS
+from app.core.pom_generator import PAGE_OBJECTS_MODULE
+from app.core.pom_index import PomIndex
+from app.utils.file_utils import iter_zip_members
+from config import settings
+
+# Source file -> element -> test map, written next to the tests
+IMPACT_MAP_FILE = "impact_map.json"
+
+# Page object methods generated for an element, see pom_generator.ACTION_TEMPLATES
+ACTION_PREFIXES = ("click_", "set_", "select_")
+
+def build_impact_map(pom_index: PomIndex, test_modules: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    """Map source files to POM elements and POM elements to the tests that use them.
+
+    test_modules yields module names with their source, so modules can
+    be read one at a time. A test depends on an element when it, or a
+    non-test method of its class such as setUp, uses the element's page
+    object attribute or action method. Tests that use no element, and
+    modules that cannot be parsed, are listed as unmapped, so impact runs
+    can still include them.
+    """
+    pages_by_name = {}
+    elements = {}
+    files = {}
+    for page in pom_index.pages:
+        pages_by_name.setdefault(page.name, []).append(page)
+        for element in pom_index.children(page.id):
+            source_file = ((element.properties or {}).get("source") or {}).get("file")
+            elements[element.id] = {"name": element.name, "page": page.name, "file": source_file}
+            if source_file:
+                files.setdefault(normalize_path(source_file), []).append(element.id)
+    
+    tests = {}
+    unmapped = []
+    for module_name, code in test_modules:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            unmapped.append(module_name)
+            continue
+        
+        # Only the elements of the page classes a module imports, or every page if it imports none
+        imported = imported_page_names(tree)
+        pages = [page for name in imported for page in pages_by_name.get(name, [])] or pom_index.pages
+        attribute_elements = {}
+        for page in pages:
+            for element in pom_index.children(page.id):
+                name = element.name.replace('-', '_')
+                for attribute in (name,) + tuple(prefix + name for prefix in ACTION_PREFIXES):
+                    attribute_elements.setdefault(attribute, set()).add(element.id)
+        
+        for test_id, attributes in test_attributes(tree, module_name).items():
+            used = set()
+            for attribute in attributes:
+                used |= attribute_elements.get(attribute, set())
+            if used:
+                tests[test_id] = sorted(used)
+            else:
+                unmapped.append(test_id)
+    
+    return {"files": files, "elements": elements, "tests": tests, "unmapped": unmapped}
+
+def imported_page_names(tree: ast.Module) -> List[str]:
+    """Names imported from the page_objects module or package"""
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and (node.module or "").split('.')[0] == PAGE_OBJECTS_MODULE:
+            names.extend(alias.name for alias in node.names)
+    return names
+
+def test_attributes(tree: ast.Module, module_name: str) -> Dict[str, Set[str]]:
+    """Attribute names used by each test method, keyed by unittest test ID"""
+    tests = {}
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        
+        shared = set()
+        methods = {}
+        for item in node.body:
+            if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            attributes = {child.attr for child in ast.walk(item) if isinstance(child, ast.Attribute)}
+            if item.name.startswith("test"):
+                methods[item.name] = attributes
+            else:
+                # setUp and helpers run for every test of the class
+                shared |= attributes
+        
+        for method_name, attributes in methods.items():
+            tests[f"{module_name}.{node.name}.{method_name}"] = attributes | shared
+    return tests
+
+def save_impact_map(test_directory: str, impact_map: Dict[str, Any]):
+    """Write the impact map next to the tests"""
+    with open(os.path.join(test_directory, IMPACT_MAP_FILE), 'w', encoding='utf-8') as f:
+        json.dump(impact_map, f, indent=2)
+
+def load_impact_map(test_directory: str) -> Optional[Dict[str, Any]]:
+    """Read the impact map written when the tests were generated"""
+    try:
+        with open(os.path.join(test_directory, IMPACT_MAP_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def normalize_path(path: str) -> str:
+    """Compare paths from scans, zips and diffs in one form"""
+    path = path.replace('\\', '/').strip()
+    while path.startswith('./'):
+        path = path[2:]
+    return path.lstrip('/')
+
+def same_file(a: str, b: str) -> bool:
+    """Whether two normalized paths name the same file, allowing for different roots"""
+    return a == b or a.endswith('/' + b) or b.endswith('/' + a)
+
+def changed_files_from_diff(diff: str) -> List[str]:
+    """Paths touched by a unified or git diff"""
+    paths = []
+    for line in diff.splitlines():
+        if line.startswith(('--- ', '+++ ')):
+            path = line[4:].split('\t')[0].strip()
+        elif line.startswith(('rename from ', 'rename to ')):
+            path = line.split(' ', 2)[2].strip()
+        else:
+            continue
+        
+        if path == '/dev/null':
+            continue
+        if path.startswith(('a/', 'b/')) and line.startswith(('--- ', '+++ ')):
+            path = path[2:]
+        paths.append(normalize_path(path))
+    return list(dict.fromkeys(paths))
+
+def source_digests(source_path: str, source_name: Optional[str] = None) -> Dict[str, str]:
+    """Content hash of every component file in an upload: a zip, a directory or a single file.
+
+    Paths are the ones the scanner records for the elements it finds.
+    """
+    digests = {}
+    if source_path.lower().endswith('.zip'):
+        for member_name, data in iter_zip_members(
+            source_path,
+            COMPONENT_EXTENSIONS,
+            max_members=settings.ZIP_MAX_MEMBERS,
+            max_total_size=settings.ZIP_MAX_TOTAL_SIZE,
+            max_ratio=settings.ZIP_MAX_RATIO
+        ):
+            digests[normalize_path(member_name)] = hashlib.sha1(data).hexdigest()
+    elif os.path.isdir(source_path):
+        for root, _, files in os.walk(source_path):
+            for file in files:
+                if file.endswith(COMPONENT_EXTENSIONS):
+                    path = os.path.join(root, file)
+                    digests[normalize_path(os.path.relpath(path, source_path))] = file_digest(path)
+    elif os.path.exists(source_path):
+        digests[normalize_path(source_name or os.path.basename(source_path))] = file_digest(source_path)
+    return digests
+
+def file_digest(path: str) -> str:
+    """SHA-1 of a file's content, read in blocks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def changed_files_between(old_path: str, new_path: str, new_name: Optional[str] = None) -> List[str]:
+    """Component files added, removed or modified between two uploads"""
+    old = source_digests(old_path)
+    # A single replacement file keeps the name the project was scanned with
+    new = source_digests(new_path, new_name)
+    return sorted(path for path in old.keys() | new.keys() if old.get(path) != new.get(path))
+
+def select_impacted_tests(impact_map: Dict[str, Any], changed_files: Iterable[str],
+                          include_unmapped: bool = True) -> Dict[str, Any]:
+    """Pick the tests that depend on elements of the changed files.
+
+    Returns the tests to run, the affected elements and the changed files
+    that map to elements. When any changed file maps to elements, unmapped
+    tests are included unless asked not to, because nothing rules out
+    that they are affected.
+    """
+    changed = [normalize_path(path) for path in changed_files]
+    matched_files = [mapped for mapped in impact_map["files"]
+                     if any(same_file(mapped, path) for path in changed)]
+    affected = {element_id for mapped in matched_files for element_id in impact_map["files"][mapped]}
+    
+    selected = [test_id for test_id, element_ids in impact_map["tests"].items()
+                if affected.intersection(element_ids)]
+    if include_unmapped and matched_files:
+        selected.extend(impact_map["unmapped"])
+    return {
+        "tests": selected,
+        "elements": sorted(affected),
+        "files": matched_files,
+        "skipped": len(impact_map["tests"]) + len(impact_map["unmapped"]) - len(selected)
+    }
@@ -0,0 +1,245 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from app.core.storage import BaseStorage, storage
+from app.models.project import Job
+from config import settings
+
+# Job states
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCESS = "SUCCESS"
+FAILURE = "FAILURE"
+CANCELLED = "CANCELLED"
+
+FINISHED_STATES = (SUCCESS, FAILURE, CANCELLED)
+
+# Executions of a job that stopped with it
+UNFINISHED_EXECUTION_STATES = ("QUEUED", "RUNNING")
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled"""
+
+class JobContext:
+    """Handle passed to a running job for progress reporting and cancellation"""
+    def __init__(self, manager: "JobManager", job_id: str):
+        self.manager = manager
+        self.job_id = job_id
+        self.cancel_event = threading.Event()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+    
+    def check_cancelled(self):
+        """Stop the job if a cancel was requested"""
+        if self.cancelled:
+            raise JobCancelled()
+    
+    def update_progress(self, progress: float, message: Optional[str] = None):
+        """Record job progress (0.0 - 1.0) and an optional status message"""
+        self.check_cancelled()
+        self.manager._update(self.job_id, progress=max(0.0, min(1.0, progress)), message=message)
+
+class JobManager:
+    """Runs blocking jobs on a bounded worker pool and tracks their state.
+
+    Every state change is written to storage, so other worker processes
+    can report on jobs they did not start. Only the process running a job
+    can cancel it.
+    
+    Each job records the process that owns it, which keeps its heartbeat
+    fresh while the job is unfinished. Unfinished jobs whose owner has
+    exited or stopped beating, e.g. after a restart, are failed (or
+    cancelled if they never started) together with their executions, on
+    startup and whenever they are read.
+    """
+    def __init__(self, max_workers: int, storage: BaseStorage,
+                 heartbeat_interval: float = settings.JOB_HEARTBEAT_INTERVAL,
+                 heartbeat_timeout: float = settings.JOB_HEARTBEAT_TIMEOUT):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._storage = storage
+        # Unfinished jobs started by this process
+        self._jobs: Dict[str, Job] = {}
+        self._contexts: Dict[str, JobContext] = {}
+        self._futures = {}
+        # Reentrant so cancel can finish a stored job while holding it
+        self._lock = threading.RLock()
+        # The boot id tells this process apart from earlier ones with the same pid
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heartbeat_interval = heartbeat_interval
+        self._heartbeat_timeout = heartbeat_timeout
+        
+        self.recover()
+        threading.Thread(target=self._beat, name="job-heartbeat", daemon=True).start()
+    
+    def submit(self, job_type: str, func: Callable[..., Dict[str, Any]], *args,
+               project_id: Optional[str] = None, job_id: Optional[str] = None, **kwargs) -> Job:
+        """Enqueue a job; func receives a JobContext followed by args and kwargs.
+
+        A job_id can be chosen up front so records created before the job
+        is submitted can refer to it.
+        """
+        job_id = job_id or str(uuid.uuid4())
+        job = Job(id=job_id, type=job_type, project_id=project_id, status=QUEUED,
+                  owner=self.owner, heartbeat=time.time())
+        context = JobContext(self, job_id)
+        
+        with self._lock:
+            self._storage.save_job(job)
+            self._jobs[job_id] = job
+            self._contexts[job_id] = context
+            self._futures[job_id] = self._executor.submit(self._run, context, func, args, kwargs)
+        
+        return job.model_copy()
+    
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a snapshot of a job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job.model_copy()
+        return self._reap(self._storage.get_job(job_id))
+    
+    def list(self, project_id: Optional[str] = None) -> list:
+        """List job snapshots, optionally filtered by project"""
+        return [self._reap(job) for job in self._storage.list_jobs(project_id)]
+    
+    def recover(self) -> int:
+        """Finish the stored jobs whose owner is gone; returns how many were finished"""
+        orphans = [job for job in self._storage.list_jobs() if self._orphaned(job)]
+        return sum(self._finish_orphan(job) is not None for job in orphans)
+    
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job or request a running job to stop"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                # Finished, unknown, running in another process, or left behind by a dead one
+                return self._reap(self._storage.get_job(job_id), CANCELLED)
+            
+            if job.status not in FINISHED_STATES:
+                self._contexts[job_id].cancel_event.set()
+                # Jobs that have not started yet are dropped from the queue
+                future = self._futures.get(job_id)
+                if future is not None and future.cancel():
+                    job.status = CANCELLED
+                    job.message = "Cancelled before start"
+                    self._storage.save_job(job)
+                    self._jobs.pop(job_id, None)
+                    self._futures.pop(job_id, None)
+                    self._contexts.pop(job_id, None)
+            
+            return job.model_copy()
+    
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            for key, value in fields.items():
+                if value is not None:
+                    setattr(job, key, value)
+            job.heartbeat = time.time()
+            self._storage.save_job(job)
+    
+    def _beat(self):
+        while True:
+            time.sleep(self._heartbeat_interval)
+            try:
+                with self._lock:
+                    for job in self._jobs.values():
+                        job.heartbeat = time.time()
+                        self._storage.save_job(job)
+            except Exception as e:
+                print(f"Error recording job heartbeats: {str(e)}")
+    
+    def _owner_alive(self, owner: Optional[str]) -> Optional[bool]:
+        """Whether the owning process is running; None when it cannot be told from here"""
+        if owner is None:
+            # Recorded before jobs had owners
+            return False
+        if owner == self.owner:
+            # Unfinished jobs of this process are held in memory until they finish
+            return False
+        host, _, rest = owner.partition(":")
+        pid = rest.partition(":")[0]
+        if host != socket.gethostname() or not pid.isdigit():
+            return None
+        if int(pid) == os.getpid():
+            # An earlier process that had the same pid
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            # Exists but belongs to another user
+            pass
+        return True
+    
+    def _orphaned(self, job: Job) -> bool:
+        """Whether a stored job is unfinished although no process is running it"""
+        if job.status in FINISHED_STATES:
+            return False
+        with self._lock:
+            if job.id in self._jobs:
+                return False
+        if self._owner_alive(job.owner) is False:
+            return True
+        # A live pid may have been reused, so a stopped heartbeat also counts
+        return job.heartbeat is None or time.time() - job.heartbeat > self._heartbeat_timeout
+    
+    def _reap(self, job: Optional[Job], status: Optional[str] = None) -> Optional[Job]:
+        if job is not None and self._orphaned(job):
+            return self._finish_orphan(job, status) or self._storage.get_job(job.id)
+        return job
+    
+    def _finish_orphan(self, job: Job, status: Optional[str] = None) -> Optional[Job]:
+        """Record a job left behind by a dead process as finished, with its executions.
+
+        Returns None when the job finished on its own since it was read.
+        """
+        stored = self._storage.get_job(job.id)
+        if stored is None or stored.status in FINISHED_STATES:
+            return None
+        job = stored
+        job.status = status or (CANCELLED if job.status == QUEUED else FAILURE)
+        if job.status == CANCELLED:
+            job.message = "Cancelled"
+        else:
+            job.error = "The worker running this job stopped before it finished"
+        self._storage.save_job(job)
+        
+        if job.project_id is None:
+            return
+        for execution in self._storage.list_executions(job.project_id):
+            if execution.job_id == job.id and execution.status in UNFINISHED_EXECUTION_STATES:
+                execution.status = "CANCELLED" if job.status == CANCELLED else "ERROR"
+                if job.error:
+                    execution.result = {**execution.result, "error": job.error}
+                self._storage.save_execution(execution)
+        return job
+    
+    def _run(self, context: JobContext, func, args, kwargs):
+        try:
+            if context.cancelled:
+                raise JobCancelled()
+            
+            self._update(context.job_id, status=RUNNING)
+            result = func(context, *args, **kwargs)
+            self._update(context.job_id, status=SUCCESS, progress=1.0, result=result)
+        except JobCancelled:
+            self._update(context.job_id, status=CANCELLED, message="Cancelled")
+        except Exception as e:
+            print(f"Error running job {context.job_id}: {str(e)}")
+            self._update(context.job_id, status=FAILURE, error=str(e))
+        finally:
+            with self._lock:
+                self._jobs.pop(context.job_id, None)
+                self._futures.pop(context.job_id, None)
+                self._contexts.pop(context.job_id, None)
+
+job_manager = JobManager(max_workers=settings.JOB_WORKERS, storage=storage)
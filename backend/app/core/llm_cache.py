@@ -0,0 +1,83 @@
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from app.utils.disk_cache import DiskCache
+from config import settings
+
+class LLMCache:
+    """Persistent cache of LLM responses keyed by model name and normalized prompt.
+
+    Entries hold the raw response text and its parsed form. They expire
+    after ttl seconds and the underlying DiskCache evicts least recently
+    used entries beyond max_bytes. Hit and miss counters are per process.
+    """
+    def __init__(self, directory: str, max_bytes: int, ttl: int):
+        self._cache = DiskCache(directory, max_bytes)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "bypassed": 0, "stores": 0}
+    
+    @staticmethod
+    def normalize_prompt(prompt: str) -> str:
+        """Collapse whitespace so formatting-only differences share an entry"""
+        return " ".join(prompt.split())
+    
+    def make_key(self, model_name: str, prompt: str) -> str:
+        """Hash the model name and normalized prompt into a cache key"""
+        digest = hashlib.sha256()
+        digest.update(f"{model_name}\0".encode('utf-8'))
+        digest.update(self.normalize_prompt(prompt).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+    
+    def get(self, model_name: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return the cached {"raw", "parsed"} entry for a prompt, or None"""
+        key = self.make_key(model_name, prompt)
+        entry = self._cache.get(key)
+        if entry is None:
+            self._count("misses")
+            return None
+        
+        if self.ttl and time.time() - entry.get("created_at", 0) > self.ttl:
+            self._cache.delete(key)
+            self._count("expired")
+            self._count("misses")
+            return None
+        
+        self._count("hits")
+        return entry
+    
+    def set(self, model_name: str, prompt: str, raw: str, parsed: Any):
+        """Store a response and its parsed form"""
+        self._cache.set(self.make_key(model_name, prompt), {
+            "model": model_name,
+            "created_at": time.time(),
+            "raw": raw,
+            "parsed": parsed
+        })
+        self._count("stores")
+    
+    def record_bypass(self):
+        """Count a lookup skipped because regeneration was forced"""
+        self._count("bypassed")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Report counters and cache size"""
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["size_bytes"] = self._cache.total_bytes
+        stats["max_bytes"] = self._cache.max_bytes
+        stats["ttl"] = self.ttl
+        return stats
+    
+    def clear(self):
+        """Remove every cached response"""
+        self._cache.clear()
+
+llm_cache = LLMCache(settings.LLM_CACHE_DIR, settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_TTL)
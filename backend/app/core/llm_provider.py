@@ -0,0 +1,185 @@
+import re
+import json
+import random
+import asyncio
+import threading
+from typing import AsyncIterator, Optional, Tuple
+from app.utils.json_stream import JSONArrayStreamParser
+from config import settings
+
+LLM_PROVIDERS = ("gemini", "stub")
+
+# What a prompt asks for; lets providers that do not read prose answer in kind
+TASK_POM = "pom"
+TASK_TESTS = "tests"
+
+class LLMProvider:
+    """Interface for the model backends used by gemini_client.
+
+    gemini_client handles batching, caching, rate limiting and retries;
+    a provider only turns one prompt into response text.
+    """
+    name = ""
+    # Errors gemini_client retries with backoff
+    retryable_errors: Tuple[type, ...] = ()
+    
+    @property
+    def model_name(self) -> str:
+        """Name recorded in response cache keys"""
+        raise NotImplementedError
+    
+    def is_available(self) -> bool:
+        """Whether the provider is configured well enough to be called"""
+        return True
+    
+    async def generate(self, prompt: str, task: str) -> str:
+        """Return the complete response text for a prompt"""
+        raise NotImplementedError
+    
+    async def stream(self, prompt: str, task: str) -> AsyncIterator[str]:
+        """Yield the response text for a prompt in chunks"""
+        yield await self.generate(prompt, task)
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through google-generativeai, configured on first use"""
+    name = "gemini"
+    
+    def __init__(self, api_key: str, model_name: str):
+        from google.api_core import exceptions as google_exceptions
+        
+        self.api_key = api_key
+        self._model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        self.retryable_errors = (
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.InternalServerError,
+        )
+    
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+    
+    def is_available(self) -> bool:
+        return bool(self.api_key)
+    
+    def get_model(self):
+        """Configure the client and create the shared model instance once"""
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+                
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self._model_name)
+            return self._model
+    
+    async def generate(self, prompt: str, task: str) -> str:
+        response = await self.get_model().generate_content_async(prompt)
+        return response.text
+    
+    async def stream(self, prompt: str, task: str) -> AsyncIterator[str]:
+        response = await self.get_model().generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            yield chunk.text
+
+class StubProviderError(Exception):
+    """Simulated transient failure of the stub provider"""
+
+class StubProvider(LLMProvider):
+    """Deterministic local stand-in for benchmarks and load tests.
+
+    Responses are derived from the elements embedded in the prompt: POM
+    prompts get the elements back with a description added, and test
+    prompts get one self-contained unittest module per page. Each call
+    takes `latency` seconds and fails with StubProviderError at
+    `failure_rate`, drawn from a seeded random generator.
+    """
+    name = "stub"
+    retryable_errors = (StubProviderError,)
+    CHUNK_SIZE = 64
+    
+    def __init__(self, latency: float, failure_rate: float, seed: int):
+        self.latency = max(0.0, latency)
+        self.failure_rate = min(1.0, max(0.0, failure_rate))
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    @property
+    def model_name(self) -> str:
+        return "stub"
+    
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.failure_rate
+    
+    def build_response(self, prompt: str, task: str) -> str:
+        """Build the response text for a prompt without any delay"""
+        parser = JSONArrayStreamParser()
+        parser.feed(prompt)
+        elements = [element for element in parser.items if isinstance(element, dict)]
+        
+        if task == TASK_TESTS:
+            result = [build_stub_test_script(page, elements) for page in elements if page.get("type") == "page"]
+        else:
+            result = [dict(element, description=f"{element.get('type', 'element')} {element.get('name', '')}".strip())
+                      for element in elements]
+        
+        return "```json\n" + json.dumps(result, indent=2) + "\n```"
+    
+    async def generate(self, prompt: str, task: str) -> str:
+        await asyncio.sleep(self.latency)
+        if self._should_fail():
+            raise StubProviderError("Simulated stub provider failure")
+        return self.build_response(prompt, task)
+    
+    async def stream(self, prompt: str, task: str) -> AsyncIterator[str]:
+        if self._should_fail():
+            await asyncio.sleep(self.latency)
+            raise StubProviderError("Simulated stub provider failure")
+        
+        # Spread the latency over the chunks like a real stream
+        response_text = self.build_response(prompt, task)
+        chunk_count = max(1, -(-len(response_text) // self.CHUNK_SIZE))
+        for start in range(0, len(response_text), self.CHUNK_SIZE):
+            await asyncio.sleep(self.latency / chunk_count)
+            yield response_text[start:start + self.CHUNK_SIZE]
+
+def build_stub_test_script(page: dict, elements: list) -> dict:
+    """Build a runnable test module for one page of a stub response"""
+    class_name = re.sub(r'\W', '', page.get("name") or "Page") or "Page"
+    child_count = sum(1 for element in elements if element.get("parent_id") == page.get("id"))
+    
+    code = f"""import unittest
+
+class Test{class_name}(unittest.TestCase):
+    \"\"\"Stub test generated for {class_name}\"\"\"
+
+    def test_page_has_elements(self):
+        self.assertGreaterEqual({child_count}, 0)
+
+if __name__ == '__main__':
+    unittest.main()
+"""
+    return {"name": f"test_{class_name.lower()}.py", "code": code}
+
+def create_provider(name: str = settings.LLM_PROVIDER) -> LLMProvider:
+    """Create the LLM provider named in settings"""
+    if name == "gemini":
+        return GeminiProvider(settings.GEMINI_API_KEY, settings.GEMINI_MODEL)
+    if name == "stub":
+        return StubProvider(settings.LLM_STUB_LATENCY, settings.LLM_STUB_FAILURE_RATE, settings.LLM_STUB_SEED)
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+def get_provider() -> LLMProvider:
+    """Get the shared LLM provider"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = create_provider()
+        return _provider
@@ -0,0 +1,262 @@
+"""Random access to execution logs, plain or compressed.
+
+A log is written as plain text while its execution runs. When the
+execution finishes, archive_log writes a line index next to it and,
+with LOG_COMPRESSION=gzip, replaces it with a gzip file made of
+independently compressed blocks. The index records where each block
+starts in the text and in the gzip file and how many lines come before
+it, so byte ranges, line numbers and the last lines of a log are read by
+decompressing only the blocks they touch. The block file is still an
+ordinary gzip file; gunzip reads it whole.
+"""
+import os
+import gzip
+import json
+from bisect import bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from config import settings
+
+LOG_CODECS = ("gzip", "none")
+
+# Uncompressed bytes per block; a range read decompresses at most one extra block
+LOG_BLOCK_SIZE = 256 * 1024
+
+GZIP_SUFFIX = ".gz"
+INDEX_SUFFIX = ".idx.json"
+
+def archive_log(log_path: str, codec: str = settings.LOG_COMPRESSION) -> Optional[Dict[str, Any]]:
+    """Index a finished log and compress it block by block.
+
+    Returns the index, or None if the log does not exist.
+    """
+    if codec not in LOG_CODECS:
+        raise ValueError(f"Unknown log compression: {codec}")
+    if not os.path.exists(log_path):
+        return None
+    
+    blocks = []
+    size = compressed_size = lines = 0
+    last_byte = b""
+    gzip_path = log_path + GZIP_SUFFIX
+    out = open(gzip_path + ".tmp", 'wb') if codec == "gzip" else None
+    try:
+        with open(log_path, 'rb') as f:
+            while True:
+                data = f.read(LOG_BLOCK_SIZE)
+                if not data:
+                    break
+                
+                if out is not None:
+                    # Each block is a complete gzip member; mtime=0 keeps archives reproducible
+                    block = gzip.compress(data, compresslevel=6, mtime=0)
+                    out.write(block)
+                    stored = len(block)
+                else:
+                    stored = len(data)
+                
+                # [text offset, stored offset, stored length, lines before the block]
+                blocks.append([size, compressed_size, stored, lines])
+                size += len(data)
+                compressed_size += stored
+                lines += data.count(b"\n")
+                last_byte = data[-1:]
+    finally:
+        if out is not None:
+            out.close()
+    
+    if last_byte not in (b"", b"\n"):
+        lines += 1
+    
+    index = {"codec": codec, "size": size, "lines": lines, "block_size": LOG_BLOCK_SIZE, "blocks": blocks}
+    if out is not None:
+        os.replace(gzip_path + ".tmp", gzip_path)
+    
+    with open(log_path + INDEX_SUFFIX + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    os.replace(log_path + INDEX_SUFFIX + ".tmp", log_path + INDEX_SUFFIX)
+    
+    if out is not None:
+        # Readers that already opened the plain log keep reading it
+        os.remove(log_path)
+    return index
+
+def load_log_index(log_path: str) -> Optional[Dict[str, Any]]:
+    """The index written by archive_log, if the log has been archived"""
+    try:
+        with open(log_path + INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def log_exists(log_path: str) -> bool:
+    """Whether a log is available, plain or compressed"""
+    return os.path.exists(log_path) or os.path.exists(log_path + GZIP_SUFFIX)
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range HTTP Range header into (start, end), end exclusive.
+
+    Returns None for headers that should be ignored, which means the whole
+    log is sent. Raises ValueError for ranges that cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last) or not (first + last).isdigit():
+        return None
+    
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Range not satisfiable")
+        return max(0, size - length), size
+    
+    start = int(first)
+    end = int(last) + 1 if last else size
+    if last and end <= start:
+        # Invalid ranges are ignored like malformed headers
+        return None
+    if start >= size:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size)
+
+class LogReader:
+    """Reads an execution log by byte offset or line number.
+
+    Plain logs are read directly, including while they are still being
+    written. Archived logs are read through their index. A reader opens
+    its file once, so it keeps working if the log is archived meanwhile.
+    """
+    def __init__(self, log_path: str):
+        self.log_path = log_path
+        self.index = None
+        try:
+            self._file = open(log_path, 'rb')
+            self.compressed = False
+        except FileNotFoundError:
+            self.index = load_log_index(log_path)
+            if self.index is None or self.index["codec"] != "gzip":
+                raise
+            self._file = open(log_path + GZIP_SUFFIX, 'rb')
+            self.compressed = True
+        if not self.compressed:
+            self.index = load_log_index(log_path)
+    
+    def __enter__(self) -> "LogReader":
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        self._file.close()
+    
+    @property
+    def size(self) -> int:
+        """Length of the log text in bytes"""
+        if self.compressed:
+            return self.index["size"]
+        return os.fstat(self._file.fileno()).st_size
+    
+    @property
+    def lines(self) -> Optional[int]:
+        """Number of lines, known once the log has been archived"""
+        return self.index["lines"] if self.index else None
+    
+    def iter_bytes(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yield the log text from start to end in chunks of at most one block"""
+        end = self.size if end is None else min(end, self.size)
+        if not self.compressed:
+            self._file.seek(start)
+            while start < end:
+                data = self._file.read(min(LOG_BLOCK_SIZE, end - start))
+                if not data:
+                    return
+                start += len(data)
+                yield data
+            return
+        
+        blocks = self.index["blocks"]
+        i = max(0, bisect_right([block[0] for block in blocks], start) - 1)
+        for text_offset, stored_offset, stored_length, _ in blocks[i:]:
+            if text_offset >= end:
+                return
+            self._file.seek(stored_offset)
+            data = gzip.decompress(self._file.read(stored_length))
+            data = data[max(0, start - text_offset):end - text_offset]
+            if data:
+                yield data
+    
+    def read(self, start: int, length: int) -> bytes:
+        """Read up to length bytes from start"""
+        return b"".join(self.iter_bytes(start, start + length))
+    
+    def line_offset(self, line: int) -> int:
+        """Byte offset where a line (0-based) starts, or the size if there are fewer lines"""
+        if line <= 0:
+            return 0
+        
+        start, seen = 0, 0
+        if self.index:
+            # The last block with fewer than line newlines before it holds the one line starts after
+            blocks = self.index["blocks"]
+            i = bisect_right([block[3] for block in blocks], line - 1) - 1
+            if i >= 0:
+                start, seen = blocks[i][0], blocks[i][3]
+        
+        position = start
+        for data in self.iter_bytes(start):
+            count = data.count(b"\n")
+            if seen + count >= line:
+                cut = -1
+                for _ in range(line - seen):
+                    cut = data.index(b"\n", cut + 1)
+                return position + cut + 1
+            seen += count
+            position += len(data)
+        return self.size
+    
+    def read_lines(self, line: int, count: int) -> Tuple[List[str], int]:
+        """Read up to count lines starting at a line number.
+
+        Returns the lines without their line breaks and the byte offset
+        after the last one.
+        """
+        start = position = self.line_offset(line)
+        pending = b""
+        lines = []
+        for data in self.iter_bytes(start):
+            pending += data
+            parts = pending.split(b"\n")
+            pending = parts.pop()
+            for part in parts:
+                lines.append(part)
+                position += len(part) + 1
+                if len(lines) == count:
+                    return [item.decode('utf-8', errors='replace') for item in lines], position
+        if pending and len(lines) < count:
+            lines.append(pending)
+            position += len(pending)
+        return [item.decode('utf-8', errors='replace') for item in lines], position
+    
+    def tail(self, count: int) -> List[str]:
+        """The last count lines of the log"""
+        if count <= 0:
+            return []
+        
+        end = self.size
+        data = b""
+        while end > 0:
+            start = max(0, end - LOG_BLOCK_SIZE)
+            data = self.read(start, end - start) + data
+            end = start
+            # One more line break than lines wanted, ignoring a trailing one
+            if data.count(b"\n", 0, len(data) - 1) >= count:
+                break
+        
+        lines = data.split(b"\n")
+        if lines and lines[-1] == b"":
+            lines.pop()
+        return [line.decode('utf-8', errors='replace') for line in lines[-count:]]
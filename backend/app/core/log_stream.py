@@ -0,0 +1,80 @@
+"""Follow execution logs and test reports while tests are running.
+
+Executors write output to the log and test events to the JSON lines
+report as they happen. Followers read both files from byte offsets in
+bounded chunks, so memory use does not grow with the log, and a client
+that reconnects can resume from the offsets it last received.
+"""
+import json
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Tuple
+from app.core.log_store import LogReader
+
+# Largest piece of a file read at once
+LOG_CHUNK_SIZE = 64 * 1024
+
+# Seconds to wait for new output when a follower has caught up
+POLL_INTERVAL = 0.25
+
+def read_lines(path: str, offset: int, limit: int = LOG_CHUNK_SIZE, final: bool = False) -> Tuple[bytes, int]:
+    """Read complete lines from a byte offset of a plain or archived log.
+
+    Returns the data and the offset after it. A line that is still being
+    written is left for the next read, unless the file is final or the
+    line alone is longer than limit.
+    """
+    try:
+        with LogReader(path) as reader:
+            data = reader.read(offset, limit)
+    except OSError:
+        return b"", offset
+    
+    if not final:
+        end = data.rfind(b"\n")
+        if end >= 0 or len(data) < limit:
+            data = data[:end + 1]
+    return data, offset + len(data)
+
+async def follow_execution(log_file: str, report_file: str, is_finished: Callable[[], bool],
+                           log_offset: int = 0, report_offset: int = 0) -> AsyncIterator[Dict[str, Any]]:
+    """Yield new log output and test events until the execution finishes.
+
+    Yields {"event": "log", "data": {"offset", "end", "text"}} for each
+    chunk of log lines and {"event": "test", "data": event} for each
+    reporter event, with the report offset after it. Nothing is read
+    ahead: a chunk is only read once the previous one has been consumed,
+    so a slow client slows the follower down instead of filling memory.
+    Reads, decompression and is_finished run on worker threads, so the
+    event loop keeps serving other requests.
+    """
+    while True:
+        # Check first, so output written before the finish is always drained
+        finished = await asyncio.to_thread(is_finished)
+        progressed = False
+        
+        data, end = await asyncio.to_thread(read_lines, log_file, log_offset, final=finished)
+        if data:
+            progressed = True
+            yield {"event": "log", "data": {"offset": log_offset, "end": end,
+                                            "text": data.decode('utf-8', errors='replace')}}
+            log_offset = end
+        
+        data, end = await asyncio.to_thread(read_lines, report_file, report_offset, final=finished)
+        if data:
+            progressed = True
+            position = report_offset
+            for line in data.splitlines(keepends=True):
+                position += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A line cut short by a killed process
+                    continue
+                event["offset"] = position
+                yield {"event": "test", "data": event}
+            report_offset = end
+        
+        if not progressed:
+            if finished:
+                return
+            await asyncio.sleep(POLL_INTERVAL)
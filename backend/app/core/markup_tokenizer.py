@@ -0,0 +1,433 @@
+import re
+import bisect
+from html import escape
+from typing import List, Optional, Tuple
+
+# Attribute injected into every emitted start tag, holding the source offset
+OFFSET_ATTRIBUTE = "data-scan-offset"
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+# Elements whose content is text, not markup; only the escapable ones are kept
+RAW_TEXT_ELEMENTS = {'script', 'style', 'textarea', 'title'}
+ESCAPABLE_RAW_TEXT_ELEMENTS = {'textarea', 'title'}
+RAW_TEXT_END_PATTERNS = {name: re.compile(rf"</{name}\b", re.IGNORECASE) for name in RAW_TEXT_ELEMENTS}
+
+# JSX attribute names that differ from their DOM counterparts
+JSX_ATTRIBUTE_NAMES = {"className": "class", "htmlFor": "for"}
+
+# Keywords after which a "<" starts an expression rather than a comparison
+JSX_PRECEDING_KEYWORDS = {"return", "yield", "case", "default", "else", "do", "await"}
+JSX_PRECEDING_CHARS = set("([{,;:=?!&|>}+-*%~^")
+
+TAG_NAME_PATTERN = re.compile(r"[A-Za-z][\w.:-]*")
+ATTRIBUTE_NAME_PATTERN = re.compile(r"[A-Za-z_$@:#][\w$.:@#-]*")
+UNQUOTED_VALUE_PATTERN = re.compile(r"[^\s\"'=<>`]+")
+JS_SPECIAL_PATTERN = re.compile(r"[\"'`/<{}]")
+CHILD_TEXT_END_PATTERN = re.compile(r"[<{]")
+
+def extract_component_markup(content: str, file_name: str) -> str:
+    """Extract the markup of an HTML/JSX/TSX/Vue file as an HTML document in one pass.
+
+    Every element of the source appears exactly once in the output, with
+    its source offset stored in the data-scan-offset attribute. JavaScript
+    around and inside JSX is dropped, except for plain expression children
+    which are kept as text.
+    """
+    if file_name.endswith('.vue'):
+        mode = "vue"
+    elif file_name.endswith(('.jsx', '.tsx')):
+        mode = "jsx"
+    else:
+        mode = "html"
+    return MarkupTokenizer(content, mode).extract()
+
+def get_line_starts(content: str) -> List[int]:
+    """Offsets at which each line of content starts"""
+    starts = [0]
+    position = content.find('\n')
+    while position != -1:
+        starts.append(position + 1)
+        position = content.find('\n', position + 1)
+    return starts
+
+def offset_to_position(line_starts: List[int], offset: int) -> Tuple[int, int]:
+    """Convert a source offset to a 1-based (line, column) pair"""
+    line = bisect.bisect_right(line_starts, offset)
+    return line, offset - line_starts[line - 1] + 1
+
+class MarkupTokenizer:
+    """Single-pass scanner that turns component source into plain HTML"""
+    def __init__(self, content: str, mode: str = "jsx"):
+        # mode is "jsx", "vue" or "html"
+        self.content = content
+        self.length = len(content)
+        self.mode = mode
+        self.out = []
+        # Open contexts: ("element", tag name) or ("expression", start, output length, brace depth)
+        self.stack = []
+    
+    def extract(self) -> str:
+        if self.mode in ("html", "vue"):
+            self._scan_html()
+        else:
+            self._scan_jsx()
+        
+        # Close anything left open at the end of the file
+        for context in reversed(self.stack):
+            if context[0] == "element":
+                self._emit_end_tag(context[1])
+        self.stack = []
+        
+        return ''.join(self.out)
+    
+    # Output
+    
+    def _emit_start_tag(self, name: str, attributes: List[Tuple[str, Optional[str]]], offset: int):
+        if not name:
+            return
+        parts = [f"<{name}"]
+        for attribute_name, value in attributes:
+            if value is None:
+                parts.append(f" {attribute_name}")
+            else:
+                # Values are passed through as written, entities included
+                quoted = value.replace('"', '&quot;')
+                parts.append(f' {attribute_name}="{quoted}"')
+        parts.append(f' {OFFSET_ATTRIBUTE}="{offset}">')
+        self.out.append(''.join(parts))
+    
+    def _emit_end_tag(self, name: str):
+        if name and name.lower() not in VOID_ELEMENTS:
+            self.out.append(f"</{name}>")
+    
+    # Shared lexing helpers
+    
+    def _skip_whitespace(self, position: int) -> int:
+        while position < self.length and self.content[position].isspace():
+            position += 1
+        return position
+    
+    def _skip_string(self, position: int) -> int:
+        """Skip a quoted string or template literal starting at position"""
+        quote = self.content[position]
+        position += 1
+        while position < self.length:
+            char = self.content[position]
+            if char == '\\':
+                position += 2
+                continue
+            if char == quote:
+                return position + 1
+            if quote == '`' and char == '$' and self.content.startswith('{', position + 1):
+                position = self._skip_braces(position + 1)
+                continue
+            if char == '\n' and quote != '`':
+                return position
+            position += 1
+        return position
+    
+    def _skip_comment(self, position: int) -> int:
+        """Skip a // or /* */ comment starting at position"""
+        if self.content.startswith('//', position):
+            end = self.content.find('\n', position)
+            return self.length if end == -1 else end
+        end = self.content.find('*/', position + 2)
+        return self.length if end == -1 else end + 2
+    
+    def _skip_braces(self, position: int) -> int:
+        """Skip a balanced {...} JavaScript expression starting at position"""
+        depth = 0
+        while position < self.length:
+            char = self.content[position]
+            if char in '"\'`':
+                position = self._skip_string(position)
+                continue
+            if char == '/' and self.content.startswith(('//', '/*'), position):
+                position = self._skip_comment(position)
+                continue
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return position + 1
+            position += 1
+        return position
+    
+    def _parse_start_tag(self, position: int, jsx: bool):
+        """Parse a start tag at position.
+
+        Returns (name, attributes, self_closing, end position), or None if
+        the text at position is not a tag.
+        """
+        position += 1
+        if position < self.length and self.content[position] == '>':
+            # JSX fragment
+            return "", [], False, position + 1
+        
+        match = TAG_NAME_PATTERN.match(self.content, position)
+        if not match:
+            return None
+        name = match.group()
+        position = match.end()
+        
+        attributes = []
+        while True:
+            position = self._skip_whitespace(position)
+            if position >= self.length:
+                return None
+            
+            char = self.content[position]
+            if char == '>':
+                return name, attributes, False, position + 1
+            if self.content.startswith('/>', position):
+                return name, attributes, True, position + 2
+            if jsx and char == '{':
+                # Spread attributes
+                position = self._skip_braces(position)
+                continue
+            
+            match = ATTRIBUTE_NAME_PATTERN.match(self.content, position)
+            if not match:
+                return None
+            attribute_name = match.group()
+            position = self._skip_whitespace(match.end())
+            
+            if position >= self.length or self.content[position] != '=':
+                attributes.append((attribute_name, None))
+                continue
+            
+            position = self._skip_whitespace(position + 1)
+            if position >= self.length:
+                return None
+            
+            char = self.content[position]
+            if char in '"\'':
+                end = self.content.find(char, position + 1)
+                if end == -1:
+                    return None
+                value = self.content[position + 1:end]
+                position = end + 1
+            elif jsx and char == '{':
+                # Dynamic values are not known statically
+                position = self._skip_braces(position)
+                continue
+            else:
+                match = UNQUOTED_VALUE_PATTERN.match(self.content, position)
+                if not match:
+                    return None
+                value = match.group()
+                position = match.end()
+            
+            if jsx:
+                attribute_name = JSX_ATTRIBUTE_NAMES.get(attribute_name, attribute_name)
+            elif self.mode == "vue" and attribute_name.startswith((':', '@', 'v-bind:', 'v-on:')):
+                # Vue bindings and event handlers are dynamic
+                continue
+            attributes.append((attribute_name, value))
+    
+    def _parse_end_tag(self, position: int):
+        """Parse an end tag at position, returning (name, end position)"""
+        match = TAG_NAME_PATTERN.match(self.content, position + 2)
+        name = match.group() if match else ""
+        end = self.content.find('>', position + 2)
+        return name, self.length if end == -1 else end + 1
+    
+    def _close_element(self, name: str):
+        """Close the innermost open element with this name"""
+        for index in range(len(self.stack) - 1, -1, -1):
+            context = self.stack[index]
+            if context[0] != "element":
+                # End tags never close elements outside the current expression
+                return
+            if context[1] == name:
+                for open_context in reversed(self.stack[index:]):
+                    self._emit_end_tag(open_context[1])
+                del self.stack[index:]
+                return
+    
+    # HTML / Vue templates
+    
+    def _scan_html(self):
+        position = 0
+        text_start = 0
+        vue = self.mode == "vue"
+        
+        while position < self.length:
+            if self.content[position] != '<':
+                position = self.content.find('<', position)
+                if position == -1:
+                    position = self.length
+                continue
+            
+            # Text outside the root template of a Vue file is not markup
+            if self.stack or not vue:
+                self.out.append(self.content[text_start:position])
+            
+            if self.content.startswith('<!--', position):
+                end = self.content.find('-->', position + 4)
+                position = self.length if end == -1 else end + 3
+            elif self.content.startswith(('<!', '<?'), position):
+                # Doctype, CDATA and processing instructions
+                end = self.content.find('>', position)
+                position = self.length if end == -1 else end + 1
+            elif self.content.startswith('</', position):
+                name, position = self._parse_end_tag(position)
+                if vue and name == "template" and len(self.stack) == 1 and self.stack[0][1] == "":
+                    self.stack.pop()
+                else:
+                    self._close_element(name)
+            else:
+                tag = self._parse_start_tag(position, jsx=False)
+                if tag is None:
+                    if self.stack or not vue:
+                        self.out.append("&lt;")
+                    position += 1
+                    text_start = position
+                    continue
+                
+                name, attributes, self_closing, end = tag
+                lower_name = name.lower()
+                
+                if lower_name in RAW_TEXT_ELEMENTS and not self_closing:
+                    # Raw text may contain anything that looks like markup
+                    match = RAW_TEXT_END_PATTERNS[lower_name].search(self.content, end)
+                    close = match.start() if match else self.length
+                    if lower_name in ESCAPABLE_RAW_TEXT_ELEMENTS and (self.stack or not vue):
+                        self._emit_start_tag(name, attributes, position)
+                        self.out.append(self.content[end:close].replace('<', '&lt;'))
+                        self._emit_end_tag(name)
+                    position = self._parse_end_tag(close)[1] if close < self.length else self.length
+                elif vue and not self.stack and lower_name == "template":
+                    # The root template wrapper is not part of the page
+                    self.stack.append(("element", ""))
+                    position = end
+                else:
+                    self._emit_start_tag(name, attributes, position)
+                    if self_closing or lower_name in VOID_ELEMENTS:
+                        self._emit_end_tag(name)
+                    else:
+                        self.stack.append(("element", name))
+                    position = end
+            
+            text_start = position
+        
+        if self.stack or not vue:
+            self.out.append(self.content[text_start:])
+    
+    # JSX / TSX
+    
+    def _jsx_can_start(self, position: int) -> bool:
+        """Decide whether a '<' at position begins a JSX element"""
+        following = self.content[position + 1:position + 2]
+        if not (following.isalpha() or following == '>'):
+            return False
+        
+        previous = position - 1
+        while previous >= 0 and self.content[previous].isspace():
+            previous -= 1
+        if previous < 0:
+            return True
+        
+        char = self.content[previous]
+        if char in JSX_PRECEDING_CHARS:
+            return True
+        if char.isalnum() or char in '_$':
+            start = previous
+            while start > 0 and (self.content[start - 1].isalnum() or self.content[start - 1] in '_$'):
+                start -= 1
+            return self.content[start:previous + 1] in JSX_PRECEDING_KEYWORDS
+        return False
+    
+    def _open_element(self, position: int) -> Optional[int]:
+        """Parse and emit a JSX start tag, returning the position after it"""
+        tag = self._parse_start_tag(position, jsx=True)
+        if tag is None:
+            return None
+        
+        name, attributes, self_closing, end = tag
+        if any(attribute_name == "extends" for attribute_name, _ in attributes):
+            # TypeScript generic parameters such as <T extends object>
+            return None
+        
+        self._emit_start_tag(name, attributes, position)
+        if self_closing:
+            self._emit_end_tag(name)
+        else:
+            # JSX elements are always closed explicitly, even void ones
+            self.stack.append(("element", name))
+        return end
+    
+    def _scan_jsx(self):
+        position = 0
+        
+        while position < self.length:
+            if self.stack and self.stack[-1][0] == "element":
+                position = self._scan_jsx_children(position)
+                continue
+            
+            # Jump to the next character that matters in JavaScript code
+            match = JS_SPECIAL_PATTERN.search(self.content, position)
+            if not match:
+                break
+            position = match.start()
+            char = match.group()
+            
+            if char in '"\'`':
+                position = self._skip_string(position)
+            elif char == '/':
+                if self.content.startswith(('//', '/*'), position):
+                    position = self._skip_comment(position)
+                else:
+                    position += 1
+            elif char == '<':
+                end = self._open_element(position) if self._jsx_can_start(position) else None
+                position = end if end is not None else position + 1
+            else:
+                if self.stack:
+                    # Track braces of the expression child being scanned
+                    context = self.stack[-1]
+                    depth = context[3] + (1 if char == '{' else -1)
+                    if depth == 0:
+                        self._close_expression(position)
+                    else:
+                        self.stack[-1] = context[:3] + (depth,)
+                position += 1
+    
+    def _scan_jsx_children(self, position: int) -> int:
+        """Scan the children of the open element up to the next tag or expression"""
+        if self.content.startswith('</', position):
+            name, end = self._parse_end_tag(position)
+            self._close_element(name)
+            return end
+        
+        char = self.content[position]
+        if char == '<':
+            end = self._open_element(position)
+            if end is not None:
+                return end
+            self.out.append("&lt;")
+            return position + 1
+        
+        if char == '{':
+            # Expression child, scanned as JavaScript until its closing brace
+            self.stack.append(("expression", position, len(self.out), 1))
+            return position + 1
+        
+        match = CHILD_TEXT_END_PATTERN.search(self.content, position)
+        end = match.start() if match else self.length
+        self.out.append(self.content[position:end])
+        return end
+    
+    def _close_expression(self, position: int):
+        _, start, output_length, _ = self.stack.pop()
+        if len(self.out) == output_length:
+            # No JSX inside, keep the expression as text unless it is a comment
+            expression = self.content[start:position + 1]
+            inner = expression[1:-1].strip()
+            if inner and not (inner.startswith('/*') and inner.endswith('*/')):
+                self.out.append(escape(expression, quote=False))
@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, TextIO
+from app.core.test_executor import wait_for_process, create_log_path, get_report_path, read_log_summary
+from app.core.test_reporter import REPORT_PATH_ENV, build_test_results, reporter_command
+from app.core.test_generator import TEST_MANIFEST_FILE, TEST_MODULE_PATTERN
+from app.models.project import TestCase
+from config import settings
+
+SHARDING_STRATEGIES = ("round_robin", "duration")
+
+# Per-test durations keyed by unittest test ID, next to the per-module timings.json
+TEST_TIMINGS_FILE = "test_timings.json"
+
+def discover_test_modules(test_directory: str) -> List[str]:
+    """Find the individual test modules of a generated test suite.
+
+    The manifest written with the suite lists its modules, so modules left
+    over from an earlier generation are not run. Suites generated before
+    the manifest existed fall back to the modules in the directory.
+    """
+    if not os.path.isdir(test_directory):
+        return []
+    
+    try:
+        with open(os.path.join(test_directory, TEST_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            modules = list(json.load(f))
+    except (OSError, ValueError):
+        modules = [file_name[:-3] for file_name in os.listdir(test_directory)
+                   if TEST_MODULE_PATTERN.match(file_name)]
+    
+    modules = [module for module in modules if os.path.exists(os.path.join(test_directory, f"{module}.py"))]
+    # Sort numerically so test_10 comes after test_9
+    return sorted(modules, key=lambda name: int(name.split('_')[1]))
+
+def shard_round_robin(modules: List[str], shard_count: int) -> List[List[str]]:
+    """Distribute modules evenly across shards"""
+    shards = [[] for _ in range(shard_count)]
+    for i, module in enumerate(modules):
+        shards[i % shard_count].append(module)
+    return [shard for shard in shards if shard]
+
+def shard_by_duration(modules: List[str], shard_count: int, timings: Dict[str, float]) -> List[List[str]]:
+    """Balance shards by the durations recorded in earlier runs.
+
+    Modules are assigned longest first to the shard with the least total
+    time. Modules without a recorded timing are assumed to take the
+    average of the known ones.
+    """
+    known = [timings[module] for module in modules if module in timings]
+    default_duration = sum(known) / len(known) if known else 1.0
+    
+    shards = [[] for _ in range(shard_count)]
+    totals = [0.0] * shard_count
+    
+    ordered = sorted(modules, key=lambda module: timings.get(module, default_duration), reverse=True)
+    for module in ordered:
+        target = totals.index(min(totals))
+        shards[target].append(module)
+        totals[target] += timings.get(module, default_duration)
+    
+    return [shard for shard in shards if shard]
+
+def load_timings(results_dir: str, file_name: str = "timings.json") -> Dict[str, float]:
+    """Load per-module durations from earlier runs"""
+    timings_path = os.path.join(results_dir, file_name)
+    try:
+        with open(timings_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_timings(results_dir: str, timings: Dict[str, float], file_name: str = "timings.json"):
+    """Merge new per-module durations into the timings file"""
+    stored = load_timings(results_dir, file_name)
+    stored.update(timings)
+    
+    timings_path = os.path.join(results_dir, file_name)
+    with open(timings_path, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, indent=2)
+
+def load_module_timings(results_dir: str) -> Dict[str, float]:
+    """Per-module durations, estimated from per-test durations where no module was timed.
+
+    Measured module durations include interpreter start-up, so each
+    estimate adds the average start-up overhead seen in measured modules.
+    """
+    timings = load_timings(results_dir)
+    test_timings = load_timings(results_dir, TEST_TIMINGS_FILE)
+    
+    test_totals = {}
+    for test_id, duration in test_timings.items():
+        module = test_id.split('.', 1)[0]
+        test_totals[module] = test_totals.get(module, 0.0) + duration
+    
+    overheads = [timings[module] - test_totals[module] for module in timings if module in test_totals]
+    overhead = max(0.0, sum(overheads) / len(overheads)) if overheads else 0.0
+    for module, total in test_totals.items():
+        timings.setdefault(module, round(total + overhead, 3))
+    return timings
+
+class SharedLog:
+    """An execution log that shard threads write whole lines to as they arrive"""
+    def __init__(self, handle: TextIO):
+        self.handle = handle
+        self._lock = threading.Lock()
+    
+    def write_line(self, prefix: str, line: str):
+        """Write one line with a prefix naming its shard"""
+        if not line.endswith("\n"):
+            line += "\n"
+        with self._lock:
+            self.handle.write(prefix + line)
+            self.handle.flush()
+
+def execute_test_parallel(test_case: TestCase, workers: Optional[int] = None, sharding: str = "duration",
+                          cancel_event: Optional[threading.Event] = None,
+                          log_file: Optional[str] = None) -> Dict[str, Any]:
+    """Execute the modules of a test suite in parallel shards and merge the results.
+
+    Shard output is interleaved line by line into one log, prefixed with
+    the shard number, and every shard appends its test events to one
+    report, so both can be followed while the shards run.
+    """
+    if sharding not in SHARDING_STRATEGIES:
+        raise ValueError(f"Unknown sharding strategy: {sharding}")
+    
+    log_file = log_file or create_log_path(test_case.project_id)
+    results_dir = os.path.dirname(log_file)
+    
+    test_directory = os.path.dirname(test_case.script_path)
+    modules = discover_test_modules(test_directory)
+    if not modules:
+        with open(log_file, 'w') as f:
+            f.write(f"ERROR EXECUTING TEST: No test modules found in {test_directory}\n")
+        return {
+            "status": "ERROR",
+            "result": {
+                "return_code": -1,
+                "tests": [],
+                "log": f"Error executing test: No test modules found in {test_directory}"
+            },
+            "log_path": log_file
+        }
+    
+    workers = max(1, workers or settings.TEST_WORKERS)
+    
+    if sharding == "duration":
+        shards = shard_by_duration(modules, workers, load_module_timings(results_dir))
+    else:
+        shards = shard_round_robin(modules, workers)
+    
+    # Generated tests import page_objects from the project directory
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.abspath(os.path.dirname(test_directory)), env.get("PYTHONPATH", "")]
+    )
+    report_file = get_report_path(log_file)
+    env[REPORT_PATH_ENV] = os.path.abspath(report_file)
+    # Flush test output line by line so followers see it as it is printed
+    env["PYTHONUNBUFFERED"] = "1"
+    deadline = time.monotonic() + 300  # 5 minute timeout
+    
+    with open(log_file, 'w') as f:
+        log = SharedLog(f)
+        for i, shard in enumerate(shards):
+            log.write_line("", f"===== Shard {i + 1}: {', '.join(shard)} =====")
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(shards))) as pool:
+            shard_results = list(pool.map(
+                lambda args: run_shard(args[1], f"[shard {args[0] + 1}] ", log, test_directory, env,
+                                       deadline, cancel_event),
+                enumerate(shards)
+            ))
+    
+    timings = {}
+    for shard_result in shard_results:
+        timings.update(shard_result["timings"])
+    if timings:
+        save_timings(results_dir, timings)
+    
+    test_results = build_test_results(report_file)
+    test_timings = {test["id"]: test["duration"] for test in test_results if test["status"] != "ERROR"}
+    if test_timings:
+        save_timings(results_dir, test_timings, TEST_TIMINGS_FILE)
+    
+    # Determine overall status
+    if any(shard_result["cancelled"] for shard_result in shard_results):
+        status = "CANCELLED"
+    elif any(shard_result["timed_out"] for shard_result in shard_results):
+        status = "TIMEOUT"
+    elif all(shard_result["return_code"] == 0 for shard_result in shard_results):
+        status = "SUCCESS"
+    else:
+        status = "FAILURE"
+    
+    return_code = next((shard_result["return_code"] for shard_result in shard_results
+                        if shard_result["return_code"] != 0), 0)
+    
+    return {
+        "status": status,
+        "result": {
+            "return_code": return_code,
+            "tests": test_results,
+            "log": read_log_summary(log_file),
+            "report_path": report_file,
+            "workers": workers,
+            "sharding": sharding,
+            "shards": [
+                {
+                    "modules": shards[i],
+                    "return_code": shard_result["return_code"],
+                    "duration": shard_result["duration"]
+                }
+                for i, shard_result in enumerate(shard_results)
+            ]
+        },
+        "log_path": log_file
+    }
+
+def run_shard(modules: List[str], prefix: str, log: SharedLog, test_directory: str, env: Dict[str, str],
+              deadline: float, cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """Run the modules of one shard one after another, timing each module"""
+    shard_result = {
+        "return_code": 0,
+        "duration": 0.0,
+        "timings": {},
+        "cancelled": False,
+        "timed_out": False
+    }
+    
+    for module in modules:
+        started = time.monotonic()
+        process = subprocess.Popen(
+            reporter_command("module", [module]),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors='replace',
+            cwd=test_directory,
+            env=env
+        )
+        reader = threading.Thread(target=copy_output, args=(process, prefix, log), daemon=True)
+        reader.start()
+        try:
+            return_code = wait_for_process(process, max(0.0, deadline - time.monotonic()), cancel_event)
+        except subprocess.TimeoutExpired:
+            return_code = -1
+            shard_result["timed_out"] = True
+        finally:
+            # Processes the test started may keep the pipe open after it exits
+            reader.join(timeout=5)
+        
+        if shard_result["timed_out"]:
+            log.write_line(prefix, f"TEST EXECUTION TIMEOUT: {module} did not finish in time.")
+            shard_result["return_code"] = -1
+            break
+        
+        if return_code is None:
+            log.write_line(prefix, "TEST EXECUTION CANCELLED")
+            shard_result["return_code"] = -1
+            shard_result["cancelled"] = True
+            break
+        
+        duration = time.monotonic() - started
+        shard_result["timings"][module] = round(duration, 3)
+        shard_result["duration"] += duration
+        if return_code != 0:
+            shard_result["return_code"] = return_code
+    
+    shard_result["duration"] = round(shard_result["duration"], 3)
+    return shard_result
+
+def copy_output(process: subprocess.Popen, prefix: str, log: SharedLog):
+    """Copy a process's output into the shared log line by line"""
+    for line in process.stdout:
+        log.write_line(prefix, line)
@@ -1,16 +1,253 @@
 import os
 import json
-import uuid
-from typing import List, Dict, Any
-from app.core.gemini_client import generate_pom_with_gemini
+import asyncio
+import shutil
+import hashlib
+from typing import AsyncIterator, List, Dict, Any, Optional, Union
+from app.core.code_scanner import without_source_position
+from app.core.gemini_client import llm_enabled, generate_pom_with_gemini, stream_pom_with_gemini, merge_elements
+from app.core.llm_provider import get_provider
+from app.core.pom_index import PomIndex
+from app.utils.code_emitter import CodeEmitter, CodeTemplate, module_name_for, open_module
 from config import settings
 
-def generate_pom(elements: List[Dict[str, Any]], project_id: str) -> Dict[str, Any]:
-    """Generate Page Object Model from extracted elements"""
-    # Create results directory for the project
-    project_dir = os.path.join(settings.RESULTS_DIR, project_id)
-    os.makedirs(project_dir, exist_ok=True)
+POM_MANIFEST_FILE = "pom_manifest.json"
+PAGE_OBJECTS_MODULE = "page_objects"
+
+BASE_PAGE_CODE = """from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    StaleElementReferenceException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+DEFAULT_TIMEOUT = 10
+
+def to_locator(selector, selector_type):
+    \"\"\"Convert a POM selector into a (By, value) locator\"\"\"
+    if selector_type == "id":
+        return (By.ID, selector.lstrip('#'))
+    if selector_type == "xpath":
+        return (By.XPATH, selector)
+    # Class, name, data-testid and css selectors are all CSS selectors
+    return (By.CSS_SELECTOR, selector)
+
+class BoundElement:
+    \"\"\"Stand-in for the WebElement of a page object attribute.
+
+    Attribute reads and method calls run through the page's perform(), so
+    they use the cached element and find it again only when the browser
+    reports it stale. web_element is the WebElement itself, for APIs that
+    need one, such as execute_script or ActionChains.
+    \"\"\"
+    def __init__(self, page, locator):
+        self._page = page
+        self._locator = locator
+    
+    @property
+    def web_element(self):
+        return self._page.find(self._locator)
+    
+    def __getattr__(self, name):
+        value = self._page.perform(self._locator, lambda element: getattr(element, name))
+        if not callable(value):
+            return value
+        
+        def call(*args, **kwargs):
+            return self._page.perform(self._locator, lambda element: getattr(element, name)(*args, **kwargs))
+        return call
+    
+    def __repr__(self):
+        return f"<BoundElement {self._locator}>"
+
+class PageElement:
+    \"\"\"Page object attribute that resolves to a BoundElement.
+
+    The locator is computed once, when the page class is defined.
+    \"\"\"
+    def __init__(self, selector, selector_type):
+        self.selector = selector
+        self.selector_type = selector_type
+        self.locator = to_locator(selector, selector_type)
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, page, owner=None):
+        if page is None:
+            return self
+        return BoundElement(page, self.locator)
+
+class BasePage:
+    \"\"\"Base page object with cached element lookups and explicit waits.
+
+    Elements found once are reused; an element the browser reports stale
+    is found again, once, by the property read or action that hit it.
+    \"\"\"
+    timeout = DEFAULT_TIMEOUT
+    
+    def __init__(self, driver, timeout=None):
+        self.driver = driver
+        if timeout is not None:
+            self.timeout = timeout
+        self.wait = WebDriverWait(driver, self.timeout)
+        self._elements = {}
+    
+    @staticmethod
+    def _locator(target, selector_type=None):
+        if isinstance(target, PageElement):
+            return target.locator
+        if isinstance(target, BoundElement):
+            return target._locator
+        if isinstance(target, tuple):
+            return target
+        return to_locator(target, selector_type)
+    
+    def invalidate(self, target=None, selector_type=None):
+        \"\"\"Forget one cached element, or all of them, e.g. after navigating\"\"\"
+        if target is None:
+            self._elements.clear()
+        else:
+            self._elements.pop(self._locator(target, selector_type), None)
+    
+    def find(self, target, selector_type=None):
+        \"\"\"Return the element for a PageElement, locator or selector, waiting for it if needed\"\"\"
+        locator = self._locator(target, selector_type)
+        element = self._elements.get(locator)
+        if element is None:
+            element = self.wait.until(EC.presence_of_element_located(locator))
+            self._elements[locator] = element
+        return element
+    
+    def find_element(self, selector, selector_type):
+        return self.find(selector, selector_type)
+    
+    def perform(self, target, action, selector_type=None):
+        \"\"\"Run action on an element, re-finding it once if it went stale
+        and waiting for it to become clickable if it is not yet.
+        \"\"\"
+        locator = self._locator(target, selector_type)
+        for attempt in range(2):
+            element = self.find(locator)
+            try:
+                return action(element)
+            except StaleElementReferenceException:
+                self._elements.pop(locator, None)
+                if attempt:
+                    raise
+            except (ElementNotInteractableException, ElementClickInterceptedException):
+                if attempt:
+                    raise
+                self._elements[locator] = self.wait.until(EC.element_to_be_clickable(locator))
+    
+    def click(self, target, selector_type=None):
+        self.perform(target, lambda element: element.click(), selector_type)
+    
+    def input_text(self, target, selector_type_or_text, text=None):
+        # Accepts (target, text) and the older (selector, selector_type, text)
+        if text is None:
+            selector_type, text = None, selector_type_or_text
+        else:
+            selector_type = selector_type_or_text
+        
+        def type_text(element):
+            element.clear()
+            element.send_keys(text)
+        self.perform(target, type_text, selector_type)
+    
+    def select_text(self, target, value, selector_type=None):
+        self.perform(target, lambda element: Select(element).select_by_visible_text(value), selector_type)
+    
+    def get_text(self, target, selector_type=None):
+        return self.perform(target, lambda element: element.text, selector_type)
     
+    def wait_for_element(self, target, selector_type=None, timeout=None):
+        \"\"\"Wait for an element to be visible and cache it\"\"\"
+        locator = self._locator(target, selector_type)
+        wait = self.wait if timeout is None else WebDriverWait(self.driver, timeout)
+        element = wait.until(EC.visibility_of_element_located(locator))
+        self._elements[locator] = element
+        return element
+"""
+
+PAGE_CLASS_TEMPLATE = CodeTemplate("""
+class ${class_name}(BasePage):
+    \"\"\"Page object for ${class_name}\"\"\"
+""")
+
+ELEMENT_PROPERTY_TEMPLATE = CodeTemplate("""
+    ${element_name} = PageElement(${selector}, ${selector_type})
+""")
+
+# Action methods by element type
+CLICK_METHOD_TEMPLATE = CodeTemplate("""
+    def click_${element_name}(self):
+        self.click(${class_name}.${element_name})
+""")
+
+SET_METHOD_TEMPLATE = CodeTemplate("""
+    def set_${element_name}(self, text):
+        self.input_text(${class_name}.${element_name}, text)
+""")
+
+SELECT_METHOD_TEMPLATE = CodeTemplate("""
+    def select_${element_name}(self, value):
+        self.select_text(${class_name}.${element_name}, value)
+""")
+
+ACTION_TEMPLATES = {
+    "button": CLICK_METHOD_TEMPLATE,
+    "a": CLICK_METHOD_TEMPLATE,
+    "input": SET_METHOD_TEMPLATE,
+    "textarea": SET_METHOD_TEMPLATE,
+    "select": SELECT_METHOD_TEMPLATE
+}
+
+BASE_PAGE_MODULE = "base_page"
+BASE_PAGE_EXPORTS = ("BasePage", "BoundElement", "PageElement", "to_locator")
+
+# First line of every page module; unchanged modules are not rewritten
+PAGE_MODULE_STAMP = CodeTemplate("# Generated from POM page ${page_id}, fingerprint ${fingerprint}\n")
+PAGE_MODULE_HEADER = "from .base_page import BasePage, PageElement\n"
+
+# The package resolves each class on first access, so importing one page
+# object never loads the modules of the others
+PACKAGE_INIT_HEADER = """\"\"\"Generated page objects, one module per page, imported on first use\"\"\"
+import importlib
+
+_MODULES = {
+"""
+PACKAGE_ENTRY_TEMPLATE = CodeTemplate("    \"${class_name}\": \"${module_name}\",\n")
+PACKAGE_INIT_FOOTER = """}
+
+__all__ = list(_MODULES)
+
+def __getattr__(name):
+    module_name = _MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+"""
+
+# Changing any template changes every page fingerprint
+TEMPLATES_DIGEST = hashlib.sha256("\0".join(
+    [BASE_PAGE_CODE, PAGE_MODULE_HEADER, PAGE_CLASS_TEMPLATE.text, ELEMENT_PROPERTY_TEMPLATE.text]
+    + [template.text for template in ACTION_TEMPLATES.values()]
+).encode('utf-8')).hexdigest()
+
+def get_page_id(page_name: str) -> str:
+    """Derive a page ID from its name so it is stable across regenerations"""
+    return "page-" + hashlib.sha1(page_name.encode('utf-8')).hexdigest()[:16]
+
+def organize_elements(elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group scanned elements under one page record per page/component"""
     # Extract unique page/component names based on elements
     page_components = {}
     for element in elements:
@@ -26,7 +263,7 @@ def generate_pom(elements: List[Dict[str, Any]], project_id: str) -> Dict[str, A
     # Organize elements by page
     organized_elements = []
     for page_name, page_elements in page_components.items():
-        page_id = str(uuid.uuid4())
+        page_id = get_page_id(page_name)
         page = {
             "id": page_id,
             "name": f"{page_name.capitalize()}Page",
@@ -42,15 +279,237 @@ def generate_pom(elements: List[Dict[str, Any]], project_id: str) -> Dict[str, A
         
         organized_elements.append(page)
     
-    # Use Gemini to enhance POM structure if API key is available
-    if settings.GEMINI_API_KEY:
+    return organized_elements
+
+def split_pages(organized_elements: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Map each page ID to its page record and elements, in page order"""
+    pages = {}
+    for element in organized_elements:
+        page_id = element["id"] if element["type"] == "page" else element.get("parent_id")
+        pages.setdefault(page_id, []).append(element)
+    return pages
+
+def fingerprint_page(page_elements: List[Dict[str, Any]]) -> str:
+    """Hash everything about a page that is sent for enhancement.
+
+    Source positions are not sent, so a page whose elements only moved
+    to other lines keeps its fingerprint.
+    """
+    stable_elements = [without_source_position(element) for element in page_elements]
+    return hashlib.sha256(json.dumps(stable_elements, sort_keys=True).encode('utf-8')).hexdigest()
+
+def scanned_sources(pages: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Map element IDs to the source file and position of the current scan"""
+    return {element["id"]: element["properties"]["source"]
+            for page_elements in pages.values() for element in page_elements
+            if (element.get("properties") or {}).get("source")}
+
+def with_scanned_source(element: Dict[str, Any], sources: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Give a reused or enhanced element the source position of the current scan"""
+    source = sources.get(element.get("id"))
+    if source is None:
+        return element
+    return {**element, "properties": {**(element.get("properties") or {}), "source": source}}
+
+def load_pom_manifest(project_dir: str) -> Dict[str, Any]:
+    """Load the page fingerprints recorded by the previous POM generation"""
+    try:
+        with open(os.path.join(project_dir, POM_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_previous_elements(project_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Load the elements of the previous POM by ID"""
+    try:
+        with open(os.path.join(project_dir, "page_object_model.json"), 'r', encoding='utf-8') as f:
+            return {element["id"]: element for element in json.load(f) if "id" in element}
+    except (OSError, ValueError):
+        return {}
+
+def prepare_pom_update(elements: List[Dict[str, Any]], project_id: str, regenerate: bool = False) -> Dict[str, Any]:
+    """Diff a new scan against the previous POM to find the pages that need enhancing.
+
+    Pages whose fingerprint and enhancement model match the manifest reuse
+    their previously enhanced elements, unless the model returned nothing
+    for them last time. regenerate re-enhances every page.
+    """
+    project_dir = os.path.join(settings.RESULTS_DIR, project_id)
+    pages = split_pages(organize_elements(elements))
+    fingerprints = {page_id: fingerprint_page(page_elements) for page_id, page_elements in pages.items()}
+    sources = scanned_sources(pages)
+    model_name = get_provider().model_name if llm_enabled() else None
+    
+    manifest = load_pom_manifest(project_dir)
+    previous_pages = manifest.get("pages", {})
+    previous_elements = load_previous_elements(project_dir) if previous_pages else {}
+    
+    reused = {}
+    # Whether reused elements moved within their files, which only needs the POM rewritten
+    moved = False
+    if not regenerate and manifest.get("model") == model_name:
+        for page_id, fingerprint in fingerprints.items():
+            previous = previous_pages.get(page_id)
+            if previous is None or previous["fingerprint"] != fingerprint or not previous.get("enhanced", True):
+                continue
+            if all(element_id in previous_elements for element_id in previous["element_ids"]):
+                reused[page_id] = [with_scanned_source(previous_elements[element_id], sources)
+                                   for element_id in previous["element_ids"]]
+                moved = moved or reused[page_id] != [previous_elements[element_id]
+                                                     for element_id in previous["element_ids"]]
+    
+    page_names = {page_id: next(element["name"] for element in page_elements if element["type"] == "page")
+                  for page_id, page_elements in pages.items()}
+    changes = {
+        "added": [page_names[page_id] for page_id in pages if page_id not in previous_pages],
+        "changed": [page_names[page_id] for page_id in pages
+                    if page_id in previous_pages and previous_pages[page_id]["fingerprint"] != fingerprints[page_id]],
+        "removed": [previous["name"] for page_id, previous in previous_pages.items() if page_id not in pages],
+        "unchanged": [page_names[page_id] for page_id in pages
+                      if page_id in previous_pages and previous_pages[page_id]["fingerprint"] == fingerprints[page_id]],
+        "enhanced": [page_names[page_id] for page_id in pages if page_id not in reused]
+    }
+    
+    return {
+        "project_id": project_id,
+        "pages": pages,
+        "page_names": page_names,
+        "fingerprints": fingerprints,
+        "model": model_name,
+        "reused": reused,
+        "sources": sources,
+        "moved": moved,
+        "stale": [page_id for page_id in pages if page_id not in reused],
+        "changes": changes
+    }
+
+def get_stale_elements(update: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Elements of the pages that need enhancing"""
+    return [element for page_id in update["stale"] for element in update["pages"][page_id]]
+
+def assign_to_pages(enhanced_elements: List[Dict[str, Any]], update: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Attribute enhanced elements back to the stale pages they came from"""
+    stale = update["stale"]
+    owners = {element["id"]: page_id for page_id in stale for element in update["pages"][page_id]}
+    assigned = {page_id: [] for page_id in stale}
+    
+    for element in enhanced_elements:
+        # Elements are enhanced without their positions
+        element = with_scanned_source(element, update["sources"])
+        element_id = element.get("id")
+        if element_id in assigned:
+            page_id = element_id
+        elif element_id in owners:
+            page_id = owners[element_id]
+        elif element.get("parent_id") in assigned:
+            page_id = element["parent_id"]
+        else:
+            # Elements the model invented without a recognizable page
+            page_id = stale[0]
+        assigned[page_id].append(element)
+    
+    return assigned
+
+def complete_pom_update(update: Dict[str, Any], enhanced_elements: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Combine reused and newly enhanced pages, then write the POM files and manifest"""
+    project_dir = os.path.join(settings.RESULTS_DIR, update["project_id"])
+    os.makedirs(project_dir, exist_ok=True)
+    
+    page_elements = dict(update["reused"])
+    assigned = assign_to_pages(enhanced_elements, update) if enhanced_elements else {}
+    # Pages the model returned nothing for, or failed on, are enhanced again next time
+    unenhanced = set()
+    for page_id in update["stale"]:
+        # They keep their organized elements meanwhile
+        page_elements[page_id] = assigned.get(page_id) or update["pages"][page_id]
+        if update["model"] is not None and not assigned.get(page_id):
+            unenhanced.add(page_id)
+    
+    organized_elements = [element for page_id in update["pages"] for element in page_elements[page_id]]
+    
+    pom_file_path = os.path.join(project_dir, "page_object_model.json")
+    changes = update["changes"]
+    if update["stale"] or update["moved"] or changes["removed"] or not os.path.exists(pom_file_path):
+        save_pom_files(organized_elements, update["project_id"])
+    
+    manifest = {
+        "model": update["model"],
+        "pages": {
+            page_id: {
+                "name": update["page_names"][page_id],
+                "fingerprint": update["fingerprints"][page_id],
+                "enhanced": page_id not in unenhanced,
+                "element_ids": [element["id"] for element in page_elements[page_id] if "id" in element]
+            }
+            for page_id in update["pages"]
+        }
+    }
+    with open(os.path.join(project_dir, POM_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    return {
+        "elements": organized_elements,
+        "file_path": pom_file_path,
+        "changes": changes
+    }
+
+def generate_pom(elements: List[Dict[str, Any]], project_id: str, regenerate: bool = False) -> Dict[str, Any]:
+    """Generate Page Object Model from extracted elements, re-enhancing only changed pages"""
+    update = prepare_pom_update(elements, project_id, regenerate)
+    enhanced_elements = None
+    
+    # Use the LLM provider to enhance POM structure if it is configured
+    if update["stale"] and llm_enabled():
         try:
-            enhanced_elements = generate_pom_with_gemini(organized_elements)
-            if enhanced_elements:
-                organized_elements = enhanced_elements
+            enhanced_elements = generate_pom_with_gemini(get_stale_elements(update), regenerate=regenerate)
         except Exception as e:
             print(f"Error using Gemini API: {e}")
     
+    return complete_pom_update(update, enhanced_elements)
+
+async def generate_pom_stream(elements: List[Dict[str, Any]], project_id: str,
+                              regenerate: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """Generate a Page Object Model, yielding each element as soon as it is final.
+
+    Elements of unchanged pages come first, straight from the previous POM.
+    Yields {"event": "element", "data": element} for every element and
+    finally {"event": "pom", "data": ...} with what generate_pom returns.
+    """
+    update = await asyncio.to_thread(prepare_pom_update, elements, project_id, regenerate)
+    for page_elements in update["reused"].values():
+        for element in page_elements:
+            yield {"event": "element", "data": element}
+    
+    stale_elements = get_stale_elements(update)
+    enhanced_elements = []
+    seen_ids = set()
+    
+    if stale_elements and llm_enabled():
+        try:
+            async for element in stream_pom_with_gemini(stale_elements, regenerate=regenerate):
+                enhanced_elements.append(element)
+                # Pages split across batches arrive more than once
+                if element.get("id") not in seen_ids:
+                    seen_ids.add(element.get("id"))
+                    yield {"event": "element", "data": with_scanned_source(element, update["sources"])}
+        except Exception as e:
+            print(f"Error using Gemini API: {e}")
+    
+    if enhanced_elements:
+        enhanced_elements = merge_elements([enhanced_elements])
+    else:
+        for element in stale_elements:
+            yield {"event": "element", "data": element}
+    
+    pom_data = await asyncio.to_thread(complete_pom_update, update, enhanced_elements)
+    yield {"event": "pom", "data": pom_data}
+
+def save_pom_files(organized_elements: List[Dict[str, Any]], project_id: str) -> Dict[str, Any]:
+    """Write the POM JSON and its Python classes into the project's results directory"""
+    # Create results directory for the project
+    project_dir = os.path.join(settings.RESULTS_DIR, project_id)
+    os.makedirs(project_dir, exist_ok=True)
+    
     # Save POM to file
     pom_file_path = os.path.join(project_dir, "page_object_model.json")
     with open(pom_file_path, 'w', encoding='utf-8') as f:
@@ -64,106 +523,126 @@ def generate_pom(elements: List[Dict[str, Any]], project_id: str) -> Dict[str, A
         "file_path": pom_file_path
     }
 
-def generate_pom_code_file(elements, project_dir: str) -> str:
-    """Generate Python code representation of the POM"""
-    code = """from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-class BasePage:
-    def __init__(self, driver):
-        self.driver = driver
-        
-    def find_element(self, selector, selector_type):
-        if selector_type == "id":
-            return self.driver.find_element(By.ID, selector.replace('#', ''))
-        elif selector_type == "class":
-            return self.driver.find_element(By.CLASS_NAME, selector.replace('.', ''))
-        elif selector_type == "name":
-            return self.driver.find_element(By.NAME, selector.split('=')[1].replace("'", ""))
-        elif selector_type == "xpath":
-            return self.driver.find_element(By.XPATH, selector)
-        elif selector_type == "css":
-            return self.driver.find_element(By.CSS_SELECTOR, selector)
-        elif selector_type == "data-testid":
-            return self.driver.find_element(By.CSS_SELECTOR, selector)
-        else:
-            return self.driver.find_element(By.CSS_SELECTOR, selector)
-            
-    def click(self, selector, selector_type):
-        element = self.find_element(selector, selector_type)
-        element.click()
-        
-    def input_text(self, selector, selector_type, text):
-        element = self.find_element(selector, selector_type)
-        element.clear()
-        element.send_keys(text)
-        
-    def get_text(self, selector, selector_type):
-        element = self.find_element(selector, selector_type)
-        return element.text
+def emit_page_class(emitter: CodeEmitter, page, page_elements):
+    """Write one page object class with a PageElement and action method per element"""
+    emitter.emit_class(PAGE_CLASS_TEMPLATE, page.name)
+    
+    for element in page_elements:
+        values = {
+            "class_name": page.name,
+            "element_name": element.name.replace('-', '_'),
+            # Selectors often contain quotes themselves
+            "selector": repr(element.selector),
+            "selector_type": repr(element.selector_type)
+        }
+        emitter.emit(ELEMENT_PROPERTY_TEMPLATE, **values)
         
-    def wait_for_element(self, selector, selector_type, timeout=10):
-        if selector_type == "id":
-            return WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.ID, selector.replace('#', '')))
-            )
-        elif selector_type == "class":
-            return WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CLASS_NAME, selector.replace('.', '')))
-            )
-        elif selector_type == "xpath":
-            return WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.XPATH, selector))
-            )
-        else:
-            return WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-            )
-"""
+        action_template = ACTION_TEMPLATES.get(element.type)
+        if action_template is not None:
+            emitter.emit(action_template, **values)
 
-    # Group elements by page
-    pages = [element for element in elements if element["type"] == "page"]
+def generate_pom_code_file(elements: Union[List[Dict[str, Any]], PomIndex], project_dir: str,
+                           split_modules: bool = settings.POM_SPLIT_MODULES) -> str:
+    """Generate Python code representation of the POM from element dicts or a PomIndex.
+
+    Writes page_objects.py, or with split_modules a page_objects package
+    with one module per page whose __init__ imports each class on first
+    access. Page modules that would come out unchanged are not rewritten.
+    Returns the path of the module or package.
+    """
+    pom_index = elements if isinstance(elements, PomIndex) else PomIndex.from_dicts(elements)
+    py_file_path = os.path.join(project_dir, f"{PAGE_OBJECTS_MODULE}.py")
+    package_dir = os.path.join(project_dir, PAGE_OBJECTS_MODULE)
     
-    # Generate page classes
-    for page in pages:
-        page_elements = [e for e in elements if e.get("parent_id") == page["id"]]
+    if not split_modules:
+        # A leftover package would shadow the module on import
+        shutil.rmtree(package_dir, ignore_errors=True)
+        with open_module(py_file_path) as f:
+            emitter = CodeEmitter(f)
+            emitter.emit_text(BASE_PAGE_CODE)
+            for page in pom_index.pages:
+                emit_page_class(emitter, page, pom_index.children(page.id))
+        return py_file_path
+    
+    if os.path.exists(py_file_path):
+        os.remove(py_file_path)
+    os.makedirs(package_dir, exist_ok=True)
+    
+    write_if_changed(os.path.join(package_dir, f"{BASE_PAGE_MODULE}.py"), BASE_PAGE_CODE)
+    
+    module_names = assign_page_modules(pom_index.pages)
+    for page in pom_index.pages:
+        page_elements = pom_index.children(page.id)
+        module_path = os.path.join(package_dir, f"{module_names[page.id]}.py")
+        stamp = PAGE_MODULE_STAMP.render(page_id=page.id, fingerprint=fingerprint_page_module(page, page_elements))
         
-        code += f"\nclass {page['name']}(BasePage):\n"
-        code += "    def __init__(self, driver):\n"
-        code += "        super().__init__(driver)\n"
+        # Leaving unchanged modules alone keeps their compiled bytecode valid
+        if read_first_line(module_path) == stamp:
+            continue
         
-        # Create element properties and methods
-        for element in page_elements:
-            element_name = element["name"].replace('-', '_')
-            element_type = element["type"]
-            selector = element["selector"]
-            selector_type = element["selector_type"]
-            
-            # Element locator property
-            code += f"\n    @property\n"
-            code += f"    def {element_name}(self):\n"
-            code += f"        return self.find_element('{selector}', '{selector_type}')\n"
-            
-            # Element action methods based on type
-            if element_type in ["button", "a"]:
-                code += f"\n    def click_{element_name}(self):\n"
-                code += f"        self.click('{selector}', '{selector_type}')\n"
-            
-            elif element_type in ["input", "textarea"]:
-                code += f"\n    def set_{element_name}(self, text):\n"
-                code += f"        self.input_text('{selector}', '{selector_type}', text)\n"
-            
-            elif element_type == "select":
-                code += f"\n    def select_{element_name}(self, value):\n"
-                code += f"        element = self.find_element('{selector}', '{selector_type}')\n"
-                code += f"        from selenium.webdriver.support.ui import Select\n"
-                code += f"        select = Select(element)\n"
-                code += f"        select.select_by_visible_text(value)\n"
-    
-    # Save Python file
-    py_file_path = os.path.join(project_dir, "page_objects.py")
-    with open(py_file_path, 'w', encoding='utf-8') as f:
-        f.write(code)
-    
-    return py_file_path
\ No newline at end of file
+        with open_module(module_path) as f:
+            emitter = CodeEmitter(f)
+            emitter.emit_text(stamp)
+            emitter.emit_text(PAGE_MODULE_HEADER)
+            emit_page_class(emitter, page, page_elements)
+    
+    # Remove modules of pages that no longer exist
+    current_modules = {f"{module_name}.py" for module_name in module_names.values()}
+    current_modules.update({f"{BASE_PAGE_MODULE}.py", "__init__.py"})
+    for entry in os.scandir(package_dir):
+        if entry.is_file() and entry.name.endswith('.py') and entry.name not in current_modules:
+            os.remove(entry.path)
+    
+    init_parts = [PACKAGE_INIT_HEADER]
+    init_parts.extend(PACKAGE_ENTRY_TEMPLATE.render(class_name=name, module_name=BASE_PAGE_MODULE)
+                      for name in BASE_PAGE_EXPORTS)
+    init_parts.extend(PACKAGE_ENTRY_TEMPLATE.render(class_name=page.name, module_name=module_names[page.id])
+                      for page in pom_index.pages)
+    init_parts.append(PACKAGE_INIT_FOOTER)
+    write_if_changed(os.path.join(package_dir, "__init__.py"), "".join(init_parts))
+    
+    return package_dir
+
+def assign_page_modules(pages) -> Dict[str, str]:
+    """Map page IDs to module names derived from the page class names.
+
+    Names that only differ in punctuation or case would share a module, so
+    later ones get a suffix from their page ID, which keeps every name
+    stable across regenerations.
+    """
+    module_names = {}
+    taken = {BASE_PAGE_MODULE}
+    for page in pages:
+        module_name = module_name_for(page.name)
+        if module_name in taken:
+            module_name = f"{module_name}_{hashlib.sha1(page.id.encode('utf-8')).hexdigest()[:8]}"
+        taken.add(module_name)
+        module_names[page.id] = module_name
+    return module_names
+
+def fingerprint_page_module(page, page_elements) -> str:
+    """Hash everything that goes into a page module"""
+    emitted = [page.name] + [[element.name, element.type, element.selector, element.selector_type]
+                             for element in page_elements]
+    digest = hashlib.sha256(TEMPLATES_DIGEST.encode('utf-8'))
+    digest.update(json.dumps(emitted).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def read_first_line(path: str) -> Optional[str]:
+    """First line of a file including its newline, or None if it cannot be read"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.readline()
+    except OSError:
+        return None
+
+def write_if_changed(path: str, content: str):
+    """Write a small generated file unless it already has this content"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    with open_module(path) as f:
+        f.write(content)
@@ -0,0 +1,118 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+class PomElement:
+    """One POM element or page record.
+
+    Fields missing from the source dict are None and are left out again by
+    to_dict, so records round-trip unchanged. Keys the POM schema does not
+    know about (descriptions added by the LLM and the like) are kept in
+    extra.
+    """
+    __slots__ = ("id", "name", "type", "selector", "selector_type", "properties", "parent_id", "children", "extra")
+    FIELDS = ("id", "name", "type", "selector", "selector_type", "properties", "parent_id", "children")
+    
+    def __init__(self, id: str, name: str = "", type: str = "", selector: Optional[str] = None,
+                 selector_type: Optional[str] = None, properties: Optional[Dict[str, Any]] = None,
+                 parent_id: Optional[str] = None, children: Optional[List[str]] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.selector = selector
+        self.selector_type = selector_type
+        self.properties = properties
+        self.parent_id = parent_id
+        self.children = children
+        self.extra = extra
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PomElement":
+        """Create a record from a POM element dict"""
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        return cls(
+            data.get("id"),
+            data.get("name", ""),
+            data.get("type", ""),
+            data.get("selector"),
+            data.get("selector_type"),
+            data.get("properties"),
+            data.get("parent_id"),
+            data.get("children"),
+            extra or None
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert back to a POM element dict"""
+        data = {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+    
+    def __reduce__(self):
+        return (PomElement, tuple(getattr(self, field) for field in self.__slots__))
+    
+    def __repr__(self) -> str:
+        return f"PomElement(id={self.id!r}, name={self.name!r}, type={self.type!r})"
+
+class PomIndex:
+    """A POM's elements with id and parent lookups built in one pass.
+
+    Children are found through their parent_id, in POM order. Elements
+    whose parent is not a page of this POM are orphans. Only the element
+    list is serialized; the lookups are rebuilt on load.
+    """
+    __slots__ = ("elements", "_by_id", "_children", "_pages")
+    
+    def __init__(self, elements: Iterable[PomElement]):
+        self.elements: List[PomElement] = list(elements)
+        self._by_id: Dict[str, PomElement] = {}
+        self._children: Dict[Optional[str], List[PomElement]] = {}
+        self._pages: List[PomElement] = []
+        
+        for element in self.elements:
+            # Duplicate IDs resolve to the first record, like the POM JSON readers
+            self._by_id.setdefault(element.id, element)
+            if element.type == "page":
+                self._pages.append(element)
+            else:
+                self._children.setdefault(element.parent_id, []).append(element)
+    
+    @classmethod
+    def from_dicts(cls, elements: Iterable[Dict[str, Any]]) -> "PomIndex":
+        """Build an index from POM element dicts"""
+        return cls(PomElement.from_dict(element) for element in elements)
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert every element back to a POM element dict, in POM order"""
+        return [element.to_dict() for element in self.elements]
+    
+    def __reduce__(self):
+        return (PomIndex, (self.elements,))
+    
+    def __len__(self) -> int:
+        return len(self.elements)
+    
+    def __iter__(self) -> Iterator[PomElement]:
+        return iter(self.elements)
+    
+    def __contains__(self, element_id: str) -> bool:
+        return element_id in self._by_id
+    
+    def get(self, element_id: str) -> Optional[PomElement]:
+        """Look up an element by ID"""
+        return self._by_id.get(element_id)
+    
+    @property
+    def pages(self) -> List[PomElement]:
+        """Page records in POM order"""
+        return self._pages
+    
+    def children(self, parent_id: str) -> List[PomElement]:
+        """Elements whose parent_id is parent_id"""
+        return self._children.get(parent_id, [])
+    
+    def orphans(self) -> List[PomElement]:
+        """Non-page elements that do not belong to any page of this POM"""
+        page_ids = {page.id for page in self._pages}
+        return [element for parent_id, children in self._children.items()
+                if parent_id not in page_ids for element in children]
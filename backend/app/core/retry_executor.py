@@ -0,0 +1,119 @@
+import os
+import re
+import time
+import threading
+from typing import Dict, Any, List, Optional
+from app.core.test_executor import execute_test_targets, get_report_path
+from app.core.test_reporter import FAILED, ERROR, PASSED
+from app.core.log_store import archive_log
+from app.models.project import TestCase
+from config import settings
+
+RETRYABLE_STATUSES = (FAILED, ERROR)
+
+# Errors in class and module fixtures are reported as "setUpClass (test_1.TestA)"
+FIXTURE_TEST_PATTERN = re.compile(r"^\w+ \((?P<target>[\w.]+)\)$")
+
+# Modules that failed to import are reported as unittest.loader._FailedTest.<module>
+FAILED_IMPORT_PREFIX = "unittest.loader._FailedTest."
+
+def retry_target(test_id: str) -> str:
+    """The unittest name that re-runs a reported test, fixture error or import error"""
+    match = FIXTURE_TEST_PATTERN.match(test_id)
+    if match:
+        return match.group("target")
+    if test_id.startswith(FAILED_IMPORT_PREFIX):
+        return test_id[len(FAILED_IMPORT_PREFIX):]
+    return test_id
+
+def is_placeholder(test_id: str) -> bool:
+    """Whether a reported test stands for tests that could not run, not a test itself"""
+    return bool(FIXTURE_TEST_PATTERN.match(test_id)) or test_id.startswith(FAILED_IMPORT_PREFIX)
+
+def retry_failed_tests(test_case: TestCase, result: Dict[str, Any], log_path: str,
+                       max_retries: int = settings.TEST_RETRIES,
+                       cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """Re-run only the failed and errored tests of an execution and merge the results.
+
+    Each attempt re-runs the tests still failing, up to max_retries
+    attempts. A test that passes on retry is marked flaky and counts as
+    passed. Every attempt gets its own log and report next to the
+    original log, listed under "retries" in the merged result.
+    """
+    tests = [dict(test) for test in result.get("tests", [])]
+    retries = list(result.get("retries", []))
+    status = None
+    
+    for _ in range(max_retries):
+        failing = [test for test in tests if test["status"] in RETRYABLE_STATUSES]
+        if not failing:
+            break
+        
+        attempt = len(retries) + 1
+        targets = list(dict.fromkeys(retry_target(test["id"]) for test in failing))
+        attempt_log = f"{os.path.splitext(log_path)[0]}.retry{attempt}.log"
+        
+        started = time.monotonic()
+        attempt_result = execute_test_targets(test_case, targets, cancel_event=cancel_event, log_file=attempt_log)
+        if attempt_result["status"] in ("CANCELLED", "TIMEOUT", "ERROR"):
+            status = attempt_result["status"]
+        
+        merge_retry_results(tests, attempt_result["result"]["tests"], completed=status is None)
+        retries.append({
+            "attempt": attempt,
+            "tests": targets,
+            "return_code": attempt_result["result"]["return_code"],
+            "duration": round(time.monotonic() - started, 3),
+            "log_path": attempt_log,
+            "report_path": get_report_path(attempt_log)
+        })
+        try:
+            archive_log(attempt_log)
+        except Exception as e:
+            print(f"Error archiving retry log {attempt_log}: {str(e)}")
+        
+        if status is not None:
+            break
+    
+    if status is None:
+        status = "FAILURE" if any(test["status"] in RETRYABLE_STATUSES for test in tests) else "SUCCESS"
+    
+    merged = dict(result)
+    merged.update({
+        "tests": tests,
+        "retries": retries,
+        "flaky": [test["id"] for test in tests if test.get("flaky")]
+    })
+    return {"status": status, "result": merged}
+
+def merge_retry_results(tests: List[Dict[str, Any]], retried: List[Dict[str, Any]], completed: bool):
+    """Merge the results of one retry attempt into the execution's tests, in place"""
+    by_id = {test["id"]: test for test in tests}
+    
+    for new in retried:
+        test = by_id.get(new["id"])
+        if test is None:
+            # A test that could not run before, because of a fixture or import error
+            new["attempts"] = 1
+            new["flaky"] = new["status"] == PASSED
+            tests.append(new)
+            by_id[new["id"]] = new
+            continue
+        
+        test["attempts"] = test.get("attempts", 1) + 1
+        test["duration"] = new["duration"]
+        if new["status"] in RETRYABLE_STATUSES:
+            test["status"] = new["status"]
+            test["traceback"] = new.get("traceback", test.get("traceback"))
+        elif test["status"] in RETRYABLE_STATUSES:
+            # Passed (or was skipped) after failing: keep the first failure for reference
+            test["flaky"] = True
+            test["first_failure"] = test.pop("traceback", None)
+            test["status"] = new["status"]
+    
+    if completed:
+        # Fixture and import errors that did not happen again are replaced by the tests they hid
+        retried_ids = {new["id"] for new in retried}
+        tests[:] = [test for test in tests if not (
+            test["status"] in RETRYABLE_STATUSES and is_placeholder(test["id"]) and test["id"] not in retried_ids
+        )]
@@ -0,0 +1,380 @@
+import os
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from app.models.project import Project, POM, TestCase, TestExecution, Job
+from config import settings
+
+STORAGE_BACKENDS = ("sqlite", "memory")
+
+class BaseStorage(ABC):
+    """Persistence interface for projects, scans, POMs, test cases, executions and jobs.
+
+    Project.pom_ids and Project.test_ids are derived from the stored POMs
+    and test cases, so callers never rewrite a project to link them.
+    """
+    @abstractmethod
+    def save_project(self, project: Project):
+        ...
+    
+    @abstractmethod
+    def get_project(self, project_id: str) -> Optional[Project]:
+        ...
+    
+    @abstractmethod
+    def list_projects(self) -> List[Project]:
+        ...
+    
+    @abstractmethod
+    def save_scan(self, project_id: str, elements: List[Dict[str, Any]]):
+        ...
+    
+    @abstractmethod
+    def get_scan(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        ...
+    
+    @abstractmethod
+    def save_pom(self, pom: POM):
+        ...
+    
+    @abstractmethod
+    def get_pom(self, pom_id: str) -> Optional[POM]:
+        ...
+    
+    @abstractmethod
+    def list_poms(self, project_id: str) -> List[POM]:
+        ...
+    
+    @abstractmethod
+    def save_test_case(self, test_case: TestCase):
+        ...
+    
+    @abstractmethod
+    def get_test_case(self, test_id: str) -> Optional[TestCase]:
+        ...
+    
+    @abstractmethod
+    def list_test_cases(self, project_id: str) -> List[TestCase]:
+        ...
+    
+    @abstractmethod
+    def save_execution(self, execution: TestExecution):
+        ...
+    
+    @abstractmethod
+    def get_execution(self, execution_id: str) -> Optional[TestExecution]:
+        ...
+    
+    @abstractmethod
+    def list_executions(self, project_id: str, test_id: Optional[str] = None) -> List[TestExecution]:
+        ...
+    
+    @abstractmethod
+    def save_job(self, job: Job):
+        ...
+    
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Job]:
+        ...
+    
+    @abstractmethod
+    def list_jobs(self, project_id: Optional[str] = None) -> List[Job]:
+        ...
+
+class InMemoryStorage(BaseStorage):
+    """Process-local storage for tests and single-worker development"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._projects: Dict[str, Project] = {}
+        self._scans: Dict[str, List[Dict[str, Any]]] = {}
+        self._poms: Dict[str, POM] = {}
+        self._test_cases: Dict[str, TestCase] = {}
+        self._executions: Dict[str, TestExecution] = {}
+        self._jobs: Dict[str, Job] = {}
+        # project_id -> ids in insertion order
+        self._project_poms: Dict[str, List[str]] = {}
+        self._project_tests: Dict[str, List[str]] = {}
+        self._project_executions: Dict[str, List[str]] = {}
+    
+    def _link(self, index: Dict[str, List[str]], project_id: str, item_id: str):
+        ids = index.setdefault(project_id, [])
+        if item_id not in ids:
+            ids.append(item_id)
+    
+    def _with_links(self, project: Project) -> Project:
+        return project.model_copy(update={
+            "pom_ids": list(self._project_poms.get(project.id, [])),
+            "test_ids": list(self._project_tests.get(project.id, []))
+        })
+    
+    def save_project(self, project: Project):
+        with self._lock:
+            self._projects[project.id] = project.model_copy(deep=True)
+    
+    def get_project(self, project_id: str) -> Optional[Project]:
+        with self._lock:
+            project = self._projects.get(project_id)
+            return self._with_links(project) if project else None
+    
+    def list_projects(self) -> List[Project]:
+        with self._lock:
+            return [self._with_links(project) for project in self._projects.values()]
+    
+    def save_scan(self, project_id: str, elements: List[Dict[str, Any]]):
+        with self._lock:
+            self._scans[project_id] = elements
+    
+    def get_scan(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            return self._scans.get(project_id)
+    
+    def save_pom(self, pom: POM):
+        with self._lock:
+            self._poms[pom.id] = pom.model_copy(deep=True)
+            self._link(self._project_poms, pom.project_id, pom.id)
+    
+    def get_pom(self, pom_id: str) -> Optional[POM]:
+        with self._lock:
+            pom = self._poms.get(pom_id)
+            return pom.model_copy(deep=True) if pom else None
+    
+    def list_poms(self, project_id: str) -> List[POM]:
+        with self._lock:
+            return [self._poms[pom_id].model_copy(deep=True)
+                    for pom_id in self._project_poms.get(project_id, [])]
+    
+    def save_test_case(self, test_case: TestCase):
+        with self._lock:
+            self._test_cases[test_case.id] = test_case.model_copy(deep=True)
+            self._link(self._project_tests, test_case.project_id, test_case.id)
+    
+    def get_test_case(self, test_id: str) -> Optional[TestCase]:
+        with self._lock:
+            test_case = self._test_cases.get(test_id)
+            return test_case.model_copy(deep=True) if test_case else None
+    
+    def list_test_cases(self, project_id: str) -> List[TestCase]:
+        with self._lock:
+            return [self._test_cases[test_id].model_copy(deep=True)
+                    for test_id in self._project_tests.get(project_id, [])]
+    
+    def save_execution(self, execution: TestExecution):
+        with self._lock:
+            self._executions[execution.id] = execution.model_copy(deep=True)
+            self._link(self._project_executions, execution.project_id, execution.id)
+    
+    def get_execution(self, execution_id: str) -> Optional[TestExecution]:
+        with self._lock:
+            execution = self._executions.get(execution_id)
+            return execution.model_copy(deep=True) if execution else None
+    
+    def list_executions(self, project_id: str, test_id: Optional[str] = None) -> List[TestExecution]:
+        with self._lock:
+            executions = [self._executions[execution_id]
+                          for execution_id in self._project_executions.get(project_id, [])]
+            return [execution.model_copy(deep=True) for execution in executions
+                    if test_id is None or execution.test_id == test_id]
+    
+    def save_job(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = job.model_copy(deep=True)
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy(deep=True) if job else None
+    
+    def list_jobs(self, project_id: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            return [job.model_copy(deep=True) for job in self._jobs.values()
+                    if project_id is None or job.project_id == project_id]
+
+class SQLiteStorage(BaseStorage):
+    """Embedded SQLite storage shared by every worker process on the host.
+
+    Records are stored as JSON documents next to the columns they are
+    looked up by. WAL mode lets readers in other processes run while a
+    job is writing.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS projects (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS scans (
+            project_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS poms (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS test_cases (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            pom_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS test_executions (
+            id TEXT PRIMARY KEY,
+            project_id TEXT NOT NULL,
+            test_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            project_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_poms_project_id ON poms (project_id);
+        CREATE INDEX IF NOT EXISTS idx_test_cases_project_id ON test_cases (project_id);
+        CREATE INDEX IF NOT EXISTS idx_test_executions_project_id ON test_executions (project_id);
+        CREATE INDEX IF NOT EXISTS idx_test_executions_test_id ON test_executions (test_id);
+        CREATE INDEX IF NOT EXISTS idx_jobs_project_id ON jobs (project_id);
+    """
+    
+    def __init__(self, database_path: str):
+        self.database_path = database_path
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        # One connection per thread; jobs run on worker threads
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+    
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+    
+    def _upsert(self, table: str, row: Dict[str, Any]):
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        key = next(iter(row))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in row if column != key)
+        # ON CONFLICT keeps the rowid, so listings stay in creation order
+        self._connection().execute(
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates}",
+            tuple(row.values())
+        )
+    
+    def _fetch_one(self, query: str, params: tuple) -> Optional[str]:
+        row = self._connection().execute(query, params).fetchone()
+        return row[0] if row else None
+    
+    def _fetch_all(self, query: str, params: tuple = ()) -> List[str]:
+        return [row[0] for row in self._connection().execute(query, params)]
+    
+    def _with_links(self, data: str) -> Project:
+        project = Project.model_validate_json(data)
+        project.pom_ids = self._fetch_all(
+            "SELECT id FROM poms WHERE project_id = ? ORDER BY rowid", (project.id,)
+        )
+        project.test_ids = self._fetch_all(
+            "SELECT id FROM test_cases WHERE project_id = ? ORDER BY rowid", (project.id,)
+        )
+        return project
+    
+    def save_project(self, project: Project):
+        self._upsert("projects", {"id": project.id, "data": project.model_dump_json()})
+    
+    def get_project(self, project_id: str) -> Optional[Project]:
+        data = self._fetch_one("SELECT data FROM projects WHERE id = ?", (project_id,))
+        return self._with_links(data) if data else None
+    
+    def list_projects(self) -> List[Project]:
+        return [self._with_links(data)
+                for data in self._fetch_all("SELECT data FROM projects ORDER BY rowid")]
+    
+    def save_scan(self, project_id: str, elements: List[Dict[str, Any]]):
+        self._upsert("scans", {"project_id": project_id, "data": json.dumps(elements)})
+    
+    def get_scan(self, project_id: str) -> Optional[List[Dict[str, Any]]]:
+        data = self._fetch_one("SELECT data FROM scans WHERE project_id = ?", (project_id,))
+        return json.loads(data) if data else None
+    
+    def save_pom(self, pom: POM):
+        self._upsert("poms", {"id": pom.id, "project_id": pom.project_id, "data": pom.model_dump_json()})
+    
+    def get_pom(self, pom_id: str) -> Optional[POM]:
+        data = self._fetch_one("SELECT data FROM poms WHERE id = ?", (pom_id,))
+        return POM.model_validate_json(data) if data else None
+    
+    def list_poms(self, project_id: str) -> List[POM]:
+        return [POM.model_validate_json(data) for data in self._fetch_all(
+            "SELECT data FROM poms WHERE project_id = ? ORDER BY rowid", (project_id,)
+        )]
+    
+    def save_test_case(self, test_case: TestCase):
+        self._upsert("test_cases", {
+            "id": test_case.id,
+            "project_id": test_case.project_id,
+            "pom_id": test_case.pom_id,
+            "data": test_case.model_dump_json()
+        })
+    
+    def get_test_case(self, test_id: str) -> Optional[TestCase]:
+        data = self._fetch_one("SELECT data FROM test_cases WHERE id = ?", (test_id,))
+        return TestCase.model_validate_json(data) if data else None
+    
+    def list_test_cases(self, project_id: str) -> List[TestCase]:
+        return [TestCase.model_validate_json(data) for data in self._fetch_all(
+            "SELECT data FROM test_cases WHERE project_id = ? ORDER BY rowid", (project_id,)
+        )]
+    
+    def save_execution(self, execution: TestExecution):
+        self._upsert("test_executions", {
+            "id": execution.id,
+            "project_id": execution.project_id,
+            "test_id": execution.test_id,
+            "data": execution.model_dump_json()
+        })
+    
+    def get_execution(self, execution_id: str) -> Optional[TestExecution]:
+        data = self._fetch_one("SELECT data FROM test_executions WHERE id = ?", (execution_id,))
+        return TestExecution.model_validate_json(data) if data else None
+    
+    def list_executions(self, project_id: str, test_id: Optional[str] = None) -> List[TestExecution]:
+        if test_id is None:
+            rows = self._fetch_all(
+                "SELECT data FROM test_executions WHERE project_id = ? ORDER BY rowid", (project_id,)
+            )
+        else:
+            rows = self._fetch_all(
+                "SELECT data FROM test_executions WHERE project_id = ? AND test_id = ? ORDER BY rowid",
+                (project_id, test_id)
+            )
+        return [TestExecution.model_validate_json(data) for data in rows]
+    
+    def save_job(self, job: Job):
+        self._upsert("jobs", {"id": job.id, "project_id": job.project_id, "data": job.model_dump_json()})
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        data = self._fetch_one("SELECT data FROM jobs WHERE id = ?", (job_id,))
+        return Job.model_validate_json(data) if data else None
+    
+    def list_jobs(self, project_id: Optional[str] = None) -> List[Job]:
+        if project_id is None:
+            rows = self._fetch_all("SELECT data FROM jobs ORDER BY rowid")
+        else:
+            rows = self._fetch_all("SELECT data FROM jobs WHERE project_id = ? ORDER BY rowid", (project_id,))
+        return [Job.model_validate_json(data) for data in rows]
+
+def create_storage(backend: str = settings.STORAGE_BACKEND) -> BaseStorage:
+    """Create the storage backend named in settings"""
+    if backend == "sqlite":
+        return SQLiteStorage(settings.DATABASE_PATH)
+    if backend == "memory":
+        return InMemoryStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+storage = create_storage()
@@ -2,56 +2,101 @@ import os
 import subprocess
 import json
 import uuid
+import time
 import datetime
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List, Optional
+from app.core.test_reporter import REPORT_PATH_ENV, build_test_results, reporter_command
 from app.models.project import TestCase
 from config import settings
 
-def execute_test(test_case: TestCase) -> Dict[str, Any]:
-    """Execute a test case and return the results"""
-    # Create results directory
-    project_dir = os.path.join(settings.RESULTS_DIR, test_case.project_id)
-    results_dir = os.path.join(project_dir, "execution_results")
-    os.makedirs(results_dir, exist_ok=True)
-    
-    # Generate unique ID for this execution
-    execution_id = str(uuid.uuid4())
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(results_dir, f"execution_{execution_id}_{timestamp}.log")
+# Characters of the log kept in an execution result; the full log stays on disk
+LOG_SUMMARY_CHARS = 1000
+
+def execute_test(test_case: TestCase, cancel_event: Optional[threading.Event] = None,
+                 log_file: Optional[str] = None) -> Dict[str, Any]:
+    """Execute a test case and return the results.
+
+    Output is written to log_file as the test runs, so it can be followed
+    while the execution is in progress.
+    """
+    log_file = log_file or create_log_path(test_case.project_id)
+    report_file = get_report_path(log_file)
     
     # Prepare command
     script_path = test_case.script_path
+    env = os.environ.copy()
+    env[REPORT_PATH_ENV] = report_file
+    # Flush test output line by line so followers see it as it is printed
+    env["PYTHONUNBUFFERED"] = "1"
+    
+    return run_under_reporter(reporter_command("script", [script_path]), log_file, env, cancel_event)
+
+def execute_test_targets(test_case: TestCase, targets: List[str], cancel_event: Optional[threading.Event] = None,
+                         log_file: Optional[str] = None) -> Dict[str, Any]:
+    """Execute only the named test modules, classes or methods of a test case's suite"""
+    log_file = log_file or create_log_path(test_case.project_id)
+    test_directory = os.path.dirname(test_case.script_path)
+    
+    # Generated tests import page_objects from the project directory
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.abspath(os.path.dirname(test_directory)), env.get("PYTHONPATH", "")]
+    )
+    env[REPORT_PATH_ENV] = os.path.abspath(get_report_path(log_file))
+    env["PYTHONUNBUFFERED"] = "1"
+    
+    return run_under_reporter(reporter_command("module", targets), log_file, env, cancel_event, cwd=test_directory)
+
+def run_under_reporter(command: List[str], log_file: str, env: Dict[str, str],
+                       cancel_event: Optional[threading.Event] = None, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Run a reporter command with output to log_file and build the execution result"""
+    report_file = get_report_path(log_file)
     
     try:
-        # Execute test script
+        # Execute test script under the reporter, which records each test's result
         with open(log_file, 'w') as f:
-            result = subprocess.run(
-                ['python', script_path],
+            process = subprocess.Popen(
+                command,
                 stdout=f,
                 stderr=subprocess.STDOUT,
                 text=True,
-                timeout=300  # 5 minute timeout
+                cwd=cwd,
+                env=env
             )
+            return_code = wait_for_process(process, 300, cancel_event)  # 5 minute timeout
         
-        # Read log file
-        with open(log_file, 'r') as f:
-            log_content = f.read()
+        if return_code is None:
+            with open(log_file, 'a') as f:
+                f.write("\n\nTEST EXECUTION CANCELLED")
+            
+            return {
+                "status": "CANCELLED",
+                "result": {
+                    "return_code": -1,
+                    "tests": build_test_results(report_file),
+                    "log": "Test execution was cancelled.",
+                    "report_path": report_file
+                },
+                "log_path": log_file
+            }
         
         # Determine test status
-        if result.returncode == 0:
+        if return_code == 0:
             status = "SUCCESS"
         else:
             status = "FAILURE"
         
-        # Parse test results
-        test_results = parse_test_results(log_content)
+        # Build test results from the reporter's events
+        test_results = build_test_results(report_file)
         
         return {
             "status": status,
             "result": {
-                "return_code": result.returncode,
+                "return_code": return_code,
                 "tests": test_results,
-                "log": log_content[:1000] + ("..." if len(log_content) > 1000 else "")
+                "log": read_log_summary(log_file),
+                "report_path": report_file
             },
             "log_path": log_file
         }
@@ -64,8 +109,9 @@ def execute_test(test_case: TestCase) -> Dict[str, Any]:
             "status": "TIMEOUT",
             "result": {
                 "return_code": -1,
-                "tests": [],
-                "log": "Test execution timed out after 5 minutes."
+                "tests": build_test_results(report_file),
+                "log": "Test execution timed out after 5 minutes.",
+                "report_path": report_file
             },
             "log_path": log_file
         }
@@ -84,38 +130,49 @@ def execute_test(test_case: TestCase) -> Dict[str, Any]:
             "log_path": log_file
         }
 
-def parse_test_results(log_content: str) -> list:
-    """Parse unittest results from log content"""
-    results = []
-    
-    # Split log by lines
-    lines = log_content.split('\n')
-    
-    # Process each line looking for test results
-    current_test = None
-    for line in lines:
-        line = line.strip()
+def wait_for_process(process: subprocess.Popen, timeout: float,
+                     cancel_event: Optional[threading.Event] = None) -> Optional[int]:
+    """Wait for a process, killing it on timeout or cancellation.
+
+    Returns the exit code, or None if the process was cancelled.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return process.wait(timeout=0.5)
+        except subprocess.TimeoutExpired:
+            pass
         
-        # Look for test method
-        if line.startswith('test_') and ' (' in line:
-            test_name = line.split(' (')[0]
-            current_test = {
-                "name": test_name,
-                "status": "RUNNING"
-            }
+        if cancel_event is not None and cancel_event.is_set():
+            process.kill()
+            process.wait()
+            return None
         
-        # Look for test result
-        elif current_test and any(result in line for result in ["ok", "FAIL", "ERROR", "skipped"]):
-            if "ok" in line:
-                current_test["status"] = "PASSED"
-            elif "FAIL" in line:
-                current_test["status"] = "FAILED"
-            elif "ERROR" in line:
-                current_test["status"] = "ERROR"
-            elif "skipped" in line:
-                current_test["status"] = "SKIPPED"
-            
-            results.append(current_test)
-            current_test = None
+        if time.monotonic() > deadline:
+            process.kill()
+            process.wait()
+            raise subprocess.TimeoutExpired(process.args, timeout)
+
+def create_log_path(project_id: str) -> str:
+    """Path for the log of a new execution in the project's results directory"""
+    project_dir = os.path.join(settings.RESULTS_DIR, project_id)
+    results_dir = os.path.join(project_dir, "execution_results")
+    os.makedirs(results_dir, exist_ok=True)
     
-    return results
\ No newline at end of file
+    # Generate unique ID for this execution
+    execution_id = str(uuid.uuid4())
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(results_dir, f"execution_{execution_id}_{timestamp}.log")
+
+def read_log_summary(log_file: str, limit: int = LOG_SUMMARY_CHARS) -> str:
+    """The start of a log, without reading the rest of it"""
+    try:
+        with open(log_file, 'r', errors='replace') as f:
+            head = f.read(limit + 1)
+    except OSError:
+        return ""
+    return head[:limit] + ("..." if len(head) > limit else "")
+
+def get_report_path(log_file: str) -> str:
+    """Path of the JSON lines test report kept next to an execution log"""
+    return os.path.splitext(log_file)[0] + ".events.jsonl"
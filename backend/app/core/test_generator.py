@@ -1,192 +1,276 @@
 import os
+import re
 import json
-from typing import Dict, Any
+import asyncio
+from typing import AsyncIterator, Dict, Any, List, Optional
 import uuid
-from app.core.gemini_client import generate_tests_with_gemini
+from app.core.gemini_client import llm_enabled, generate_tests_with_gemini, stream_tests_with_gemini
+from app.core.impact_analyzer import build_impact_map, save_impact_map
+from app.core.pom_index import PomIndex
+from app.utils.code_emitter import CodeEmitter, CodeTemplate, open_module
 from app.models.project import POM
 from config import settings
 
-def generate_tests(pom: POM, project_id: str) -> Dict[str, Any]:
-    """Generate test cases from POM using Gemini API"""
-    # Create results directory for the project
-    project_dir = os.path.join(settings.RESULTS_DIR, project_id)
-    os.makedirs(project_dir, exist_ok=True)
-    
-    # Group elements by page
-    elements_by_page = {}
-    for element in pom.elements:
-        if element["type"] == "page":
-            page_id = element["id"]
-            page_name = element["name"]
-            elements_by_page[page_id] = {
-                "name": page_name,
-                "elements": []
-            }
-    
-    # Add elements to their respective pages
-    for element in pom.elements:
-        if "parent_id" in element and element["parent_id"] in elements_by_page:
-            elements_by_page[element["parent_id"]]["elements"].append(element)
-    
-    # Generate test scripts
-    test_scripts = []
-    
-    # If Gemini API key is available, use it for test generation
-    if settings.GEMINI_API_KEY:
-        try:
-            test_scripts = generate_tests_with_gemini(pom.elements)
-        except Exception as e:
-            print(f"Error using Gemini API for test generation: {e}")
-    
-    # Fallback to basic test generation
-    if not test_scripts:
-        test_scripts = generate_basic_tests(elements_by_page)
+DRIVER_POOL_CODE = """import os
+import atexit
+import threading
+from selenium.common.exceptions import WebDriverException
+from driver_factory import create_driver
+
+# Number of idle browser sessions kept warm between tests
+POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "2"))
+
+_lock = threading.Lock()
+_idle = []
+_sessions = []
+
+def _create_driver():
+    return create_driver()
+
+def _is_alive(driver):
+    try:
+        driver.current_url
+        return True
+    except WebDriverException:
+        return False
+
+def _discard(driver):
+    with _lock:
+        if driver in _sessions:
+            _sessions.remove(driver)
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+
+def acquire_driver():
+    \"\"\"Lease a warm browser session, starting a new one if none is idle\"\"\"
+    while True:
+        with _lock:
+            driver = _idle.pop() if _idle else None
+        if driver is None:
+            break
+        if _is_alive(driver):
+            return driver
+        _discard(driver)
     
-    # Save test scripts to files
-    test_directory = os.path.join(project_dir, "tests")
-    os.makedirs(test_directory, exist_ok=True)
+    driver = _create_driver()
+    with _lock:
+        _sessions.append(driver)
+    return driver
+
+def reset_driver(driver):
+    \"\"\"Clear cookies, storage, extra windows and navigation state\"\"\"
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
     
-    script_paths = []
-    for i, script in enumerate(test_scripts):
-        script_name = f"test_{i+1}.py"
-        script_path = os.path.join(test_directory, script_name)
-        
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write(script["code"])
-        
-        script_paths.append(script_path)
+    # Storage is only reachable from a page of the origin that owns it
+    try:
+        driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    except WebDriverException:
+        pass
     
-    # Create main test suite file
-    create_test_suite(test_directory, test_scripts)
+    try:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except (WebDriverException, AttributeError):
+        driver.delete_all_cookies()
     
-    # Return information about the generated tests
-    return {
-        "name": f"Test Suite for Project {project_id}",
-        "script_path": os.path.join(test_directory, "test_suite.py"),
-        "description": f"Automatically generated tests for project {project_id}"
-    }
+    driver.get("about:blank")
 
-def generate_basic_tests(elements_by_page):
-    """Generate basic test scripts without Gemini"""
-    test_scripts = []
+def release_driver(driver):
+    \"\"\"Return a leased session to the pool after resetting its state\"\"\"
+    try:
+        reset_driver(driver)
+    except WebDriverException:
+        _discard(driver)
+        return
     
-    for page_id, page_data in elements_by_page.items():
-        page_name = page_data["name"]
-        page_elements = page_data["elements"]
-        
-        # Skip if no elements on the page
-        if not page_elements:
-            continue
-        
-        # Create a basic test for page navigation
-        navigation_code = f"""import unittest
+    with _lock:
+        if len(_idle) < POOL_SIZE:
+            _idle.append(driver)
+            return
+    _discard(driver)
+
+@atexit.register
+def shutdown_pool():
+    \"\"\"Quit every browser session started by this process\"\"\"
+    with _lock:
+        sessions = list(_sessions)
+        _idle.clear()
+    for driver in sessions:
+        _discard(driver)
+"""
+
+# Test module -> script name and test classes, written next to the tests
+TEST_MANIFEST_FILE = "test_manifest.json"
+TEST_CLASS_PATTERN = re.compile(r"^class (\w+)\(", re.MULTILINE)
+
+# Modules written by save_test_files
+TEST_MODULE_PATTERN = re.compile(r"^test_\d+\.py$")
+
+DRIVER_FACTORY_TEMPLATE = CodeTemplate("""import os
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from page_objects import {page_name}
 
-class TestNavigation{page_name}(unittest.TestCase):
+# Browser profile chosen when the tests were generated. The overrides have their own names
+# so the server's BROWSER_* settings, inherited by test processes, do not replace it
+HEADLESS = os.getenv("SCRAP_TEST_BROWSER_HEADLESS", ${headless}).lower() == "true"
+DISABLE_IMAGES = os.getenv("SCRAP_TEST_BROWSER_DISABLE_IMAGES", ${disable_images}).lower() == "true"
+DISABLE_EXTENSIONS = os.getenv("SCRAP_TEST_BROWSER_DISABLE_EXTENSIONS", ${disable_extensions}).lower() == "true"
+PAGE_LOAD_STRATEGY = os.getenv("SCRAP_TEST_BROWSER_PAGE_LOAD_STRATEGY", ${page_load_strategy})  # normal, eager or none
+WINDOW_SIZE = os.getenv("SCRAP_TEST_BROWSER_WINDOW_SIZE", ${window_size})
+EXTRA_ARGUMENTS = os.getenv("SCRAP_TEST_BROWSER_EXTRA_ARGUMENTS", ${extra_arguments}).split()
+
+# Resolved chromedriver path shared by every test process of this project
+DRIVER_PATH_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".chromedriver_path")
+
+_lock = threading.Lock()
+_driver_path = None
+
+def build_options():
+    \"\"\"Chrome options for the browser profile\"\"\"
+    options = webdriver.ChromeOptions()
+    if HEADLESS:
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+    options.add_argument(f"--window-size={WINDOW_SIZE}")
+    options.add_argument("--disable-dev-shm-usage")
+    if DISABLE_EXTENSIONS:
+        options.add_argument("--disable-extensions")
+    if DISABLE_IMAGES:
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    for argument in EXTRA_ARGUMENTS:
+        options.add_argument(argument)
+    options.page_load_strategy = PAGE_LOAD_STRATEGY
+    return options
+
+def _read_cached_path():
+    try:
+        with open(DRIVER_PATH_CACHE, 'r', encoding='utf-8') as f:
+            path = f.read().strip()
+    except OSError:
+        return ""
+    return path if os.path.exists(path) else ""
+
+def resolve_driver_path():
+    \"\"\"Find chromedriver once: CHROMEDRIVER_PATH, the cached path, then webdriver-manager.
+
+    Returns None when none of them has it, leaving the lookup to Selenium Manager.
+    \"\"\"
+    global _driver_path
+    with _lock:
+        if _driver_path is None:
+            path = os.getenv("CHROMEDRIVER_PATH", ${driver_path}) or _read_cached_path()
+            if not path:
+                try:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    path = ChromeDriverManager().install()
+                    with open(DRIVER_PATH_CACHE, 'w', encoding='utf-8') as f:
+                        f.write(path)
+                except Exception:
+                    path = ""
+            _driver_path = path
+        return _driver_path or None
+
+def create_driver():
+    \"\"\"Start a Chrome session with the browser profile\"\"\"
+    path = resolve_driver_path()
+    service = Service(path) if path else Service()
+    return webdriver.Chrome(service=service, options=build_options())
+""")
+
+PAGE_LOAD_STRATEGIES = ("normal", "eager", "none")
+
+# How generated tests start and stop their browser
+LOCAL_DRIVER_CODE = {
+    "imports": "from driver_factory import create_driver\n",
+    "start": "        self.driver = create_driver()\n",
+    "stop": "        self.driver.quit()\n"
+}
+
+POOLED_DRIVER_CODE = {
+    "imports": "from driver_pool import acquire_driver, release_driver\n",
+    "start": "        self.driver = acquire_driver()\n",
+    "stop": "        release_driver(self.driver)\n"
+}
+
+TEST_MODULE_HEADER_TEMPLATE = CodeTemplate("""import unittest
+${driver_imports}from page_objects import ${page_name}
+""")
+
+NAVIGATION_CLASS_TEMPLATE = CodeTemplate("""
+class ${class_name}(unittest.TestCase):
     def setUp(self):
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service)
-        self.driver.maximize_window()
-        self.page = {page_name}(self.driver)
+${start_driver}        self.page = ${page_name}(self.driver)
         
     def tearDown(self):
-        self.driver.quit()
-        
+${stop_driver}        
     def test_page_navigation(self):
         # Navigate to the page
         self.driver.get("http://example.com")  # Replace with actual URL
         
         # Verify page is loaded by checking for elements
-"""
-        
-        # Add assertions for each element
-        for element in page_elements:
-            element_name = element["name"].replace('-', '_')
-            navigation_code += f"        # Verify {element_name} is present\n"
-            navigation_code += f"        self.assertIsNotNone(self.page.{element_name})\n"
-        
-        navigation_code += """
-if __name__ == '__main__':
-    unittest.main()
-"""
-        
-        test_scripts.append({
-            "name": f"test_navigation_{page_name.lower()}",
-            "code": navigation_code
-        })
-        
-        # Create interaction tests for interactive elements
-        interactive_elements = [e for e in page_elements 
-                             if e["type"] in ["button", "a", "input", "textarea", "select"]]
-        
-        if interactive_elements:
-            interaction_code = f"""import unittest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from page_objects import {page_name}
+""")
+
+ELEMENT_PRESENT_TEMPLATE = CodeTemplate("""        # Verify ${element_name} is present
+        self.assertIsNotNone(self.page.${element_name})
+""")
 
-class TestInteraction{page_name}(unittest.TestCase):
+INTERACTION_CLASS_TEMPLATE = CodeTemplate("""
+class ${class_name}(unittest.TestCase):
     def setUp(self):
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service)
-        self.driver.maximize_window()
-        self.page = {page_name}(self.driver)
+${start_driver}        self.page = ${page_name}(self.driver)
         self.driver.get("http://example.com")  # Replace with actual URL
         
     def tearDown(self):
-        self.driver.quit()
-"""
-            
-            for element in interactive_elements:
-                element_name = element["name"].replace('-', '_')
-                element_type = element["type"]
-                
-                if element_type in ["button", "a"]:
-                    interaction_code += f"""
-    def test_click_{element_name}(self):
+${stop_driver}""")
+
+CLICK_TEST_TEMPLATE = CodeTemplate("""
+    def test_click_${element_name}(self):
         # Click the element
-        self.page.click_{element_name}()
+        self.page.click_${element_name}()
         # Add assertions for expected behavior after click
         pass
-"""
-                elif element_type in ["input", "textarea"]:
-                    interaction_code += f"""
-    def test_input_{element_name}(self):
+""")
+
+INPUT_TEST_TEMPLATE = CodeTemplate("""
+    def test_input_${element_name}(self):
         # Input text
         test_text = "Test input text"
-        self.page.set_{element_name}(test_text)
+        self.page.set_${element_name}(test_text)
         # Add assertions for expected behavior after input
         pass
-"""
-                elif element_type == "select":
-                    interaction_code += f"""
-    def test_select_{element_name}(self):
+""")
+
+SELECT_TEST_TEMPLATE = CodeTemplate("""
+    def test_select_${element_name}(self):
         # Select an option
         option = "Option 1"  # Replace with an actual option
-        self.page.select_{element_name}(option)
+        self.page.select_${element_name}(option)
         # Add assertions for expected behavior after selection
         pass
-"""
-            
-            interaction_code += """
+""")
+
+# Interaction tests by element type
+INTERACTION_TEST_TEMPLATES = {
+    "button": CLICK_TEST_TEMPLATE,
+    "a": CLICK_TEST_TEMPLATE,
+    "input": INPUT_TEST_TEMPLATE,
+    "textarea": INPUT_TEST_TEMPLATE,
+    "select": SELECT_TEST_TEMPLATE
+}
+
+TEST_MODULE_FOOTER = """
 if __name__ == '__main__':
     unittest.main()
 """
-            
-            test_scripts.append({
-                "name": f"test_interaction_{page_name.lower()}",
-                "code": interaction_code
-            })
-    
-    return test_scripts
 
-def create_test_suite(test_directory, test_scripts):
-    """Create a test suite that runs all tests"""
-    code = """import unittest
+SUITE_HEADER = """import unittest
 import sys
 import os
 
@@ -194,13 +278,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 """
-    
-    # Import all test modules
-    for script in test_scripts:
-        module_name = script["name"]
-        code += f"from {module_name} import *\n"
-    
-    code += """
+
+SUITE_MAIN_HEADER = """
 if __name__ == '__main__':
     # Create a test suite
     test_suite = unittest.TestSuite()
@@ -208,23 +287,245 @@ if __name__ == '__main__':
     # Add all test cases
     loader = unittest.TestLoader()
 """
-    
-    # Add each test class to the suite
-    for script in test_scripts:
-        class_name = next((line.strip().split('class ')[1].split('(')[0] 
-                         for line in script["code"].split('\n') 
-                         if line.strip().startswith('class ')), None)
-        
-        if class_name:
-            code += f"    test_suite.addTests(loader.loadTestsFromTestCase({class_name}))\n"
-    
-    code += """
+
+# Loading by name turns a module that fails to import into one failing test
+SUITE_LOAD_TEMPLATE = CodeTemplate("    test_suite.addTests(loader.loadTestsFromName(\"${module_name}\"))\n")
+
+SUITE_MAIN_FOOTER = """
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
-    runner.run(test_suite)
+    result = runner.run(test_suite)
+    sys.exit(0 if result.wasSuccessful() else 1)
 """
+
+def generate_tests(pom: POM, project_id: str, use_driver_pool: bool = False, regenerate: bool = False,
+                   browser_profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Generate test cases from POM using Gemini API"""
+    elements = [element.model_dump() for element in pom.elements]
+    pom_index = PomIndex.from_dicts(elements)
+    
+    # Generate test scripts
+    test_scripts = []
+    
+    # Use the LLM provider for test generation if it is configured
+    if llm_enabled():
+        try:
+            test_scripts = generate_tests_with_gemini(elements, use_driver_pool=use_driver_pool,
+                                                      regenerate=regenerate)
+        except Exception as e:
+            print(f"Error using Gemini API for test generation: {e}")
+    
+    # Fallback to basic test generation, written straight into the test directory
+    if not test_scripts:
+        test_scripts = generate_basic_tests(pom_index, get_test_directory(project_id),
+                                            use_driver_pool=use_driver_pool)
+    
+    return save_test_files(test_scripts, project_id, use_driver_pool, browser_profile, pom_index)
+
+async def generate_tests_stream(pom: POM, project_id: str, use_driver_pool: bool = False, regenerate: bool = False,
+                                browser_profile: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Generate test cases from POM, yielding each test script as soon as it is complete.
+
+    Yields {"event": "test_script", "data": script} for every script and
+    finally {"event": "tests", "data": ...} with what generate_tests returns.
+    """
+    elements = [element.model_dump() for element in pom.elements]
+    pom_index = PomIndex.from_dicts(elements)
+    test_scripts = []
+    
+    if llm_enabled():
+        try:
+            async for script in stream_tests_with_gemini(elements, use_driver_pool=use_driver_pool,
+                                                         regenerate=regenerate):
+                test_scripts.append(script)
+                yield {"event": "test_script", "data": script}
+        except Exception as e:
+            print(f"Error using Gemini API for test generation: {e}")
+    
+    # Fallback to basic test generation, written straight into the test directory
+    if not test_scripts:
+        test_scripts = await asyncio.to_thread(generate_basic_tests, pom_index, get_test_directory(project_id),
+                                               use_driver_pool=use_driver_pool)
+        for script in test_scripts:
+            # Clients show the code, one module at a time
+            code = await asyncio.to_thread(read_test_module, script["path"])
+            yield {"event": "test_script", "data": {**script, "code": code}}
+    
+    test_data = await asyncio.to_thread(save_test_files, test_scripts, project_id, use_driver_pool,
+                                        browser_profile, pom_index)
+    yield {"event": "tests", "data": test_data}
+
+def get_test_directory(project_id: str) -> str:
+    """The directory a project's generated tests are written to, created if needed"""
+    test_directory = os.path.join(settings.RESULTS_DIR, project_id, "tests")
+    os.makedirs(test_directory, exist_ok=True)
+    return test_directory
+
+def read_test_module(path: str) -> str:
+    """Read back a generated test module"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def save_test_files(test_scripts: List[Dict[str, Any]], project_id: str, use_driver_pool: bool = False,
+                    browser_profile: Optional[Dict[str, Any]] = None,
+                    pom_index: Optional[PomIndex] = None) -> Dict[str, Any]:
+    """Write test scripts, the suite runner and the browser driver factory for a project.
+
+    Scripts with code, such as the LLM's, are written as test_1.py,
+    test_2.py, ...; scripts without code were already written to those
+    modules by generate_basic_tests. With the POM the tests were
+    generated from, also records which tests depend on the elements of
+    which source files.
+    """
+    project_dir = os.path.join(settings.RESULTS_DIR, project_id)
+    test_directory = get_test_directory(project_id)
+    
+    module_names = [f"test_{i+1}" for i in range(len(test_scripts))]
+    
+    # Remove modules of an earlier, larger generation so no runner picks them up
+    for file_name in os.listdir(test_directory):
+        if TEST_MODULE_PATTERN.match(file_name) and file_name[:-3] not in module_names:
+            os.remove(os.path.join(test_directory, file_name))
+    
+    script_paths = []
+    manifest = {}
+    for module_name, script in zip(module_names, test_scripts):
+        script_name = f"{module_name}.py"
+        script_path = os.path.join(test_directory, script_name)
+        
+        if "code" in script:
+            with open(script_path, 'w', encoding='utf-8') as f:
+                f.write(script["code"])
+        
+        script_paths.append(script_path)
+        # Scripts from the LLM do not come with their class names
+        class_names = script.get("class_names")
+        if class_names is None:
+            class_names = TEST_CLASS_PATTERN.findall(script["code"])
+        manifest[module_name] = {"name": script.get("name", script_name), "class_names": class_names}
+    
+    with open(os.path.join(test_directory, TEST_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    
+    if pom_index is not None:
+        # One module in memory at a time
+        test_modules = ((module_name, read_test_module(script_path))
+                        for module_name, script_path in zip(module_names, script_paths))
+        save_impact_map(test_directory, build_impact_map(pom_index, test_modules))
+    
+    # Create main test suite file
+    create_test_suite(test_directory, test_scripts)
+    
+    # Ship the driver factory and pool next to page_objects
+    create_driver_factory_file(project_dir, browser_profile or get_browser_profile())
+    if use_driver_pool:
+        create_driver_pool_file(project_dir)
+    
+    # Return information about the generated tests
+    return {
+        "name": f"Test Suite for Project {project_id}",
+        "script_path": os.path.join(test_directory, "test_suite.py"),
+        "description": f"Automatically generated tests for project {project_id}"
+    }
+
+def generate_basic_tests(pom_index: PomIndex, test_directory: str, use_driver_pool: bool = False) -> List[Dict[str, Any]]:
+    """Generate basic test scripts without Gemini.
+
+    Each script is written straight to its module, test_1.py, test_2.py,
+    ... in test_directory, as save_test_files names them. Returns the
+    name, path and class names of every script, in module order.
+    """
+    test_scripts = []
+    driver_code = POOLED_DRIVER_CODE if use_driver_pool else LOCAL_DRIVER_CODE
+    
+    def open_script(name: str) -> str:
+        path = os.path.join(test_directory, f"test_{len(test_scripts) + 1}.py")
+        test_scripts.append({"name": name, "path": path, "class_names": []})
+        return path
+    
+    for page in pom_index.pages:
+        page_name = page.name
+        page_elements = pom_index.children(page.id)
+        
+        # Skip if no elements on the page
+        if not page_elements:
+            continue
+        
+        # Create a basic test for page navigation
+        with open_module(open_script(f"test_navigation_{page_name.lower()}")) as f:
+            emitter = CodeEmitter(f)
+            emitter.emit(TEST_MODULE_HEADER_TEMPLATE, driver_imports=driver_code["imports"], page_name=page_name)
+            emitter.emit_class(NAVIGATION_CLASS_TEMPLATE, f"TestNavigation{page_name}", page_name=page_name,
+                               start_driver=driver_code["start"], stop_driver=driver_code["stop"])
+            
+            # Add assertions for each element
+            for element in page_elements:
+                emitter.emit(ELEMENT_PRESENT_TEMPLATE, element_name=element.name.replace('-', '_'))
+            
+            emitter.emit_text(TEST_MODULE_FOOTER)
+        test_scripts[-1]["class_names"] = emitter.class_names
+        
+        # Create interaction tests for interactive elements
+        interactive_elements = [e for e in page_elements if e.type in INTERACTION_TEST_TEMPLATES]
+        
+        if interactive_elements:
+            with open_module(open_script(f"test_interaction_{page_name.lower()}")) as f:
+                emitter = CodeEmitter(f)
+                emitter.emit(TEST_MODULE_HEADER_TEMPLATE, driver_imports=driver_code["imports"], page_name=page_name)
+                emitter.emit_class(INTERACTION_CLASS_TEMPLATE, f"TestInteraction{page_name}", page_name=page_name,
+                                   start_driver=driver_code["start"], stop_driver=driver_code["stop"])
+                
+                for element in interactive_elements:
+                    emitter.emit(INTERACTION_TEST_TEMPLATES[element.type], element_name=element.name.replace('-', '_'))
+                
+                emitter.emit_text(TEST_MODULE_FOOTER)
+            test_scripts[-1]["class_names"] = emitter.class_names
+    
+    return test_scripts
+
+def create_test_suite(test_directory, test_scripts):
+    """Create a test suite that runs all tests"""
+    # Load all test modules; save_test_files writes them as test_1.py, test_2.py, ...
+    module_names = [f"test_{i+1}" for i in range(len(test_scripts))]
     
-    # Save the test suite file
     suite_path = os.path.join(test_directory, "test_suite.py")
     with open(suite_path, 'w', encoding='utf-8') as f:
-        f.write(code)
\ No newline at end of file
+        emitter = CodeEmitter(f)
+        emitter.emit_text(SUITE_HEADER)
+        emitter.emit_text(SUITE_MAIN_HEADER)
+        # Load each module whole, so classes with the same name in different modules all run
+        for module_name in module_names:
+            emitter.emit(SUITE_LOAD_TEMPLATE, module_name=module_name)
+        emitter.emit_text(SUITE_MAIN_FOOTER)
+
+def create_driver_pool_file(project_dir: str) -> str:
+    """Write the WebDriver session pool module used by pooled tests"""
+    pool_path = os.path.join(project_dir, "driver_pool.py")
+    with open(pool_path, 'w', encoding='utf-8') as f:
+        f.write(DRIVER_POOL_CODE)
+    
+    return pool_path
+
+def get_browser_profile(**overrides: Any) -> Dict[str, Any]:
+    """Browser profile for generated tests from settings, with None overrides ignored"""
+    profile = {
+        "headless": settings.BROWSER_HEADLESS,
+        "disable_images": settings.BROWSER_DISABLE_IMAGES,
+        "disable_extensions": settings.BROWSER_DISABLE_EXTENSIONS,
+        "page_load_strategy": settings.BROWSER_PAGE_LOAD_STRATEGY,
+        "window_size": settings.BROWSER_WINDOW_SIZE,
+        "extra_arguments": settings.BROWSER_EXTRA_ARGUMENTS,
+        "driver_path": settings.CHROMEDRIVER_PATH
+    }
+    profile.update({key: value for key, value in overrides.items() if value is not None})
+    return profile
+
+def create_driver_factory_file(project_dir: str, profile: Dict[str, Any]) -> str:
+    """Write the module generated tests and the driver pool start browsers with"""
+    values = {key: repr(str(value).lower() if isinstance(value, bool) else str(value))
+              for key, value in profile.items()}
+    factory_path = os.path.join(project_dir, "driver_factory.py")
+    with open(factory_path, 'w', encoding='utf-8') as f:
+        f.write(DRIVER_FACTORY_TEMPLATE.render(**values))
+    
+    return factory_path
@@ -0,0 +1,185 @@
+"""Machine-readable unittest results for generated test runs.
+
+The executors run tests through this file as a script:
+
+    python test_reporter.py script test_suite.py
+    python test_reporter.py module test_1 [test_2 ...]
+
+It installs a unittest result class that keeps the usual verbose output
+and also appends one JSON object per line to the file named by
+SCRAP_REPORT_PATH: a "start" event when a test starts and an "end" event
+with its status, duration and traceback when it finishes. Only the
+standard library is used, so the file runs in any test environment.
+"""
+import os
+import sys
+import json
+import time
+import runpy
+import unittest
+from typing import Any, Dict, List
+
+REPORT_PATH_ENV = "SCRAP_REPORT_PATH"
+REPORTER_PATH = os.path.abspath(__file__)
+
+PASSED = "PASSED"
+FAILED = "FAILED"
+ERROR = "ERROR"
+SKIPPED = "SKIPPED"
+
+class JSONLinesResult(unittest.TextTestResult):
+    """TextTestResult that also reports every test as JSON lines"""
+    # File descriptor of the report, opened for appending
+    report = None
+    
+    def __init__(self, stream, descriptions, verbosity, **kwargs):
+        super().__init__(stream, descriptions, verbosity, **kwargs)
+        self._started = {}
+        self._outcomes = {}
+    
+    def _emit(self, event: Dict[str, Any]):
+        if JSONLinesResult.report is not None:
+            # One append per line keeps lines whole when processes share a report
+            os.write(JSONLinesResult.report, (json.dumps(event) + "\n").encode('utf-8'))
+    
+    def _record(self, test, status: str, err=None, reason=None):
+        outcome = {"status": status}
+        if err is not None:
+            outcome["traceback"] = self._exc_info_to_string(err, test)
+        if reason:
+            outcome["reason"] = reason
+        # A failing subtest or cleanup must not be overwritten by a later pass
+        previous = self._outcomes.get(test.id())
+        if previous is None or previous["status"] in (PASSED, SKIPPED):
+            self._outcomes[test.id()] = outcome
+    
+    def startTest(self, test):
+        self._started[test.id()] = time.perf_counter()
+        self._emit({"event": "start", "test": test.id(), "time": time.time()})
+        super().startTest(test)
+    
+    def stopTest(self, test):
+        super().stopTest(test)
+        test_id = test.id()
+        started = self._started.pop(test_id, None)
+        event = {"event": "end", "test": test_id, "time": time.time(),
+                 "duration": round(time.perf_counter() - started, 4) if started is not None else 0.0}
+        event.update(self._outcomes.pop(test_id, {"status": PASSED}))
+        self._emit(event)
+    
+    def addSuccess(self, test):
+        super().addSuccess(test)
+        self._record(test, PASSED)
+    
+    def addFailure(self, test, err):
+        super().addFailure(test, err)
+        self._record(test, FAILED, err)
+    
+    def addError(self, test, err):
+        super().addError(test, err)
+        # Errors in class or module fixtures arrive without a startTest
+        if test.id() not in self._started:
+            self._emit({"event": "end", "test": test.id(), "time": time.time(), "duration": 0.0,
+                        "status": ERROR, "traceback": self._exc_info_to_string(err, test)})
+            return
+        self._record(test, ERROR, err)
+    
+    def addSkip(self, test, reason):
+        super().addSkip(test, reason)
+        if test.id() not in self._started:
+            self._emit({"event": "end", "test": test.id(), "time": time.time(), "duration": 0.0,
+                        "status": SKIPPED, "reason": reason})
+            return
+        self._record(test, SKIPPED, reason=reason)
+    
+    def addExpectedFailure(self, test, err):
+        super().addExpectedFailure(test, err)
+        self._record(test, PASSED)
+    
+    def addUnexpectedSuccess(self, test):
+        super().addUnexpectedSuccess(test)
+        self._record(test, FAILED, reason="unexpected success")
+    
+    def addSubTest(self, test, subtest, err):
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            failed = issubclass(err[0], test.failureException)
+            self._record(test, FAILED if failed else ERROR, err)
+
+def build_test_results(report_path: str) -> List[Dict[str, Any]]:
+    """Build per-test results from a JSON lines report, in start order.
+
+    Tests that started but never reported an end, because the process
+    crashed, timed out or was cancelled, are reported as errors.
+    """
+    results = {}
+    try:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A line cut short by a killed process
+                    continue
+                
+                test_id = event.get("test", "")
+                result = results.get(test_id)
+                if result is None:
+                    module, _, rest = test_id.rpartition('.')[0].partition('.')
+                    result = results[test_id] = {
+                        "id": test_id,
+                        "name": test_id.rsplit('.', 1)[-1],
+                        "module": module,
+                        "class": rest,
+                        "status": "RUNNING",
+                        "duration": 0.0
+                    }
+                
+                if event.get("event") == "end":
+                    result["status"] = event.get("status", ERROR)
+                    result["duration"] = event.get("duration", 0.0)
+                    for key in ("traceback", "reason"):
+                        if key in event:
+                            result[key] = event[key]
+    except OSError:
+        return []
+    
+    for result in results.values():
+        if result["status"] == "RUNNING":
+            result["status"] = ERROR
+            result["traceback"] = "Test did not finish"
+    return list(results.values())
+
+def reporter_command(mode: str, targets: List[str]) -> List[str]:
+    """Command line that runs targets under the reporter with the test environment's python"""
+    return ['python', REPORTER_PATH, mode] + list(targets)
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 2 or argv[0] not in ("script", "module"):
+        print("usage: test_reporter.py script PATH | module NAME [NAME ...]", file=sys.stderr)
+        return 2
+    
+    mode, targets = argv[0], argv[1:]
+    report_path = os.environ.get(REPORT_PATH_ENV)
+    if report_path:
+        JSONLinesResult.report = os.open(report_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    # Every TextTestRunner created by the tests, including unittest.main's, reports events
+    unittest.TextTestRunner.resultclass = JSONLinesResult
+    
+    if mode == "script":
+        script_path = os.path.abspath(targets[0])
+        # Let the script import its neighbours, not the reporter's
+        sys.path[0] = os.path.dirname(script_path)
+        sys.argv = [script_path] + targets[1:]
+        try:
+            runpy.run_path(script_path, run_name="__main__")
+        except SystemExit as e:
+            return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        return 0
+    
+    sys.path[0] = os.getcwd()
+    program = unittest.main(module=None, argv=["unittest", "-v"] + targets, exit=False)
+    return 0 if program.result.wasSuccessful() else 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -14,8 +14,9 @@ class Element(BaseModel):
     id: str
     name: str
     type: str
-    selector: str
-    selector_type: str
+    # Page records have no selector of their own
+    selector: str = ""
+    selector_type: str = ""
     parent_id: Optional[str] = None
     children: Optional[List[str]] = []
     properties: Optional[Dict[str, Any]] = {}
@@ -25,6 +26,8 @@ class POM(BaseModel):
     project_id: str
     elements: List[Element]
     file_path: str
+    # Page names by change since the previous POM: added, changed, removed, unchanged, enhanced
+    changes: Optional[Dict[str, List[str]]] = None
 
 class TestCase(BaseModel):
     id: str
@@ -40,4 +43,17 @@ class TestExecution(BaseModel):
     test_id: str
     status: str
     result: Dict[str, Any]
-    log_path: str
\ No newline at end of file
+    log_path: str
+    job_id: Optional[str] = None
+
+class Job(BaseModel):
+    id: str
+    type: str
+    project_id: Optional[str] = None
+    status: str
+    progress: float = 0.0
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    owner: Optional[str] = None  # host:pid:boot id of the process running the job
+    heartbeat: Optional[float] = None  # last time the owner reported the job alive
\ No newline at end of file
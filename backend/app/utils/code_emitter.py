@@ -0,0 +1,63 @@
+import os
+import re
+from typing import Any, List, TextIO
+
+IDENTIFIER_PATTERN = re.compile(r'\W')
+PLACEHOLDER_PATTERN = re.compile(r'\$\{([A-Za-z_]\w*)\}')
+
+class CodeTemplate:
+    """Source text with ${name} placeholders, compiled once into a format string.
+
+    Everything but the placeholders is escaped, so braces in the source
+    text are written as they are. render(**values) substitutes the
+    placeholders with str() of the values.
+    """
+    __slots__ = ("text", "names", "format_string")
+    
+    def __init__(self, text: str):
+        self.text = text
+        # Split on placeholders; odd parts are names, even parts literal text
+        parts = PLACEHOLDER_PATTERN.split(text)
+        self.names = tuple(dict.fromkeys(parts[1::2]))
+        self.format_string = "".join(f"{{{part}}}" if i % 2 else part.replace('{', '{{').replace('}', '}}')
+                                     for i, part in enumerate(parts))
+    
+    def render(self, **values: Any) -> str:
+        """Substitute the placeholders; like Template.substitute, unused values are ignored"""
+        return self.format_string.format_map(values)
+
+class CodeEmitter:
+    """Write generated source to a text handle one template at a time.
+
+    Nothing is accumulated in memory, so the cost of emitting a module
+    grows with its length only. Class names are recorded as their
+    headers are written, so callers never have to parse emitted code.
+    """
+    def __init__(self, handle: TextIO):
+        self.handle = handle
+        self.class_names: List[str] = []
+    
+    def emit(self, template: CodeTemplate, **values: Any):
+        """Write a template with its placeholders substituted"""
+        self.handle.write(template.render(**values))
+    
+    def emit_text(self, text: str):
+        """Write text as is"""
+        self.handle.write(text)
+    
+    def emit_class(self, template: CodeTemplate, class_name: str, **values: Any):
+        """Write a class header template and record the class name"""
+        self.class_names.append(class_name)
+        self.handle.write(template.render(class_name=class_name, **values))
+
+def module_name_for(name: str) -> str:
+    """Turn a class or page name into a snake_case module name"""
+    snake = re.sub(r'(?<=[a-z0-9])(?=[A-Z])', '_', IDENTIFIER_PATTERN.sub('_', name)).lower().strip('_')
+    if not snake or snake[0].isdigit():
+        snake = f"m_{snake}"
+    return snake
+
+def open_module(path: str) -> TextIO:
+    """Open a generated module for writing, creating its directory"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    return open(path, 'w', encoding='utf-8')
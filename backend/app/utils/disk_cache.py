@@ -0,0 +1,97 @@
+import os
+import json
+import threading
+from typing import Any, Optional
+
+class DiskCache:
+    """Size-bounded JSON cache stored as one file per key.
+
+    File modification times track recency, so the least recently used
+    entries are evicted first once the total size exceeds max_bytes.
+    """
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(entry.stat().st_size for entry in self._entries())
+    
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith('.json')]
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            # Mark as recently used
+            os.utime(path)
+            return value
+        except (OSError, ValueError):
+            return None
+    
+    def set(self, key: str, value: Any):
+        """Store a JSON-serializable value and evict old entries if needed"""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            size = os.path.getsize(tmp_path)
+            
+            with self._lock:
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp_path, path)
+                self._total_bytes += size - old_size
+                if self._total_bytes > self.max_bytes:
+                    self._evict()
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error writing cache entry {key}: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def delete(self, key: str):
+        """Remove one cache entry if it exists"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+    
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+    
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self._total_bytes = sum(entry.stat().st_size for entry in entries)
+        
+        # Drop least recently used entries down to 90% of the budget
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+    
+    def clear(self):
+        """Remove every cache entry"""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._total_bytes = 0
@@ -1,18 +1,61 @@
 import os
 import shutil
 import zipfile
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
-def extract_zip(zip_path: str, extract_to: str) -> bool:
+class ZipLimitError(ValueError):
+    """Raised when a zip archive exceeds the configured safety limits"""
+
+def extract_zip(zip_path: str, extract_to: str, max_members: Optional[int] = None,
+                max_total_size: Optional[int] = None, max_ratio: Optional[float] = None) -> bool:
     """Extract a zip file to the specified directory"""
     try:
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            check_zip_limits(zip_ref.infolist(), max_members, max_total_size, max_ratio)
             zip_ref.extractall(extract_to)
         return True
     except Exception as e:
         print(f"Error extracting zip file: {str(e)}")
         return False
 
+def check_zip_limits(members: List[zipfile.ZipInfo], max_members: Optional[int] = None,
+                     max_total_size: Optional[int] = None, max_ratio: Optional[float] = None):
+    """Validate member count, total uncompressed size and compression ratios of an archive"""
+    if max_members is not None and len(members) > max_members:
+        raise ZipLimitError(f"Archive has {len(members)} members, the limit is {max_members}")
+    
+    total_size = sum(member.file_size for member in members)
+    if max_total_size is not None and total_size > max_total_size:
+        raise ZipLimitError(f"Archive expands to {total_size} bytes, the limit is {max_total_size}")
+    
+    if max_ratio is not None:
+        for member in members:
+            if member.file_size and member.file_size > max_ratio * max(member.compress_size, 1):
+                raise ZipLimitError(f"Member {member.filename} exceeds the compression ratio limit of {max_ratio}")
+
+def iter_zip_members(zip_path: str, extensions: Optional[Tuple[str, ...]] = None,
+                     max_members: Optional[int] = None, max_total_size: Optional[int] = None,
+                     max_ratio: Optional[float] = None) -> Iterator[Tuple[str, bytes]]:
+    """Stream (name, content) pairs for archive members without extracting to disk.
+
+    Members that don't match extensions are skipped without being
+    decompressed. Limits are checked against the central directory
+    before anything is read; zipfile never inflates a member past its
+    declared size.
+    """
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        members = zip_ref.infolist()
+        check_zip_limits(members, max_members, max_total_size, max_ratio)
+        
+        for member in members:
+            if member.is_dir() or member.filename.startswith('__MACOSX/'):
+                continue
+            if extensions is not None and not member.filename.lower().endswith(extensions):
+                continue
+            
+            with zip_ref.open(member) as f:
+                yield member.filename, f.read()
+
 def get_file_extension(file_path: str) -> str:
     """Get the file extension"""
     _, ext = os.path.splitext(file_path)
@@ -0,0 +1,136 @@
+import re
+import json
+from typing import Any, List
+
+STRING_SPECIAL_PATTERN = re.compile(r'["\\]')
+STRUCTURE_PATTERN = re.compile(r'["{}\[\]]')
+
+class JSONArrayStreamParser:
+    """Incrementally extract the objects of a JSON array embedded in text.
+
+    Text can be fed in arbitrary chunks. The array is the first "[" that
+    is followed by "{" or "]", so brackets in surrounding prose are
+    ignored. Each object is decoded as soon as its closing brace arrives,
+    and every character is scanned only once.
+    """
+    SEEK, ARRAY, ITEM, DONE = range(4)
+    
+    def __init__(self):
+        self.items: List[Any] = []
+        self._buffer = ""
+        self._pos = 0
+        self._state = self.SEEK
+        self._item_start = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+    
+    @property
+    def done(self) -> bool:
+        """True once the closing bracket of the array has been seen"""
+        return self._state == self.DONE
+    
+    def feed(self, text: str) -> List[Any]:
+        """Add a chunk of text and return the objects it completed"""
+        if self._state == self.DONE:
+            return []
+        
+        self._buffer += text
+        completed = []
+        buffer = self._buffer
+        pos = self._pos
+        
+        while pos < len(buffer) and self._state != self.DONE:
+            if self._state == self.SEEK:
+                start = buffer.find('[', pos)
+                if start < 0:
+                    pos = len(buffer)
+                    break
+                
+                # Look past whitespace for the first value of the array
+                value_pos = start + 1
+                while value_pos < len(buffer) and buffer[value_pos].isspace():
+                    value_pos += 1
+                if value_pos == len(buffer):
+                    # Wait for more text to decide
+                    pos = start
+                    break
+                
+                if buffer[value_pos] == '{':
+                    self._state = self.ARRAY
+                    pos = value_pos
+                elif buffer[value_pos] == ']':
+                    self._state = self.DONE
+                    pos = value_pos + 1
+                else:
+                    pos = start + 1
+            
+            elif self._state == self.ARRAY:
+                char = buffer[pos]
+                if char == '{':
+                    self._state = self.ITEM
+                    self._item_start = pos
+                    self._depth = 0
+                elif char == ']':
+                    self._state = self.DONE
+                    pos += 1
+                else:
+                    # Commas, whitespace and anything unexpected between items
+                    pos += 1
+            
+            else:
+                pos = self._scan_item(buffer, pos, completed)
+        
+        # Drop text that will never be looked at again
+        keep_from = self._item_start if self._state == self.ITEM else pos
+        self._buffer = buffer[keep_from:]
+        self._item_start -= keep_from
+        self._pos = pos - keep_from
+        return completed
+    
+    def _scan_item(self, buffer: str, pos: int, completed: List[Any]) -> int:
+        while True:
+            if self._escape:
+                # The escaped character may start the new chunk
+                if pos == len(buffer):
+                    return pos
+                self._escape = False
+                pos += 1
+            
+            # Jump straight to the next character that matters
+            match = (STRING_SPECIAL_PATTERN if self._in_string else STRUCTURE_PATTERN).search(buffer, pos)
+            if match is None:
+                return len(buffer)
+            
+            char = match.group()
+            pos = match.end()
+            
+            if self._in_string:
+                if char == '\\':
+                    self._escape = True
+                else:
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_item(buffer[self._item_start:pos], completed)
+                    return pos
+    
+    def _finish_item(self, item_text: str, completed: List[Any]):
+        try:
+            item = json.loads(item_text)
+        except json.JSONDecodeError:
+            if not self.items:
+                # Not the array after all; keep looking past this bracket
+                self._state = self.SEEK
+                return
+            item = None
+        
+        self._state = self.ARRAY
+        if item is not None:
+            self.items.append(item)
+            completed.append(item)
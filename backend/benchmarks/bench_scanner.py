@@ -0,0 +1,111 @@
+"""Compare the scanner's XPath generation before and after the document index.
+
+Builds synthetic pages of about 10k elements whose cells have no id,
+class, name or short text, so every extracted element falls back to a
+positional XPath. Each page is extracted with the old per-element
+sibling scan and with the one-pass index, and the two outputs are
+checked to be identical.
+
+Run from backend/: python -m benchmarks.bench_scanner [--repeat N]
+"""
+import time
+import argparse
+from unittest import mock
+from bs4 import BeautifulSoup
+from app.core import code_scanner
+
+# Long enough that elements are not selected by their text
+CELL_TEXT = "x" * 60
+
+def dashboard_page(rows: int = 1000, columns: int = 3) -> str:
+    """A big table, each cell holding a span and a link"""
+    cell = f"<td><span title='c'>{CELL_TEXT}</span><a href='#'></a></td>"
+    body = "".join("<tr>" + cell * columns + "</tr>" for _ in range(rows))
+    return f"<html><body><div><table>{body}</table></div></body></html>"
+
+def wide_page(items: int = 10000) -> str:
+    """One parent with thousands of same-tag children"""
+    body = "".join(f"<span title='i'>{CELL_TEXT}</span>" for _ in range(items))
+    return f"<html><body><div>{body}</div></body></html>"
+
+def deep_page(branches: int = 100, depth: int = 100) -> str:
+    """Many deeply nested chains of divs, each ending in a link"""
+    chain = "<div title='d'>" * depth + "<a href='#'></a>" + "</div>" * depth
+    return f"<html><body><div>{chain * branches}</div></body></html>"
+
+PAGES = {
+    "dashboard": dashboard_page,
+    "wide": wide_page,
+    "deep": deep_page,
+}
+
+def legacy_generate_xpath(element, xpath_index=None) -> str:
+    """generate_xpath as it was before build_xpath_index: a sibling scan per ancestor.
+
+    The old code found the position with siblings.index(child), which
+    compares tags by content and numbered identical siblings alike. This
+    looks the child up by identity instead, at the same linear cost, so
+    both paths can be checked to produce the same XPaths.
+    """
+    components = []
+    child = element
+    
+    for parent in element.parents:
+        if parent.name == 'html':
+            break
+        
+        siblings = parent.find_all(child.name, recursive=False)
+        if len(siblings) > 1:
+            index = next(i for i, sibling in enumerate(siblings) if sibling is child) + 1
+            components.append(f"{child.name}[{index}]")
+        else:
+            components.append(child.name)
+        
+        child = parent
+    
+    components.reverse()
+    return '//' + '/'.join(components)
+
+def extract(soup, legacy: bool):
+    """Extract elements with the old or the indexed XPath path, ignoring random IDs"""
+    if legacy:
+        with mock.patch.object(code_scanner, "generate_xpath", legacy_generate_xpath), \
+                mock.patch.object(code_scanner, "build_xpath_index", lambda soup: None):
+            elements = code_scanner.extract_elements_from_html(soup, "bench.html")
+    else:
+        elements = code_scanner.extract_elements_from_html(soup, "bench.html")
+    
+    for element in elements:
+        element.pop("id")
+    return elements
+
+def best_time(func, repeat: int) -> float:
+    """Fastest of repeat runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=1, help="runs per measurement, the fastest is reported")
+    args = parser.parse_args()
+    
+    print(f"{'page':<10} {'tags':>7} {'elements':>9} {'old (s)':>9} {'new (s)':>9} {'speedup':>8}")
+    for name, build_page in PAGES.items():
+        soup = BeautifulSoup(build_page(), "html.parser")
+        tags = len(soup.find_all(True))
+        
+        old = extract(soup, legacy=True)
+        new = extract(soup, legacy=False)
+        if old != new:
+            raise SystemExit(f"{name}: old and new extraction differ")
+        
+        old_time = best_time(lambda: extract(soup, legacy=True), args.repeat)
+        new_time = best_time(lambda: extract(soup, legacy=False), args.repeat)
+        print(f"{name:<10} {tags:>7} {len(new):>9} {old_time:>9.3f} {new_time:>9.3f} {old_time / new_time:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,46 @@ class Settings:
     UPLOAD_DIR: str = "uploads"
     RESULTS_DIR: str = "results"
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "gemini")  # or "stub"
+    LLM_STUB_LATENCY: float = float(os.getenv("LLM_STUB_LATENCY", "0.5"))
+    LLM_STUB_FAILURE_RATE: float = float(os.getenv("LLM_STUB_FAILURE_RATE", "0.0"))
+    LLM_STUB_SEED: int = int(os.getenv("LLM_STUB_SEED", "0"))
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+    GEMINI_CONCURRENCY: int = int(os.getenv("GEMINI_CONCURRENCY", "4"))
+    GEMINI_RPM: int = int(os.getenv("GEMINI_RPM", "60"))  # 0 disables the limit
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+    GEMINI_RETRY_BASE_DELAY: float = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "1.0"))
+    GEMINI_BATCH_TOKENS: int = int(os.getenv("GEMINI_BATCH_TOKENS", "4000"))
+    LLM_CACHE_DIR: str = os.path.join(RESULTS_DIR, "llm_cache")
+    LLM_CACHE_MAX_BYTES: int = int(os.getenv("LLM_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+    LLM_CACHE_TTL: int = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds, 0 never expires
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_HEARTBEAT_INTERVAL: float = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "10"))  # seconds
+    JOB_HEARTBEAT_TIMEOUT: float = float(os.getenv("JOB_HEARTBEAT_TIMEOUT", "60"))  # unfinished jobs are failed after this
+    TEST_WORKERS: int = int(os.getenv("TEST_WORKERS", str(os.cpu_count() or 1)))
+    TEST_SHARDING: str = os.getenv("TEST_SHARDING", "duration")
+    TEST_RETRIES: int = int(os.getenv("TEST_RETRIES", "2"))  # retry attempts for failed tests
+    HTML_PARSER: str = os.getenv("HTML_PARSER", "html.parser")  # or "lxml"
+    SCAN_WORKERS: int = int(os.getenv("SCAN_WORKERS", str(os.cpu_count() or 1)))
+    SCAN_CHUNKSIZE: int = int(os.getenv("SCAN_CHUNKSIZE", "0"))  # 0 picks a size from the batch
+    SCAN_PARALLEL_MIN_FILES: int = int(os.getenv("SCAN_PARALLEL_MIN_FILES", "32"))
+    ZIP_MAX_MEMBERS: int = int(os.getenv("ZIP_MAX_MEMBERS", "50000"))
+    ZIP_MAX_TOTAL_SIZE: int = int(os.getenv("ZIP_MAX_TOTAL_SIZE", str(1024 * 1024 * 1024)))
+    ZIP_MAX_RATIO: float = float(os.getenv("ZIP_MAX_RATIO", "100"))
+    ZIP_SCAN_BATCH_BYTES: int = int(os.getenv("ZIP_SCAN_BATCH_BYTES", str(32 * 1024 * 1024)))
+    SCAN_CACHE_DIR: str = os.path.join(RESULTS_DIR, "scan_cache")
+    SCAN_CACHE_MAX_BYTES: int = int(os.getenv("SCAN_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    BROWSER_HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "true").lower() == "true"
+    BROWSER_DISABLE_IMAGES: bool = os.getenv("BROWSER_DISABLE_IMAGES", "true").lower() == "true"
+    BROWSER_DISABLE_EXTENSIONS: bool = os.getenv("BROWSER_DISABLE_EXTENSIONS", "true").lower() == "true"
+    BROWSER_PAGE_LOAD_STRATEGY: str = os.getenv("BROWSER_PAGE_LOAD_STRATEGY", "eager")  # normal, eager or none
+    BROWSER_WINDOW_SIZE: str = os.getenv("BROWSER_WINDOW_SIZE", "1920,1080")
+    BROWSER_EXTRA_ARGUMENTS: str = os.getenv("BROWSER_EXTRA_ARGUMENTS", "")  # space separated Chrome flags
+    CHROMEDRIVER_PATH: str = os.getenv("CHROMEDRIVER_PATH", "")  # empty resolves and caches it on first use
+    LOG_COMPRESSION: str = os.getenv("LOG_COMPRESSION", "gzip")  # or "none"; applied to finished execution logs
+    POM_SPLIT_MODULES: bool = os.getenv("POM_SPLIT_MODULES", "true").lower() == "true"  # false writes one page_objects.py
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "sqlite")  # or "memory"
+    DATABASE_PATH: str = os.getenv("DATABASE_PATH", os.path.join(RESULTS_DIR, "scrap.db"))
     
     if not os.path.exists(UPLOAD_DIR):
         os.makedirs(UPLOAD_DIR)
@@ -0,0 +1,111 @@
+import unittest
+from app.core.impact_analyzer import build_impact_map, changed_files_from_diff, select_impacted_tests
+from app.core.pom_index import PomIndex
+
+POM_ELEMENTS = [
+    {"id": "login", "name": "LoginPage", "type": "page"},
+    {"id": "user", "name": "input_user", "type": "input", "parent_id": "login",
+     "properties": {"source": {"file": "src/Login.tsx", "line": 4}}},
+    {"id": "submit", "name": "button_submit", "type": "button", "parent_id": "login",
+     "properties": {"source": {"file": "src/Login.tsx", "line": 5}}},
+    {"id": "home", "name": "HomePage", "type": "page"},
+    {"id": "logout", "name": "a_logout", "type": "a", "parent_id": "home",
+     "properties": {"source": {"file": "src/Home.tsx", "line": 3}}},
+]
+
+TEST_MODULE = """from page_objects import LoginPage, HomePage
+
+class TestLogin(unittest.TestCase):
+    def setUp(self):
+        self.page = LoginPage(self.driver)
+
+    def test_sign_in(self):
+        self.page.set_input_user("me")
+        self.page.click_button_submit()
+
+    def test_title(self):
+        self.assertEqual(self.driver.title, "App")
+
+class TestHome(unittest.TestCase):
+    def test_logout(self):
+        HomePage(self.driver).a_logout.click()
+"""
+
+IMPACT_MAP = {
+    "files": {"src/Login.tsx": ["user", "submit"], "src/Home.tsx": ["logout"]},
+    "elements": {},
+    "tests": {
+        "test_1.TestLogin.test_sign_in": ["submit", "user"],
+        "test_1.TestHome.test_logout": ["logout"],
+    },
+    "unmapped": ["test_1.TestLogin.test_title", "test_2"],
+}
+
+class BuildImpactMapTest(unittest.TestCase):
+    def test_tests_map_to_the_elements_they_use(self):
+        impact_map = build_impact_map(PomIndex.from_dicts(POM_ELEMENTS),
+                                      [("test_1", TEST_MODULE), ("test_2", "def broken(:\n")])
+        
+        self.assertEqual(impact_map["files"], {"src/Login.tsx": ["user", "submit"], "src/Home.tsx": ["logout"]})
+        self.assertEqual(impact_map["tests"], {"test_1.TestLogin.test_sign_in": ["submit", "user"],
+                                               "test_1.TestHome.test_logout": ["logout"]})
+        # Tests that use no element and modules that do not parse are still listed
+        self.assertEqual(impact_map["unmapped"], ["test_1.TestLogin.test_title", "test_2"])
+
+class SelectImpactedTestsTest(unittest.TestCase):
+    def test_changed_file_selects_its_tests_and_unmapped_ones(self):
+        impact = select_impacted_tests(IMPACT_MAP, ["src/Login.tsx"])
+        
+        self.assertEqual(impact["tests"], ["test_1.TestLogin.test_sign_in", "test_1.TestLogin.test_title", "test_2"])
+        self.assertEqual(impact["elements"], ["submit", "user"])
+        self.assertEqual(impact["files"], ["src/Login.tsx"])
+        self.assertEqual(impact["skipped"], 1)
+    
+    def test_unmapped_tests_can_be_left_out(self):
+        impact = select_impacted_tests(IMPACT_MAP, ["src/Home.tsx"], include_unmapped=False)
+        
+        self.assertEqual(impact["tests"], ["test_1.TestHome.test_logout"])
+        self.assertEqual(impact["skipped"], 3)
+    
+    def test_paths_from_other_roots_match(self):
+        impact = select_impacted_tests(IMPACT_MAP, ["./web/src/Home.tsx", "C:\\repo\\src\\Login.tsx"])
+        
+        self.assertEqual(impact["files"], ["src/Login.tsx", "src/Home.tsx"])
+    
+    def test_unrelated_change_selects_nothing(self):
+        impact = select_impacted_tests(IMPACT_MAP, ["styles/site.css", "src/LoginForm.tsx"])
+        
+        self.assertEqual(impact["tests"], [])
+        self.assertEqual(impact["files"], [])
+        self.assertEqual(impact["skipped"], 4)
+
+class ChangedFilesFromDiffTest(unittest.TestCase):
+    def test_git_diff(self):
+        diff = (
+            "diff --git a/src/Login.tsx b/src/Login.tsx\n"
+            "index 1111111..2222222 100644\n"
+            "--- a/src/Login.tsx\n"
+            "+++ b/src/Login.tsx\n"
+            "@@ -1 +1 @@\n"
+            "+x\n"
+            "diff --git a/src/New.tsx b/src/New.tsx\n"
+            "new file mode 100644\n"
+            "--- /dev/null\n"
+            "+++ b/src/New.tsx\n"
+            "diff --git a/src/Old.tsx b/src/Renamed.tsx\n"
+            "similarity index 100%\n"
+            "rename from src/Old.tsx\n"
+            "rename to src/Renamed.tsx\n"
+        )
+        
+        # Each path once, new files without /dev/null, renames under both names
+        self.assertEqual(changed_files_from_diff(diff),
+                         ["src/Login.tsx", "src/New.tsx", "src/Old.tsx", "src/Renamed.tsx"])
+    
+    def test_plain_unified_diff(self):
+        diff = "--- ./src/Home.tsx\t2024-01-01 00:00:00\n+++ ./src/Home.tsx\t2024-01-02 00:00:00\n@@ -1 +1 @@\n"
+        
+        self.assertEqual(changed_files_from_diff(diff), ["src/Home.tsx"])
+
+if __name__ == "__main__":
+    unittest.main()
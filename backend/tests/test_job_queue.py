@@ -0,0 +1,69 @@
+import os
+import socket
+import tempfile
+import time
+import unittest
+from app.core.job_queue import JobManager, CANCELLED, FAILURE, QUEUED, RUNNING
+from app.core.storage import SQLiteStorage
+from app.models.project import Job, TestExecution
+
+# An earlier process on this host that had the same pid
+PREVIOUS_OWNER = f"{socket.gethostname()}:{os.getpid()}:previous"
+
+class JobRecoveryTest(unittest.TestCase):
+    """Unfinished jobs left in storage by a process that is gone"""
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.database_path = os.path.join(directory.name, "scrap.db")
+    
+    def save_job(self, storage, job_id: str, status: str, owner: str = PREVIOUS_OWNER,
+                 heartbeat: float = None) -> Job:
+        job = Job(id=job_id, type="execute", project_id="project", status=status,
+                  owner=owner, heartbeat=time.time() if heartbeat is None else heartbeat)
+        storage.save_job(job)
+        return job
+    
+    def test_restart_finishes_running_job_and_execution(self):
+        storage = SQLiteStorage(self.database_path)
+        self.save_job(storage, "running", RUNNING)
+        self.save_job(storage, "queued", QUEUED)
+        storage.save_execution(TestExecution(id="execution", project_id="project", test_id="test",
+                                             status="RUNNING", result={}, log_path="test.log",
+                                             job_id="running"))
+        
+        reopened = SQLiteStorage(self.database_path)
+        JobManager(max_workers=1, storage=reopened)
+        
+        self.assertEqual(reopened.get_job("running").status, FAILURE)
+        self.assertEqual(reopened.get_job("queued").status, CANCELLED)
+        execution = reopened.get_execution("execution")
+        self.assertEqual(execution.status, "ERROR")
+        self.assertIn("error", execution.result)
+    
+    def test_job_of_live_process_is_left_running(self):
+        storage = SQLiteStorage(self.database_path)
+        self.save_job(storage, "remote", RUNNING, owner="elsewhere:1234:abcd1234")
+        
+        manager = JobManager(max_workers=1, storage=storage)
+        
+        self.assertEqual(manager.get("remote").status, RUNNING)
+    
+    def test_stopped_heartbeat_fails_job_on_read(self):
+        storage = SQLiteStorage(self.database_path)
+        manager = JobManager(max_workers=1, storage=storage, heartbeat_timeout=60)
+        self.save_job(storage, "remote", RUNNING, owner="elsewhere:1234:abcd1234",
+                      heartbeat=time.time() - 120)
+        
+        self.assertEqual(manager.get("remote").status, FAILURE)
+    
+    def test_cancel_finishes_orphaned_job(self):
+        storage = SQLiteStorage(self.database_path)
+        manager = JobManager(max_workers=1, storage=storage)
+        self.save_job(storage, "running", RUNNING)
+        
+        self.assertEqual(manager.cancel("running").status, CANCELLED)
+        self.assertEqual(storage.get_job("running").status, CANCELLED)
+
+if __name__ == "__main__":
+    unittest.main()
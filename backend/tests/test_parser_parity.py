@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+from app.core.code_scanner import assign_stable_ids, scan_component_content
+from config import settings
+
+TSX_SAMPLE = """import React, { useState } from 'react';
+// <div>not jsx</div>
+const s = "<span>not jsx</span>";
+function id<T>(x: T): T { return x; }
+export default function Login({ items }: Props) {
+  const [v, setV] = useState<string>('');
+  if (items.length < 2 && v > '') {}
+  return (
+    <>
+      <form id="login" className="form main" onSubmit={(e) => { e.preventDefault(); }}>
+        <label htmlFor="user">User {v}</label>
+        <input name="user" value={v} onChange={e => setV(e.target.value)} />
+        {/* comment */}
+        <div className={styles.row}>
+          {items.map(item => <a key={item.id} href={`/x/${item.id}`}>{item.label}</a>)}
+        </div>
+        {v.length > 3 ? <span data-testid="ok">OK</span> : <span>bad</span>}
+        <button type="submit" disabled={!v}>Sign in</button>
+      </form>
+    </>
+  );
+}
+"""
+
+VUE_SAMPLE = """<template>
+  <div class="page">
+    <template v-if="ok"><button id="go" @click="go">Go {{ n }}</button></template>
+    <input v-model="q" :class="cls" name="q">
+    <select name="size"><option>S</option><option>L</option></select>
+    <my-comp/>
+  </div>
+</template>
+<script>
+export default { data() { return { html: "<div>x</div>" } } }
+</script>
+<style>.page > div { color: red }</style>
+"""
+
+HTML_PAGE_SAMPLE = """<!DOCTYPE html>
+<html>
+<head><title>Login &amp; more</title><script>var s = "<button>no</button>";</script></head>
+<body>
+  <!-- <input name="commented"> -->
+  <form id="login"><input name="user"/><input name="pw" type="password"/>
+    <textarea name="note"><b>raw</b></textarea>
+    <button class="btn primary">Login</button></form>
+  <div><a href="/x">Home</a><a href="/y">About</a></div>
+  <table><tr><td><input type="checkbox" name="remember"></td></tr></table>
+</body>
+</html>
+"""
+
+HTML_FRAGMENT_SAMPLE = """<div class="card">
+  <p>Intro<img src="a.png" alt="logo"></p>
+  <ul><li><a href="#one">One</a></li><li><a href="#two">Two</a></li></ul>
+  <button type="button" onclick="go()">Go</button>
+</div>
+"""
+
+SAMPLES = {
+    "Login.tsx": TSX_SAMPLE,
+    "Page.vue": VUE_SAMPLE,
+    "index.html": HTML_PAGE_SAMPLE,
+    "card.html": HTML_FRAGMENT_SAMPLE,
+}
+
+def scan_with(backend: str, content: str, file_name: str):
+    """Scan content with one parser backend, with the IDs scan_source_code would assign"""
+    with mock.patch.object(settings, "HTML_PARSER", backend):
+        elements = scan_component_content(content, file_name)
+    assign_stable_ids(elements)
+    return elements
+
+class ParserParityTest(unittest.TestCase):
+    """Every HTML_PARSER backend must extract the same element dicts"""
+    def test_backends_extract_the_same_elements(self):
+        for file_name, content in SAMPLES.items():
+            with self.subTest(file_name=file_name):
+                expected = scan_with("html.parser", content, file_name)
+                self.assertTrue(expected)
+                self.assertEqual(scan_with("lxml", content, file_name), expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import tempfile
+import unittest
+from unittest import mock
+from app.core import pom_generator
+from app.core.code_scanner import assign_stable_ids, scan_component_content
+from config import settings
+
+APP_SAMPLE = """export default function App() {
+  return (
+    <div className="app">
+      <form id="signup">
+        <input name="email" />
+        <button type="submit">Join</button>
+      </form>
+      <a href="/about" className="nav-link">About</a>
+      <span data-testid="status">Ready</span>
+    </div>
+  );
+}
+"""
+
+def scan(content: str):
+    elements = scan_component_content(content, "App.tsx")
+    assign_stable_ids(elements)
+    return elements
+
+class PomChangesTest(unittest.TestCase):
+    """Which pages generate_pom reports as changed between two scans"""
+    def setUp(self):
+        results_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(results_dir.cleanup)
+        for patch in (mock.patch.object(settings, "RESULTS_DIR", results_dir.name),
+                      mock.patch.object(pom_generator, "llm_enabled", return_value=False)):
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_shifted_lines_change_no_page(self):
+        pom_generator.generate_pom(scan(APP_SAMPLE), "project")
+        
+        shifted = scan("// Signup page\n\n" + APP_SAMPLE)
+        result = pom_generator.generate_pom(shifted, "project")
+        
+        self.assertEqual(result["changes"]["changed"], [])
+        self.assertEqual(result["changes"]["enhanced"], [])
+        self.assertTrue(result["changes"]["unchanged"])
+        # The saved POM still points at the elements' new lines
+        lines = {element["id"]: element["properties"]["source"]["line"] for element in shifted}
+        for element in result["elements"]:
+            if element["id"] in lines:
+                self.assertEqual(element["properties"]["source"]["line"], lines[element["id"]])
+    
+    def test_edited_element_changes_its_page(self):
+        pom_generator.generate_pom(scan(APP_SAMPLE), "project")
+        
+        edited = APP_SAMPLE.replace('<button type="submit">Join</button>', '<button type="submit">Sign up</button>')
+        result = pom_generator.generate_pom(scan(edited), "project")
+        
+        self.assertTrue(result["changes"]["changed"])
+        self.assertEqual(result["changes"]["changed"], result["changes"]["enhanced"])
+
+class PomEnhancementTest(unittest.TestCase):
+    """Which pages generate_pom sends to the model again"""
+    def setUp(self):
+        results_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(results_dir.cleanup)
+        self.enhance = mock.Mock(return_value=[])
+        provider = mock.Mock(model_name="test-model")
+        for patch in (mock.patch.object(settings, "RESULTS_DIR", results_dir.name),
+                      mock.patch.object(pom_generator, "llm_enabled", return_value=True),
+                      mock.patch.object(pom_generator, "get_provider", return_value=provider),
+                      mock.patch.object(pom_generator, "generate_pom_with_gemini", self.enhance)):
+            patch.start()
+            self.addCleanup(patch.stop)
+    
+    def test_pages_without_enhanced_elements_are_enhanced_again(self):
+        elements = scan(APP_SAMPLE)
+        pom_generator.generate_pom(elements, "project")
+        
+        result = pom_generator.generate_pom(elements, "project")
+        
+        self.assertEqual(self.enhance.call_count, 2)
+        self.assertTrue(result["changes"]["enhanced"])
+        self.assertEqual(result["changes"]["changed"], [])
+    
+    def test_failed_enhancement_is_retried(self):
+        elements = scan(APP_SAMPLE)
+        self.enhance.side_effect = RuntimeError("quota exceeded")
+        pom_generator.generate_pom(elements, "project")
+        
+        self.enhance.side_effect = None
+        self.enhance.return_value = [dict(element, name=f"Enhanced{element['name']}") for element in elements]
+        pom_generator.generate_pom(elements, "project")
+        result = pom_generator.generate_pom(elements, "project")
+        
+        # The page enhanced on the second run is reused on the third
+        self.assertEqual(self.enhance.call_count, 2)
+        self.assertEqual(result["changes"]["enhanced"], [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from app.core.retry_executor import merge_retry_results, retry_target
+
+def result(test_id: str, status: str, traceback: str = None):
+    test = {"id": test_id, "status": status, "duration": 0.1}
+    if traceback is not None:
+        test["traceback"] = traceback
+    return test
+
+class MergeRetryResultsTest(unittest.TestCase):
+    """How a retry attempt's results are merged into an execution's tests"""
+    def test_pass_on_retry_is_flaky(self):
+        tests = [result("test_1.TestA.test_a", "FAILED", "first"), result("test_1.TestA.test_b", "PASSED")]
+        
+        merge_retry_results(tests, [result("test_1.TestA.test_a", "PASSED")], completed=True)
+        
+        flaky = tests[0]
+        self.assertEqual(flaky["status"], "PASSED")
+        self.assertTrue(flaky["flaky"])
+        self.assertEqual(flaky["first_failure"], "first")
+        self.assertNotIn("traceback", flaky)
+        self.assertEqual(flaky["attempts"], 2)
+        self.assertNotIn("attempts", tests[1])
+    
+    def test_failing_again_keeps_latest_failure(self):
+        tests = [result("test_1.TestA.test_a", "FAILED", "first")]
+        
+        merge_retry_results(tests, [result("test_1.TestA.test_a", "ERROR", "second")], completed=True)
+        merge_retry_results(tests, [result("test_1.TestA.test_a", "FAILED", "third")], completed=True)
+        
+        self.assertEqual(tests, [{"id": "test_1.TestA.test_a", "status": "FAILED", "duration": 0.1,
+                                  "traceback": "third", "attempts": 3}])
+    
+    def test_fixture_error_is_replaced_by_the_tests_it_hid(self):
+        tests = [result("setUpClass (test_2.TestB)", "ERROR", "fixture"),
+                 result("unittest.loader._FailedTest.test_3", "ERROR", "import")]
+        
+        merge_retry_results(tests, [result("test_2.TestB.test_x", "PASSED"),
+                                    result("test_3.TestC.test_y", "FAILED", "assert")], completed=True)
+        
+        self.assertEqual([(test["id"], test["status"], test["attempts"], test["flaky"]) for test in tests],
+                         [("test_2.TestB.test_x", "PASSED", 1, True), ("test_3.TestC.test_y", "FAILED", 1, False)])
+    
+    def test_fixture_error_that_happens_again_is_kept(self):
+        tests = [result("setUpClass (test_2.TestB)", "ERROR", "fixture")]
+        
+        merge_retry_results(tests, [result("setUpClass (test_2.TestB)", "ERROR", "again")], completed=True)
+        
+        self.assertEqual([(test["id"], test["traceback"], test["attempts"]) for test in tests],
+                         [("setUpClass (test_2.TestB)", "again", 2)])
+    
+    def test_placeholders_are_kept_until_the_retry_completes(self):
+        tests = [result("setUpClass (test_2.TestB)", "ERROR", "fixture")]
+        
+        merge_retry_results(tests, [result("test_2.TestB.test_x", "PASSED")], completed=False)
+        
+        self.assertEqual([test["id"] for test in tests], ["setUpClass (test_2.TestB)", "test_2.TestB.test_x"])
+
+class RetryTargetTest(unittest.TestCase):
+    def test_targets(self):
+        self.assertEqual(retry_target("test_1.TestA.test_a"), "test_1.TestA.test_a")
+        self.assertEqual(retry_target("setUpClass (test_2.TestB)"), "test_2.TestB")
+        self.assertEqual(retry_target("setUpModule (test_2)"), "test_2")
+        self.assertEqual(retry_target("unittest.loader._FailedTest.test_3"), "test_3")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import unittest
+from app.core.test_executor import execute_test_targets
+from app.core.test_reporter import build_test_results
+from app.models.project import TestCase
+
+TEST_MODULES = {
+    "test_1": """import unittest
+class TestA(unittest.TestCase):
+    def test_token(self):
+        print("token ok FAIL ERROR skipped")
+    def test_fails(self):
+        self.assertEqual(1, 2)
+    def test_errors(self):
+        raise RuntimeError("boom")
+    @unittest.skip("not now")
+    def test_skipped(self):
+        pass
+    def test_sub(self):
+        for i in range(3):
+            with self.subTest(i=i):
+                self.assertLess(i, 2)
+""",
+    "test_2": """import unittest
+class TestB(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        raise RuntimeError("fixture")
+    def test_never(self):
+        pass
+""",
+    "test_3": "import missing_module\n",
+}
+
+class BuildTestResultsTest(unittest.TestCase):
+    """Per-test statuses built from the reporter's JSON lines"""
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+    
+    def test_outcomes_of_a_real_run(self):
+        test_directory = os.path.join(self.directory, "tests")
+        os.makedirs(test_directory)
+        for name, code in TEST_MODULES.items():
+            with open(os.path.join(test_directory, f"{name}.py"), 'w', encoding='utf-8') as f:
+                f.write(code)
+        test_case = TestCase(id="test", project_id="project", pom_id="pom", name="Tests",
+                             script_path=os.path.join(test_directory, "test_suite.py"))
+        
+        execution = execute_test_targets(test_case, list(TEST_MODULES),
+                                         log_file=os.path.join(self.directory, "execution.log"))
+        
+        statuses = {test["id"]: test["status"] for test in execution["result"]["tests"]}
+        self.assertEqual(statuses, {
+            # Words printed by a passing test do not change its status
+            "test_1.TestA.test_token": "PASSED",
+            "test_1.TestA.test_fails": "FAILED",
+            "test_1.TestA.test_errors": "ERROR",
+            "test_1.TestA.test_skipped": "SKIPPED",
+            "test_1.TestA.test_sub": "FAILED",
+            "setUpClass (test_2.TestB)": "ERROR",
+            "unittest.loader._FailedTest.test_3": "ERROR",
+        })
+        self.assertEqual(execution["status"], "FAILURE")
+    
+    def test_unfinished_and_cut_short_lines(self):
+        report_path = os.path.join(self.directory, "report.jsonl")
+        events = [
+            {"event": "start", "test": "test_1.TestA.test_done", "time": 0.0},
+            {"event": "end", "test": "test_1.TestA.test_done", "time": 0.1, "duration": 0.1, "status": "PASSED"},
+            {"event": "start", "test": "test_1.TestA.test_killed", "time": 0.2},
+        ]
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(event) + "\n" for event in events)
+            f.write('{"event": "end", "test": "test_1.TestA.test_kil')
+        
+        results = build_test_results(report_path)
+        
+        self.assertEqual([(result["name"], result["status"]) for result in results],
+                         [("test_done", "PASSED"), ("test_killed", "ERROR")])
+        self.assertEqual(results[0]["module"], "test_1")
+        self.assertEqual(results[0]["class"], "TestA")
+        self.assertEqual(results[1]["traceback"], "Test did not finish")
+    
+    def test_missing_report(self):
+        self.assertEqual(build_test_results(os.path.join(self.directory, "missing.jsonl")), [])
+
+if __name__ == "__main__":
+    unittest.main()
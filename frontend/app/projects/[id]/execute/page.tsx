@@ -3,7 +3,10 @@
 import { useEffect, useState } from 'react';
 import Link from 'next/link';
 import { useRouter } from 'next/navigation';
-import { Project, TestCase, TestExecution, getProject, getProjectTests, getProjectExecutions, executeTest } from '@/lib/api';
+import {
+  Project, TestCase, TestExecution, TestEvent, getProject, getProjectTests, getProjectExecutions,
+  startTestExecution, streamExecution, getExecutionLogUrl, retryExecution
+} from '@/lib/api';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Progress } from '@/components/ui/progress';
@@ -18,6 +21,9 @@ import { useToast } from '@/components/ui/use-toast';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { ScrollArea } from '@/components/ui/scroll-area';
 
+// Most recent log output kept on the page while an execution runs
+const MAX_LIVE_LOG_CHARS = 100000;
+
 export default function ExecutionPage({ params }: { params: { id: string } }) {
   const { id } = params;
   const router = useRouter();
@@ -31,6 +37,7 @@ export default function ExecutionPage({ params }: { params: { id: string } }) {
   const [selectedTest, setSelectedTest] = useState('');
   const [currentExecution, setCurrentExecution] = useState<TestExecution | null>(null);
   const [error, setError] = useState('');
+  const [liveLog, setLiveLog] = useState('');
 
   useEffect(() => {
     const fetchData = async () => {
@@ -89,10 +96,33 @@ export default function ExecutionPage({ params }: { params: { id: string } }) {
         description: "Test execution has started...",
       });
       
-      const result = await executeTest(id, selectedTest);
+      const { execution_id } = await startTestExecution(id, selectedTest);
+      const liveTests: Record<string, any> = {};
+      setLiveLog('');
+      setCurrentExecution({
+        id: execution_id,
+        project_id: id,
+        test_id: selectedTest,
+        status: 'RUNNING',
+        result: { tests: [] },
+        log_path: '',
+      });
       
-      // Simulate delay for demo (remove in production)
-      await new Promise(resolve => setTimeout(resolve, 2000));
+      // Show output and test results while the tests run
+      const result = await streamExecution(
+        execution_id,
+        (chunk) => setLiveLog(log => (log + chunk.text).slice(-MAX_LIVE_LOG_CHARS)),
+        (event: TestEvent) => {
+          liveTests[event.test] = {
+            name: event.test.split('.').pop(),
+            status: event.event === 'start' ? 'RUNNING' : event.status,
+          };
+          setCurrentExecution(execution => execution && {
+            ...execution,
+            result: { ...execution.result, tests: Object.values(liveTests) },
+          });
+        }
+      );
       
       // Get updated executions
       const executionsData = await getProjectExecutions(id);
@@ -124,6 +154,40 @@ export default function ExecutionPage({ params }: { params: { id: string } }) {
     }
   };
 
+  const handleRetryFailed = async () => {
+    if (!currentExecution) {
+      return;
+    }
+    
+    try {
+      setExecuting(true);
+      const result = await retryExecution(currentExecution.id);
+      
+      const executionsData = await getProjectExecutions(id);
+      setExecutions(executionsData.executions);
+      const retried = executionsData.executions.find(exec => exec.id === result.execution_id);
+      if (retried) {
+        setCurrentExecution(retried);
+        
+        const flaky = retried.result.flaky?.length || 0;
+        toast({
+          title: `Retry ${retried.status === 'SUCCESS' ? 'passed' : 'failed'}`,
+          description: flaky ? `${flaky} flaky test${flaky === 1 ? '' : 's'} passed on retry` : `Execution status: ${retried.status}`,
+          variant: retried.status === 'SUCCESS' ? 'default' : 'destructive',
+        });
+      }
+    } catch (err) {
+      console.error('Error retrying tests:', err);
+      toast({
+        title: "Retry failed",
+        description: "Failed to retry failed tests",
+        variant: "destructive",
+      });
+    } finally {
+      setExecuting(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="container py-10 flex justify-center items-center min-h-[60vh]">
@@ -345,6 +409,17 @@ export default function ExecutionPage({ params }: { params: { id: string } }) {
                           </div>
                         </div>
                         
+                        {executing && liveLog && (
+                          <div>
+                            <h3 className="text-sm font-medium mb-1">Live Output</h3>
+                            <ScrollArea className="h-[200px] w-full rounded-md border p-2">
+                              <pre className="text-xs font-mono">
+                                {liveLog}
+                              </pre>
+                            </ScrollArea>
+                          </div>
+                        )}
+                        
                         {currentExecution.result.tests && currentExecution.result.tests.length > 0 ? (
                           <div>
                             <h3 className="text-sm font-medium mb-1">Test Cases</h3>
@@ -354,7 +429,12 @@ export default function ExecutionPage({ params }: { params: { id: string } }) {
                                   key={index}
                                   className="flex items-center justify-between text-sm p-1.5 rounded-md bg-muted"
                                 >
-                                  <span>{test.name}</span>
+                                  <span>
+                                    {test.name}
+                                    {test.flaky && (
+                                      <Badge variant="outline" className="ml-2">flaky</Badge>
+                                    )}
+                                  </span>
                                   <Badge variant={
                                     test.status === 'PASSED' ? 'default' : 
                                     test.status === 'RUNNING' ? 'outline' : 
@@ -382,8 +462,14 @@ export default function ExecutionPage({ params }: { params: { id: string } }) {
                     </div>
                     
                     <div className="flex justify-end gap-2">
+                      {currentExecution.result.tests?.some((test: any) => test.status === 'FAILED' || test.status === 'ERROR') && (
+                        <Button variant="outline" onClick={handleRetryFailed} disabled={executing}>
+                          <RefreshCw className="mr-2 h-4 w-4" />
+                          Retry Failed
+                        </Button>
+                      )}
                       <Button variant="outline" asChild>
-                        <Link href={currentExecution.log_path} target="_blank">
+                        <Link href={getExecutionLogUrl(currentExecution.id)} target="_blank">
                           <Terminal className="mr-2 h-4 w-4" />
                           View Full Log
                         </Link>
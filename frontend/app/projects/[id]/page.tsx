@@ -49,7 +49,7 @@ export default function ProjectPage({ params }: { params: { id: string } }) {
       const result = await scanProject(id);
       toast({
         title: "Source code scanned",
-        description: `Found ${result.elements.length} UI elements`,
+        description: `Found ${result.element_count} UI elements`,
       });
     } catch (err) {
       console.error('Error scanning code:', err);
@@ -1,9 +1,9 @@
 "use client";
 
-import { useEffect, useState } from 'react';
+import { useEffect, useMemo, useState } from 'react';
 import Link from 'next/link';
 import { useRouter } from 'next/navigation';
-import { Project, POM, getProject, getProjectPOMs, createPOM } from '@/lib/api';
+import { Project, POM, Element, getProject, getProjectPOMs, createPOM } from '@/lib/api';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
@@ -31,6 +31,22 @@ export default function POMPage({ params }: { params: { id: string } }) {
   const [selectedPOM, setSelectedPOM] = useState<POM | null>(null);
   const [activeTab, setActiveTab] = useState('elements');
 
+  // Children of each page, grouped once per selected POM for the code preview
+  const childrenByPage = useMemo(() => {
+    const byParent = new Map<string, Element[]>();
+    for (const elem of selectedPOM?.elements || []) {
+      if (elem.type !== 'page' && elem.parent_id) {
+        const siblings = byParent.get(elem.parent_id);
+        if (siblings) {
+          siblings.push(elem);
+        } else {
+          byParent.set(elem.parent_id, [elem]);
+        }
+      }
+    }
+    return byParent;
+  }, [selectedPOM]);
+
   useEffect(() => {
     const fetchData = async () => {
       try {
@@ -226,41 +242,21 @@ export default function POMPage({ params }: { params: { id: string } }) {
                             style={tomorrow}
                             customStyle={{ margin: 0, borderRadius: '0.5rem' }}
                           >
-                            {`from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+                            {`from page_objects.base_page import BasePage, PageElement
+
+# BasePage resolves each PageElement's (By, value) locator once,
+# caches found elements until they go stale and waits explicitly
+# before acting on them.
 
-class BasePage:
-    def __init__(self, driver):
-        self.driver = driver
-        
-    def find_element(self, selector, selector_type):
-        # Implementation details...
-        pass
-        
-    def click(self, selector, selector_type):
-        element = self.find_element(selector, selector_type)
-        element.click()
-        
-    def input_text(self, selector, selector_type, text):
-        element = self.find_element(selector, selector_type)
-        element.clear()
-        element.send_keys(text)
-        
 # Generated Page Objects
 ${selectedPOM.elements
   .filter(e => e.type === 'page')
   .map(page => `
 class ${page.name}(BasePage):
-    def __init__(self, driver):
-        super().__init__(driver)
-        
-    # Elements and methods for ${page.name}
-    ${selectedPOM.elements
-      .filter(e => e.parent_id === page.id)
+    """Page object for ${page.name}"""
+    ${(childrenByPage.get(page.id) || [])
       .map(elem => `
-    def ${elem.name.replace('-', '_')}(self):
-        return self.find_element('${elem.selector}', '${elem.selector_type}')`).join('')}
+    ${elem.name.replace('-', '_')} = PageElement(${JSON.stringify(elem.selector)}, ${JSON.stringify(elem.selector_type)})`).join('')}
 `).join('')}
 `}
                           </SyntaxHighlighter>
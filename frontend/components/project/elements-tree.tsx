@@ -1,4 +1,4 @@
-import { useState } from 'react';
+import { useMemo, useState } from 'react';
 import { 
   ChevronRight, ChevronDown, File, Folder, 
   MousePointer, Type, Box, AlignLeft
@@ -15,8 +15,24 @@ export function ElementsTree({ elements }: ElementsTreeProps) {
   const [expandedIds, setExpandedIds] = useState<Record<string, boolean>>({});
   const [selectedElement, setSelectedElement] = useState<any | null>(null);
   
-  // Find page/parent elements
-  const pageElements = elements.filter(el => el.type === 'page');
+  // Index pages and children once instead of filtering on every render of every node
+  const { pageElements, childrenByParent } = useMemo(() => {
+    const pages: any[] = [];
+    const byParent = new Map<string, any[]>();
+    for (const el of elements) {
+      if (el.type === 'page') {
+        pages.push(el);
+      } else if (el.parent_id) {
+        const siblings = byParent.get(el.parent_id);
+        if (siblings) {
+          siblings.push(el);
+        } else {
+          byParent.set(el.parent_id, [el]);
+        }
+      }
+    }
+    return { pageElements: pages, childrenByParent: byParent };
+  }, [elements]);
   
   const toggleExpand = (id: string) => {
     setExpandedIds(prev => ({
@@ -45,7 +61,7 @@ export function ElementsTree({ elements }: ElementsTreeProps) {
   };
   
   const renderElement = (element: any, level: number = 0) => {
-    const children = elements.filter(el => el.parent_id === element.id);
+    const children = childrenByParent.get(element.id) || [];
     const hasChildren = children.length > 0;
     const isExpanded = expandedIds[element.id] || false;
     const isSelected = selectedElement?.id === element.id;
@@ -25,11 +25,20 @@ export interface Element {
   properties?: Record<string, any>;
 }
 
+export interface POMChanges {
+  added: string[];
+  changed: string[];
+  removed: string[];
+  unchanged: string[];
+  enhanced: string[];
+}
+
 export interface POM {
   id: string;
   project_id: string;
   elements: Element[];
   file_path: string;
+  changes?: POMChanges;
 }
 
 export interface TestCase {
@@ -48,6 +57,18 @@ export interface TestExecution {
   status: string;
   result: Record<string, any>;
   log_path: string;
+  job_id?: string;
+}
+
+export interface Job<T = any> {
+  id: string;
+  type: string;
+  project_id?: string;
+  status: 'QUEUED' | 'RUNNING' | 'SUCCESS' | 'FAILURE' | 'CANCELLED';
+  progress: number;
+  message?: string;
+  result?: T;
+  error?: string;
 }
 
 // API functions
@@ -87,7 +108,7 @@ export async function getProject(id: string): Promise<Project> {
   return response.json();
 }
 
-export async function scanProject(id: string): Promise<{project_id: string, elements: Element[]}> {
+export async function scanProject(id: string): Promise<{project_id: string, element_count: number}> {
   const response = await fetch(`${API_BASE_URL}/projects/${id}/scan`, {
     method: 'POST',
   });
@@ -97,10 +118,11 @@ export async function scanProject(id: string): Promise<{project_id: string, elem
     throw new Error(error.detail || 'Failed to scan project');
   }
   
-  return response.json();
+  const { job_id } = await response.json();
+  return waitForJob(job_id);
 }
 
-export async function createPOM(projectId: string): Promise<{pom_id: string}> {
+export async function createPOM(projectId: string): Promise<{pom_id: string, changes: POMChanges}> {
   const response = await fetch(`${API_BASE_URL}/projects/${projectId}/pom`, {
     method: 'POST',
   });
@@ -110,7 +132,8 @@ export async function createPOM(projectId: string): Promise<{pom_id: string}> {
     throw new Error(error.detail || 'Failed to create POM');
   }
   
-  return response.json();
+  const { job_id } = await response.json();
+  return waitForJob(job_id);
 }
 
 export async function getProjectPOMs(projectId: string): Promise<{poms: POM[]}> {
@@ -138,7 +161,8 @@ export async function createTests(projectId: string, pomId: string): Promise<{te
     throw new Error(error.detail || 'Failed to create tests');
   }
   
-  return response.json();
+  const { job_id } = await response.json();
+  return waitForJob(job_id);
 }
 
 export async function getProjectTests(projectId: string): Promise<{tests: TestCase[]}> {
@@ -152,7 +176,26 @@ export async function getProjectTests(projectId: string): Promise<{tests: TestCa
   return response.json();
 }
 
-export async function executeTest(projectId: string, testId: string): Promise<{execution_id: string, result: any}> {
+export async function executeTest(projectId: string, testId: string): Promise<{execution_id: string, status: string}> {
+  const formData = new FormData();
+  formData.append('test_id', testId);
+  
+  const response = await fetch(`${API_BASE_URL}/projects/${projectId}/execute`, {
+    method: 'POST',
+    body: formData,
+  });
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to execute test');
+  }
+  
+  const { job_id } = await response.json();
+  return waitForJob(job_id);
+}
+
+// Queue a test execution without waiting for it; follow it with streamExecution
+export async function startTestExecution(projectId: string, testId: string): Promise<{job_id: string, execution_id: string}> {
   const formData = new FormData();
   formData.append('test_id', testId);
   
@@ -169,6 +212,68 @@ export async function executeTest(projectId: string, testId: string): Promise<{e
   return response.json();
 }
 
+export interface ImpactAnalysis {
+  changed_files: string[];
+  mapped_files: string[];
+  elements: string[];
+  tests: string[];
+  skipped: number;
+}
+
+export interface SourceChange {
+  file?: File;
+  diff?: string;
+  changedFiles?: string[];
+}
+
+// Queue only the tests that use elements from changed source files; execution_id is null when none are affected
+export async function executeImpactedTests(projectId: string, testId: string, change: SourceChange): Promise<{job_id: string | null, execution_id: string | null, impact: ImpactAnalysis}> {
+  const formData = new FormData();
+  formData.append('test_id', testId);
+  if (change.file) {
+    formData.append('file', change.file);
+  }
+  if (change.diff) {
+    formData.append('diff', change.diff);
+  }
+  if (change.changedFiles) {
+    formData.append('changed_files', change.changedFiles.join('\n'));
+  }
+  
+  const response = await fetch(`${API_BASE_URL}/projects/${projectId}/execute/impacted`, {
+    method: 'POST',
+    body: formData,
+  });
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to execute affected tests');
+  }
+  
+  return response.json();
+}
+
+// Re-run only the failed tests of an execution; results are merged into the same execution
+export async function retryExecution(executionId: string, maxRetries?: number): Promise<{execution_id: string, status: string}> {
+  const formData = new FormData();
+  if (maxRetries !== undefined) {
+    formData.append('max_retries', String(maxRetries));
+  }
+  
+  const response = await fetch(`${API_BASE_URL}/executions/${executionId}/retry`, {
+    method: 'POST',
+    body: formData,
+  });
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to retry tests');
+  }
+  
+  const { job_id } = await response.json();
+  return waitForJob(job_id);
+}
+
 export async function getProjectExecutions(projectId: string): Promise<{executions: TestExecution[]}> {
   const response = await fetch(`${API_BASE_URL}/projects/${projectId}/executions`);
   
@@ -178,4 +283,145 @@ export async function getProjectExecutions(projectId: string): Promise<{executio
   }
   
   return response.json();
-}
\ No newline at end of file
+}
+
+export async function listJobs(projectId?: string): Promise<{jobs: Job[]}> {
+  const query = projectId ? `?project_id=${encodeURIComponent(projectId)}` : '';
+  const response = await fetch(`${API_BASE_URL}/jobs${query}`);
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch jobs');
+  }
+  
+  return response.json();
+}
+
+export async function getJob<T = any>(jobId: string): Promise<Job<T>> {
+  const response = await fetch(`${API_BASE_URL}/jobs/${jobId}`);
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to fetch job');
+  }
+  
+  return response.json();
+}
+
+export async function cancelJob(jobId: string): Promise<Job> {
+  const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/cancel`, {
+    method: 'POST',
+  });
+  
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to cancel job');
+  }
+  
+  return response.json();
+}
+
+// Poll a background job until it finishes and return its result
+export async function waitForJob<T = any>(jobId: string, intervalMs = 1000): Promise<T> {
+  while (true) {
+    const job = await getJob<T>(jobId);
+    
+    if (job.status === 'SUCCESS') {
+      return job.result as T;
+    }
+    if (job.status === 'FAILURE') {
+      throw new Error(job.error || 'Job failed');
+    }
+    if (job.status === 'CANCELLED') {
+      throw new Error('Job was cancelled');
+    }
+    
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
+export interface TestScript {
+  name: string;
+  code: string;
+}
+
+// Listen to a Server-Sent Events endpoint until it sends "done" or "error"
+function streamEvents<T>(url: string, handlers: Record<string, (item: any) => void>): Promise<T> {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(url);
+    
+    Object.entries(handlers).forEach(([itemEvent, onItem]) => {
+      source.addEventListener(itemEvent, (event) => {
+        onItem(JSON.parse((event as MessageEvent).data));
+      });
+    });
+    source.addEventListener('done', (event) => {
+      source.close();
+      resolve(JSON.parse((event as MessageEvent).data));
+    });
+    // Fired both for server "error" events and for connection failures
+    source.addEventListener('error', (event) => {
+      source.close();
+      const data = (event as MessageEvent).data;
+      reject(new Error(data ? JSON.parse(data).detail : 'Stream failed'));
+    });
+  });
+}
+
+// Generate a POM, receiving each element as soon as it is ready
+export function streamPOM(projectId: string, onElement: (element: Element) => void,
+                          regenerate = false): Promise<{pom_id: string, changes: POMChanges}> {
+  const params = new URLSearchParams({ regenerate: String(regenerate) });
+  return streamEvents(`${API_BASE_URL}/projects/${projectId}/pom/stream?${params}`, { element: onElement });
+}
+
+// Generate tests, receiving each test script as soon as it is ready
+export function streamTests(projectId: string, pomId: string, onTestScript: (script: TestScript) => void,
+                            regenerate = false): Promise<{test_id: string}> {
+  const params = new URLSearchParams({ pom_id: pomId, regenerate: String(regenerate) });
+  return streamEvents(`${API_BASE_URL}/projects/${projectId}/tests/stream?${params}`, { test_script: onTestScript });
+}
+
+export interface ExecutionLogChunk {
+  offset: number;
+  end: number;
+  text: string;
+}
+
+export interface TestEvent {
+  event: 'start' | 'end';
+  test: string;
+  time: number;
+  offset: number;
+  status?: string;
+  duration?: number;
+  traceback?: string;
+  reason?: string;
+}
+
+// Follow a running execution, receiving log output and test events as they happen
+export function streamExecution(executionId: string, onLog: (chunk: ExecutionLogChunk) => void,
+                                onTest: (event: TestEvent) => void): Promise<{execution_id: string, status: string, result: Record<string, any>}> {
+  return streamEvents(`${API_BASE_URL}/executions/${executionId}/stream`, { log: onLog, test: onTest });
+}
+
+export interface ExecutionLogQuery {
+  attempt?: number;
+  offset?: number;
+  length?: number;
+  tail?: number;
+  line?: number;
+  lines?: number;
+}
+
+// URL of an execution log: all of it, a byte range, the last lines, or lines from a line number
+export function getExecutionLogUrl(executionId: string, query: ExecutionLogQuery = {}): string {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value !== undefined) {
+      params.set(key, String(value));
+    }
+  });
+  const search = params.toString();
+  return `${API_BASE_URL}/executions/${executionId}/log${search ? `?${search}` : ''}`;
+}